@@ -20,21 +20,24 @@ This is a modular and extensible framework for security vulnerability scanning.
 """
 
 import os
+import sys
 import time
+import asyncio
 import json
 import random
-import numpy as np
-import torch
-import httpx
 import logging
-import sqlparse
 import hashlib
+import importlib
+import itertools
+import math
 from abc import ABC, abstractmethod
 from datetime import datetime
-from urllib.parse import urlparse, quote, unquote, urljoin, parse_qs
-from bs4 import BeautifulSoup
-from collections import deque, defaultdict
+from urllib.parse import urlparse, urlsplit, urlunparse, urlencode, quote, unquote, urljoin, parse_qs, parse_qsl
+from collections import deque, defaultdict, namedtuple, OrderedDict
+from collections.abc import Mapping, Sequence
 import re
+import threading
+import contextvars
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -42,6 +45,51 @@ warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class LazyModule:
+    """
+    ماژولی که در اولین دسترسی به یک attribute بارگذاری می‌شود
+    Module proxy that imports the real module on first attribute access
+    
+    وابستگی‌های سنگین (torch, numpy, ...) فقط وقتی مدل یا اسکنری واقعا از آن‌ها
+    استفاده کند بارگذاری می‌شوند
+    Heavy dependencies (torch, numpy, ...) are only imported once a model or
+    scanner actually uses them, keeping CLI startup within STARTUP_BUDGET.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+# وابستگی‌های سنگین با بارگذاری تنبل / Lazily imported heavy dependencies
+np = LazyModule('numpy')
+torch = LazyModule('torch')
+httpx = LazyModule('httpx')
+sqlparse = LazyModule('sqlparse')
+bs4 = LazyModule('bs4')
+
+# بودجه زمان راه‌اندازی و حافظه / Startup time and memory budget
+# import این فایل (بدون اجرای اسکن) نباید از این مقادیر بیشتر شود و هیچ‌یک از
+# ماژول‌های HEAVY_MODULES نباید بارگذاری شوند. با --check-startup بررسی می‌شود.
+# Importing this file (without running a scan) must stay within these limits
+# and must not import any of HEAVY_MODULES. Enforced by --check-startup.
+STARTUP_BUDGET = {
+    'import_seconds': 0.25,
+    'rss_mb': 64
+}
+HEAVY_MODULES = ('torch', 'numpy', 'httpx', 'sqlparse', 'bs4', 'lxml', 'transformers')
+
 class AIModelInterface(ABC):
     """
     رابط پایه برای تمام مدل‌های هوش مصنوعی
@@ -66,11 +114,169 @@ class AIModelInterface(ABC):
         """پیش‌بینی با مدل / Make prediction with model"""
         pass
     
+    def predict_batch(self, inputs):
+        """
+        پیش‌بینی دسته‌ای
+        Make predictions for a batch of inputs
+        
+        پیاده‌سازی پیش‌فرض predict را برای هر ورودی صدا می‌زند؛ مدل‌ها برای
+        پردازش برداری آن را بازنویسی کنند
+        The default loops over predict(); models override it to run the
+        whole batch in one vectorized forward pass.
+        """
+        return [self.predict(input_data) for input_data in inputs]
+    
     @abstractmethod
     def generate_payload(self, context):
         """تولید پیلود مبتنی بر context / Generate context-aware payload"""
         pass
 
+def load_weights(path, mmap=True, writable=False):
+    """
+    بارگذاری وزن‌های مدل با پشتیبانی از memory-mapping
+    Load model weights, memory-mapped where the format allows it
+    
+    فرمت‌ها / Formats:
+    - .npy: آرایه NumPy با mmap_mode='r' (یا 'c')
+    - .safetensors: آرایه‌های NumPy مستقیما روی mmap فایل (SafetensorsWeights)
+      (NumPy arrays viewing the mapped file, no copy)
+    - .pt/.pth/.bin: torch.load(mmap=True, weights_only=True)
+    
+    صفحات نگاشت شده از page cache سیستم‌عامل خوانده می‌شوند، پس چند فرایند
+    کارگر که یک فایل را نگاشت کنند فقط یک نسخه فیزیکی از وزن‌ها دارند.
+    با writable=True نگاشت copy-on-write خصوصی است: آرایه‌ها قابل نوشتن‌اند و فقط
+    صفحات نوشته شده کپی می‌شوند.
+    Mapped pages come from the OS page cache, so worker processes mapping
+    the same file share one physical copy of the weights. With writable=True
+    the mapping is private copy-on-write: arrays are writable and only the
+    pages actually written get copied. torch.load(mmap=True) is always
+    copy-on-write.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return np.load(path, mmap_mode=('c' if writable else 'r') if mmap else None)
+    if extension == '.safetensors':
+        return _load_safetensors(path, mmap, writable)
+    return torch.load(path, mmap=mmap, weights_only=True, map_location='cpu')
+
+class SafetensorsWeights(dict):
+    """
+    تنسورهای یک فایل safetensors به همراه dtype اصلی هر کدام
+    Tensors of a safetensors file, with each tensor's original dtype
+    
+    NumPy نوع bfloat16 ندارد، پس تنسورهای BF16 به صورت الگوی بیتی uint16
+    برگردانده می‌شوند؛ to_torch آن‌ها را بدون کپی به torch.bfloat16 تبدیل می‌کند و
+    bfloat16_to_float32 برای مصرف‌کنندگان NumPy است
+    NumPy has no bfloat16, so BF16 tensors come back as uint16 bit patterns;
+    to_torch() turns them into torch.bfloat16 without a copy and
+    bfloat16_to_float32() serves NumPy consumers.
+    """
+    
+    def __init__(self, tensors=(), dtypes=None):
+        super().__init__(tensors)
+        self.dtypes = dtypes or {}
+    
+    def to_torch(self):
+        """دیکشنری state برای load_state_dict / State dict for load_state_dict"""
+        state = {}
+        for name, value in self.items():
+            if self.dtypes.get(name) == 'BF16':
+                state[name] = torch.from_numpy(value.view(np.int16)).view(torch.bfloat16)
+            else:
+                state[name] = torch.from_numpy(value)
+        return state
+
+def bfloat16_to_float32(bits):
+    """تبدیل دقیق الگوی بیتی BF16 (uint16) به float32 / Exact BF16 (uint16 bits) to float32 conversion"""
+    return (np.asarray(bits, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+
+def _load_safetensors(path, mmap=True, writable=False):
+    """خواندن safetensors به صورت آرایه‌های NumPy / Read safetensors as NumPy arrays"""
+    import mmap as mmap_module
+    dtypes = {'F64': 'float64', 'F32': 'float32', 'F16': 'float16', 'BF16': 'uint16', 'I64': 'int64',
+              'I32': 'int32', 'I16': 'int16', 'I8': 'int8', 'U8': 'uint8', 'BOOL': 'bool'}
+    with open(path, 'rb') as f:
+        if mmap:
+            access = mmap_module.ACCESS_COPY if writable else mmap_module.ACCESS_READ
+            buffer = mmap_module.mmap(f.fileno(), 0, access=access)
+        else:
+            buffer = bytearray(f.read()) if writable else f.read()
+    header_size = int.from_bytes(buffer[:8], 'little')
+    header = json.loads(bytes(buffer[8:8 + header_size]))
+    base = 8 + header_size
+    tensors = SafetensorsWeights()
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        if info['dtype'] not in dtypes:
+            raise ValueError(f"Unsupported safetensors dtype '{info['dtype']}' for '{name}'")
+        dtype = np.dtype(dtypes[info['dtype']])
+        start, end = info['data_offsets']
+        tensors[name] = np.frombuffer(buffer, dtype=dtype, count=(end - start) // dtype.itemsize,
+                                      offset=base + start).reshape(info['shape'])
+        tensors.dtypes[name] = info['dtype']
+    return tensors
+
+class ModelRegistry:
+    """
+    رجیستری مشترک وزن‌های فقط‌خواندنی در هر فرایند
+    Process-wide registry of shared, read-only model weights
+    
+    مدل‌هایی که یک فایل را بارگذاری می‌کنند یک نگاشت مشترک دریافت می‌کنند. قفل
+    سراسری فقط برای جستجو گرفته می‌شود و بارگذاری‌های همزمان یک فایل یکی می‌شوند،
+    پس بارگذاری مدل‌های مختلف موازی است.
+    Models loading the same file (same path and mtime) share one mapping.
+    The registry lock only covers lookups and concurrent loads of one file
+    are merged, so unrelated models load in parallel.
+    """
+    
+    def __init__(self):
+        self._weights = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+    
+    def load(self, path, mmap=True, writable=False):
+        """
+        دریافت وزن‌های مشترک یک فایل
+        Get the shared weights for a file
+        
+        وزن‌های writable (نگاشت copy-on-write خصوصی) اشتراکی نیستند و هر بار
+        نگاشت جدیدی برمی‌گردد تا نوشتن یک مدل به مدل دیگر نرسد
+        Writable (private copy-on-write) weights are never shared: each call
+        gets its own mapping, so one model's writes never reach another.
+        """
+        path = os.path.abspath(path)
+        if writable:
+            return self._load(path, mmap, writable)
+        key = (path, os.path.getmtime(path), mmap)
+        with self._lock:
+            weights = self._weights.get(key)
+            if weights is not None:
+                return weights
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                weights = self._weights.get(key)
+            if weights is None:
+                weights = self._load(path, mmap, writable)
+                with self._lock:
+                    self._weights[key] = weights
+                    self._loading.pop(key, None)
+        return weights
+    
+    def _load(self, path, mmap, writable):
+        start = time.perf_counter()
+        weights = load_weights(path, mmap, writable)
+        logger.info(f"Loaded weights from {path} in {time.perf_counter() - start:.3f}s")
+        return weights
+    
+    def clear(self):
+        with self._lock:
+            self._weights.clear()
+
+# رجیستری پیش‌فرض این فرایند / Default registry of this process
+model_registry = ModelRegistry()
+
 class MLModel(AIModelInterface):
     """
     مدل ماشین لرنینگ پایه (برای توسعه)
@@ -82,19 +288,56 @@ class MLModel(AIModelInterface):
     
     def __init__(self):
         self.model = None
+        self.weights = None
+        self.model_path = None
         self.is_trained = False
         
-    def load_model(self, model_path=None):
+    def load_model(self, model_path=None, lazy=True):
         """
         بارگذاری مدل از فایل یا ایجاد مدل جدید
         Load model from file or create new model
         
+        وزن‌ها از طریق model_registry به صورت memory-mapped بارگذاری می‌شوند و با
+        lazy=True تا اولین پیش‌بینی به تعویق می‌افتند
+        Weights are memory-mapped through model_registry and, with lazy=True,
+        only loaded on the first prediction.
+        
         پارامترها / Parameters:
         - model_path: مسیر فایل مدل از قبل آموزش دیده (اختیاری)
+        - lazy: بارگذاری در اولین استفاده
         """
-        # TODO: پیاده‌سازی بارگذاری مدل
-        # Implement model loading logic here
-        logger.info("ML model loader initialized - Override this method in your implementation")
+        self.model_path = model_path
+        self.weights = None
+        if model_path is None:
+            logger.info("ML model loader initialized - Override this method in your implementation")
+        elif not lazy:
+            self._ensure_loaded()
+    
+    def __getstate__(self):
+        # وزن‌های فایل‌دار دوباره نگاشت می‌شوند، کپی نمی‌شوند
+        # File-backed weights are re-mapped on the other side, not copied
+        state = self.__dict__.copy()
+        if self.model_path:
+            state['weights'] = None
+        return state
+    
+    def _ensure_loaded(self):
+        """بارگذاری وزن‌ها در اولین استفاده / Load weights on first use"""
+        if self.weights is not None or not self.model_path:
+            return
+        if self.model is not None and hasattr(self.model, 'load_state_dict'):
+            # پارامترهای torch باید قابل نوشتن باشند: نگاشت copy-on-write خصوصی
+            # torch parameters must be writable: use a private copy-on-write mapping
+            weights = model_registry.load(self.model_path, writable=True)
+            if isinstance(weights, SafetensorsWeights):
+                state = weights.to_torch()
+            else:
+                state = {name: torch.from_numpy(value) if isinstance(value, np.ndarray) else value
+                         for name, value in weights.items()}
+            self.model.load_state_dict(state, assign=True)
+        else:
+            weights = model_registry.load(self.model_path)
+        self.weights = weights
         
     def train(self, training_data):
         """
@@ -117,9 +360,65 @@ class MLModel(AIModelInterface):
         پارامترها / Parameters:
         - input_data: داده‌های ورودی برای پیش‌بینی
         """
-        # TODO: پیاده‌سازی منطق پیش‌بینی
-        # Implement prediction logic here
-        return random.choice([True, False])
+        return self.predict_batch([input_data])[0]
+    
+    def featurize(self, inputs):
+        """
+        تبدیل ورودی‌ها به ماتریس ویژگی
+        Convert a batch of inputs to a float32 feature matrix
+        
+        رشته‌ها به هیستوگرام نرمال شده بایت‌ها تبدیل می‌شوند؛ برای ویژگی‌های
+        دلخواه این متد را بازنویسی کنید
+        Strings become normalized byte histograms; override for custom features.
+        """
+        if inputs and isinstance(inputs[0], (str, bytes)):
+            features = np.zeros((len(inputs), 256), dtype=np.float32)
+            for row, item in enumerate(inputs):
+                data = item.encode('utf-8', 'replace') if isinstance(item, str) else item
+                if data:
+                    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+                    features[row] = counts / len(data)
+            return features
+        return np.asarray(inputs, dtype=np.float32).reshape(len(inputs), -1)
+    
+    def predict_batch(self, inputs):
+        """
+        پیش‌بینی برداری برای یک دسته ورودی
+        Vectorized prediction for a batch of inputs
+        
+        پارامترها / Parameters:
+        - inputs: لیست ورودی‌ها
+        """
+        if not inputs:
+            return []
+        self._ensure_loaded()
+        if self.model is None and self.weights is None:
+            # بدون مدل: پاسخ ثابت «غیرآسیب‌پذیر» / No model: a fixed "not vulnerable" placeholder
+            return [False] * len(inputs)
+        
+        features = self.featurize(inputs)
+        if self.model is None:
+            return self._linear_predict(features)
+        if hasattr(self.model, 'predict'):
+            return list(self.model.predict(features))
+        with torch.inference_mode():
+            output = self.model(torch.from_numpy(features))
+        return (output.reshape(len(inputs), -1)[:, 0] > 0.5).tolist()
+    
+    def _linear_predict(self, features):
+        """
+        امتیازدهی خطی با وزن‌های بارگذاری شده
+        Linear scoring with loaded weights
+        
+        وزن‌ها یک آرایه [coef..., intercept] یا دیکشنری با کلیدهای coef و intercept هستند
+        Weights are a [coef..., intercept] array or a dict with coef/intercept.
+        """
+        if isinstance(self.weights, dict):
+            coef, intercept = self.weights['coef'], self.weights.get('intercept', 0.0)
+        else:
+            coef, intercept = self.weights[:-1], self.weights[-1]
+        return ((features @ np.asarray(coef, dtype=np.float32)).reshape(len(features), -1)[:, 0]
+                + float(np.asarray(intercept).reshape(-1)[0]) > 0).tolist()
     
     def generate_payload(self, context):
         """
@@ -145,16 +444,43 @@ class NLPModel(AIModelInterface):
     def __init__(self):
         self.model = None
         self.tokenizer = None
+        self.model_path = None
         self.is_trained = False
         
-    def load_model(self, model_path=None):
+    def load_model(self, model_path=None, lazy=True):
         """
         بارگذاری مدل و tokenizer از HuggingFace یا فایل محلی
         Load model and tokenizer from HuggingFace or local file
+        
+        اگر پوشه مدل model.safetensors داشته باشد، پارامترها مستقیما روی نگاشت
+        copy-on-write فایل قرار می‌گیرند (assign=True) و کپی نمی‌شوند
+        When the model directory has model.safetensors, parameters are
+        assigned straight onto a copy-on-write file mapping instead of
+        copied; BF16 checkpoints stay bfloat16.
         """
-        # TODO: پیاده‌سازی بارگذاری مدل‌های NLP
-        # Implement NLP model loading logic here
-        logger.info("NLP model loader initialized - Override this method")
+        self.model_path = model_path
+        if model_path is None:
+            logger.info("NLP model loader initialized - Override this method")
+        elif not lazy:
+            self._ensure_loaded()
+    
+    def _ensure_loaded(self):
+        """بارگذاری مدل در اولین استفاده / Load model on first use"""
+        if self.model is not None or not self.model_path:
+            return
+        transformers = importlib.import_module('transformers')
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(self.model_path)
+        weights_file = os.path.join(self.model_path, 'model.safetensors')
+        if os.path.exists(weights_file):
+            config = transformers.AutoConfig.from_pretrained(self.model_path)
+            model = transformers.AutoModelForSequenceClassification.from_config(config)
+            state = model_registry.load(weights_file, writable=True).to_torch()
+            result = model.load_state_dict(state, strict=False, assign=True)
+            if result.missing_keys:
+                logger.warning(f"{len(result.missing_keys)} weights missing from {weights_file}")
+        else:
+            model = transformers.AutoModelForSequenceClassification.from_pretrained(self.model_path)
+        self.model = model.eval()
         
     def train(self, training_data):
         """
@@ -171,9 +497,23 @@ class NLPModel(AIModelInterface):
         پیش‌بینی با مدل NLP
         Make prediction with NLP model
         """
-        # TODO: پیاده‌سازی پیش‌بینی متن
-        # Implement text prediction logic here
-        return "AI generated content"
+        return self.predict_batch([input_data])[0]
+    
+    def predict_batch(self, inputs):
+        """
+        پیش‌بینی دسته‌ای با یک forward pass
+        Batched prediction in a single padded forward pass
+        """
+        if not inputs:
+            return []
+        self._ensure_loaded()
+        if self.model is None or self.tokenizer is None:
+            return ["AI generated content"] * len(inputs)
+        
+        encoded = self.tokenizer(list(inputs), padding=True, truncation=True, return_tensors='pt')
+        with torch.inference_mode():
+            logits = self.model(**encoded).logits
+        return logits.argmax(dim=-1).tolist()
     
     def generate_payload(self, context):
         """
@@ -184,6 +524,476 @@ class NLPModel(AIModelInterface):
         # Implement advanced payload generation here
         return "<script>alert('AI generated')</script>"
 
+class MicroBatcher:
+    """
+    صف micro-batching برای پیش‌بینی‌های همزمان
+    Micro-batching queue for concurrent single predictions
+    
+    پیش‌بینی‌های تکی از threadها یا coroutineهای مختلف جمع شده و در یک
+    فراخوانی predict_batch اجرا می‌شوند. یک دسته با رسیدن به max_batch_size یا
+    گذشت max_wait ثانیه از اولین درخواست ارسال می‌شود.
+    Single predictions from many threads or coroutines are collected and
+    run through one predict_batch call. A batch is flushed when it reaches
+    max_batch_size or max_wait seconds after its first item arrived.
+    """
+    
+    def __init__(self, model, max_batch_size=32, max_wait=0.005, telemetry=None, name=None):
+        import queue
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.telemetry = telemetry
+        self.name = name or type(model).__name__
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+    
+    def submit(self, input_data):
+        """ثبت ورودی و بازگرداندن Future / Submit input and return a Future"""
+        from concurrent.futures import Future
+        future = Future()
+        self._queue.put((input_data, future))
+        return future
+    
+    def predict(self, input_data):
+        """پیش‌بینی تکی (مسدودکننده) / Single prediction (blocking)"""
+        return self.submit(input_data).result()
+    
+    async def apredict(self, input_data):
+        """پیش‌بینی تکی (async) / Single prediction (async)"""
+        return await asyncio.wrap_future(self.submit(input_data))
+    
+    def _worker(self):
+        import queue
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            try:
+                self._run(batch)
+            except Exception as e:
+                # thread کارگر نباید متوقف شود / The worker thread must never die
+                logger.error(f"Micro-batch for {self.name} failed: {e}")
+    
+    def _run(self, batch):
+        """
+        اجرای یک دسته
+        Run one batch
+        
+        ورودی‌هایی که فراخواننده‌شان لغو شده کنار گذاشته می‌شوند و اگر
+        predict_batch نتیجه کمتری برگرداند، Futureهای باقی‌مانده خطا می‌گیرند
+        Inputs whose callers were cancelled are dropped, and futures left
+        without a result by a short predict_batch get an error.
+        """
+        inputs, futures = [], []
+        for input_data, future in batch:
+            if future.set_running_or_notify_cancel():
+                inputs.append(input_data)
+                futures.append(future)
+        if not futures:
+            return
+        start = time.perf_counter()
+        try:
+            results = list(self.model.predict_batch(inputs))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        if self.telemetry is not None:
+            self.telemetry.observe('model_inference_seconds', time.perf_counter() - start, model=self.name)
+            self.telemetry.inc('model_predictions', len(futures), model=self.name)
+        self.batches += 1
+        self.items += len(futures)
+        for future, result in zip(futures, results):
+            future.set_result(result)
+        if len(results) < len(futures):
+            error = RuntimeError(f"{self.name}.predict_batch returned {len(results)} results "
+                                 f"for {len(futures)} inputs")
+            for future in futures[len(results):]:
+                future.set_exception(error)
+    
+    def close(self):
+        """توقف thread پس‌زمینه / Stop the background thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+class CorpusCategory:
+    """
+    یک دسته از مخزن پیلودها با فایل‌های memory-mapped
+    One payload category backed by memory-mapped files
+    
+    فایل‌ها / Files:
+    - <name>.dat: بایت‌های UTF-8 پیلودها پشت سر هم / concatenated UTF-8 payloads
+    - <name>.idx: آرایه uint64 از offset پایان هر ورودی / uint64 end offset per entry
+    - <name>.hash: هش‌های ۶۴ بیتی مرتب برای حذف تکرار / sorted 64-bit content hashes
+    
+    ورودی‌ها فقط اضافه می‌شوند، پس شماره هر ورودی ثابت می‌ماند
+    Entries are append-only, so an entry's index never changes.
+    """
+    
+    # حداکثر هش‌های جدید در حافظه پیش از نوشتن روی دیسک / New hashes held in memory before spilling to disk
+    RUN_SIZE = 262144
+    
+    def __init__(self, directory, name):
+        self.name = name
+        self.data_path = os.path.join(directory, f"{name}.dat")
+        self.index_path = os.path.join(directory, f"{name}.idx")
+        self.hash_path = os.path.join(directory, f"{name}.hash")
+        self._lock = threading.Lock()
+        self._maps = None
+        for path in (self.data_path, self.index_path, self.hash_path):
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+    
+    @staticmethod
+    def content_hash(data):
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+    
+    def _open_maps(self):
+        """نگاشت فایل‌ها در حافظه / Memory-map the data and index files"""
+        import mmap
+        size = os.path.getsize(self.index_path)
+        if self._maps is not None and self._maps[0] == size:
+            return self._maps
+        self._close_maps()
+        if size == 0:
+            self._maps = (0, None, None, None, None)
+            return self._maps
+        with open(self.index_path, 'rb') as f:
+            index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.data_path, 'rb') as f:
+            data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = memoryview(index_map).cast('Q')
+        self._maps = (size, index_map, data_map, offsets, len(offsets))
+        return self._maps
+    
+    def _close_maps(self):
+        if self._maps is not None and self._maps[1] is not None:
+            _, index_map, data_map, offsets, _ = self._maps
+            offsets.release()
+            index_map.close()
+            data_map.close()
+        self._maps = None
+    
+    def __getstate__(self):
+        # فایل‌ها در فرایند مقصد دوباره نگاشت می‌شوند / Files are re-mapped in the receiving process
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_maps'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return os.path.getsize(self.index_path) // 8
+    
+    def __getitem__(self, position):
+        _, _, data_map, offsets, count = self._open_maps()
+        if not 0 <= position < count:
+            raise IndexError(position)
+        start = offsets[position - 1] if position else 0
+        return data_map[start:offsets[position]].decode('utf-8')
+    
+    def __iter__(self):
+        return self.iter_from(0)
+    
+    def iter_from(self, start):
+        """
+        پیمایش جریانی از یک شماره ورودی
+        Stream entries starting at an entry number
+        """
+        count = self._open_maps()[4] or 0
+        for position in range(start, count):
+            yield self[position]
+    
+    def sample(self, k):
+        """نمونه‌گیری تصادفی بدون بارگذاری کل دسته / Random sample without loading the category"""
+        count = len(self)
+        return [self[position] for position in random.sample(range(count), min(k, count))]
+    
+    def _hashes(self):
+        """هش‌های مرتب موجود به صورت memory-mapped / Existing sorted hashes, memory-mapped"""
+        import array
+        import mmap
+        if os.path.getsize(self.hash_path) == 0:
+            return None, array.array('Q')
+        with open(self.hash_path, 'rb') as f:
+            hash_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return hash_map, memoryview(hash_map).cast('Q')
+    
+    def _recover(self):
+        """
+        بازیابی پس از افزودن قطع شده
+        Recover from an interrupted add
+        
+        ورودی نیمه‌نوشته .idx، ورودی‌هایی که داده آن‌ها کامل نیست و بایت‌های
+        اضافه .dat حذف می‌شوند
+        Drops a torn trailing .idx entry, entries whose data never made it to
+        .dat and any .dat bytes past the last entry.
+        
+        بازگشت / Returns:
+        - (تعداد ورودی‌ها، offset پایان داده)
+        """
+        import array
+        data_size = os.path.getsize(self.data_path)
+        count = os.path.getsize(self.index_path) // 8
+        end = 0
+        with open(self.index_path, 'r+b') as f:
+            while count:
+                f.seek((count - 1) * 8)
+                end = array.array('Q', f.read(8))[0]
+                if end <= data_size:
+                    break
+                count -= 1
+            else:
+                end = 0
+            f.truncate(count * 8)
+        with open(self.data_path, 'r+b') as f:
+            f.truncate(end)
+        return count, end
+    
+    def _raw_entries(self, start):
+        """بایت‌های ورودی‌ها از یک شماره / Raw bytes of the entries from an entry number"""
+        _, _, data_map, offsets, count = self._open_maps()
+        for position in range(start, count or 0):
+            yield data_map[offsets[position - 1] if position else 0:offsets[position]]
+    
+    def _spill(self, values, number):
+        """نوشتن یک دسته مرتب هش روی دیسک و نگاشت آن / Write a sorted hash run to disk and map it"""
+        import array
+        import mmap
+        path = f"{self.hash_path}.run{number}"
+        with open(path, 'wb') as f:
+            if isinstance(values, list):
+                array.array('Q', values).tofile(f)
+            else:
+                chunk = array.array('Q')
+                for value in values:
+                    chunk.append(value)
+                    if len(chunk) >= 65536:
+                        chunk.tofile(f)
+                        chunk = array.array('Q')
+                chunk.tofile(f)
+        with open(path, 'rb') as f:
+            run_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return path, run_map, memoryview(run_map).cast('Q')
+    
+    def add(self, payloads):
+        """
+        افزودن افزایشی؛ فقط پیلودهای جدید نوشته می‌شوند
+        Incrementally append payloads; only unseen content is written
+        
+        هش‌های جدید در دسته‌های مرتب RUN_SIZE تایی روی دیسک نگهداری می‌شوند، پس
+        حافظه مستقل از حجم ورودی است. ورودی‌هایی که افزودن قطع شده پیش از به‌روزرسانی
+        .hash نوشته بود دوباره هش می‌شوند تا تکراری وارد نشوند.
+        New hashes are kept in sorted on-disk runs of RUN_SIZE, so memory
+        does not grow with the input. Entries written by an add that stopped
+        before updating .hash are re-hashed first, so they are not imported twice.
+        
+        بازگشت / Returns:
+        - تعداد ورودی‌های جدید / Number of new entries
+        """
+        import array
+        import bisect
+        import heapq
+        with self._lock:
+            self._close_maps()
+            count, end = self._recover()
+            hash_map, existing = self._hashes()
+            views, runs, current = [existing], [], set()
+            numbers = itertools.count()
+            
+            def contains(value):
+                if value in current:
+                    return True
+                for view in views:
+                    position = bisect.bisect_left(view, value)
+                    if position < len(view) and view[position] == value:
+                        return True
+                return False
+            
+            def remember(value):
+                current.add(value)
+                if len(current) < self.RUN_SIZE:
+                    return
+                runs.append(self._spill(sorted(current), next(numbers)))
+                current.clear()
+                # دسته‌های هم‌اندازه ادغام می‌شوند تا تعداد آن‌ها لگاریتمی بماند
+                # Merge equally sized runs so their number stays logarithmic
+                while len(runs) > 1 and len(runs[-1][2]) >= len(runs[-2][2]):
+                    newer, older = runs.pop(), runs.pop()
+                    runs.append(self._spill(heapq.merge(older[2], newer[2]), next(numbers)))
+                    for path, run_map, view in (older, newer):
+                        view.release()
+                        run_map.close()
+                        os.remove(path)
+                views[1:] = [run[2] for run in runs]
+            
+            added = 0
+            changed = len(existing) < count
+            temp_path = self.hash_path + '.tmp'
+            try:
+                # ورودی‌های بدون هش از افزودن قطع شده / Entries left unhashed by an interrupted add
+                for data in self._raw_entries(len(existing)):
+                    remember(self.content_hash(data))
+                self._close_maps()
+                
+                with open(self.data_path, 'r+b') as data_file, open(self.index_path, 'ab') as index_file:
+                    data_file.seek(end)
+                    offsets = array.array('Q')
+                    for payload in payloads:
+                        data = payload.encode('utf-8') if isinstance(payload, str) else payload
+                        if not data:
+                            continue
+                        value = self.content_hash(data)
+                        if contains(value):
+                            continue
+                        remember(value)
+                        added += 1
+                        data_file.write(data)
+                        end += len(data)
+                        offsets.append(end)
+                        if len(offsets) >= 4096:
+                            data_file.flush()
+                            offsets.tofile(index_file)
+                            offsets = array.array('Q')
+                    data_file.flush()
+                    offsets.tofile(index_file)
+                
+                if added or changed:
+                    with open(temp_path, 'wb') as f:
+                        chunk = array.array('Q')
+                        for value in heapq.merge(*views, sorted(current)):
+                            chunk.append(value)
+                            if len(chunk) >= 65536:
+                                chunk.tofile(f)
+                                chunk = array.array('Q')
+                        chunk.tofile(f)
+            finally:
+                self._close_maps()
+                if hash_map is not None:
+                    existing.release()
+                    hash_map.close()
+                for path, run_map, view in runs:
+                    view.release()
+                    run_map.close()
+                    os.remove(path)
+            if added or changed:
+                os.replace(temp_path, self.hash_path)
+            return added
+    
+    def close(self):
+        with self._lock:
+            self._close_maps()
+
+class PayloadCorpus:
+    """
+    مخزن پیلودهای ایندکس شده و بدون تکرار
+    Indexed, content-deduplicated payload corpus
+    
+    هر دسته (sql, xss, rce, lfi, ...) فایل‌های جداگانه خود را دارد
+    Every category (sql, xss, rce, lfi, ...) has its own set of files.
+    """
+    
+    CATEGORIES = ('sql', 'xss', 'rce', 'lfi')
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self._categories = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def category(self, name):
+        """دسترسی به یک دسته / Access one category"""
+        if not re.fullmatch(r"[\w-]+", name):
+            raise ValueError(f"Invalid corpus category '{name}'")
+        with self._lock:
+            if name not in self._categories:
+                self._categories[name] = CorpusCategory(self.directory, name)
+            return self._categories[name]
+    
+    def categories(self):
+        """دسته‌های موجود روی دیسک / Categories present on disk"""
+        names = {name[:-4] for name in os.listdir(self.directory) if name.endswith('.idx')}
+        return sorted(names.union(self._categories))
+    
+    def add(self, name, payloads):
+        """افزودن پیلودها به یک دسته / Append payloads to a category"""
+        return self.category(name).add(payloads)
+    
+    def stats(self):
+        return {name: len(self.category(name)) for name in self.categories()}
+    
+    def close(self):
+        with self._lock:
+            for category in self._categories.values():
+                category.close()
+
+class TrainingBatches:
+    """
+    نمای جریانی یک بازه از ورودی‌های یک دسته برای آموزش
+    Streaming view over a range of one category's entries, for training
+    
+    پیمایش، لیست‌هایی حداکثر به اندازه batch_size تولید می‌کند و کل بازه هرگز
+    در حافظه نگه داشته نمی‌شود
+    Iterating yields lists of at most batch_size payloads; the range is never
+    held in memory as a whole.
+    """
+    
+    def __init__(self, category, start=0, end=None, batch_size=256):
+        self.category = category
+        self.start = start
+        self.end = len(category) if end is None else end
+        self.batch_size = batch_size
+    
+    def __len__(self):
+        return max(0, self.end - self.start)
+    
+    def __iter__(self):
+        entries = self.entries()
+        while True:
+            batch = list(itertools.islice(entries, self.batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def entries(self):
+        """پیمایش تک‌به‌تک ورودی‌های بازه / Iterate the range one entry at a time"""
+        return itertools.islice(self.category.iter_from(self.start), len(self))
+    
+    def to_dataloader(self, **kwargs):
+        """
+        DataLoader تورچ روی همین دسته‌ها
+        torch DataLoader over the same batches
+        """
+        from torch.utils.data import DataLoader, IterableDataset
+        batches = self
+        
+        class _BatchDataset(IterableDataset):
+            def __iter__(self):
+                return iter(batches)
+        
+        return DataLoader(_BatchDataset(), batch_size=None, **kwargs)
+
 class TrainingDataAPI:
     """
     رابط API برای اتصال داده‌های آموزشی از منابع خارجی
@@ -202,8 +1012,9 @@ class TrainingDataAPI:
         - api_config: دیکشنری تنظیمات API (URL, کلیدها و غیره)
         """
         self.api_config = api_config or {}
-        self.cache_dir = "training_data_cache"
+        self.cache_dir = self.api_config.get('cache_dir', "training_data_cache")
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.corpus = PayloadCorpus(self.cache_dir)
     
     def fetch_training_data(self, data_type="all"):
         """
@@ -230,6 +1041,18 @@ class TrainingDataAPI:
             "lfi": ["../../etc/passwd"]
         }.get(data_type, [])
     
+    def sync_training_data(self, data_type="all"):
+        """
+        ذخیره داده‌های API در مخزن محلی (فقط ورودی‌های جدید)
+        Store API data in the local corpus, appending only new entries
+        
+        بازگشت / Returns:
+        - دیکشنری دسته -> تعداد ورودی‌های جدید
+        """
+        categories = PayloadCorpus.CATEGORIES if data_type == "all" else (data_type,)
+        return {category: self.corpus.add(category, self.fetch_training_data(category))
+                for category in categories}
+    
     def load_local_data(self, file_path):
         """
         بارگذاری داده‌های آموزشی از فایل محلی
@@ -242,151 +1065,4558 @@ class TrainingDataAPI:
             logger.error(f"Error loading local data: {e}")
             return []
     
-    def update_model_training(self, model_instance):
+    def iter_local_data(self, file_path):
         """
-        آموزش مدل با جدیدترین داده‌های API
-        Train model with latest API data
+        بارگذاری جریانی داده‌های آموزشی از فایل محلی
+        Stream training data from local file, one stripped line at a time
+        
+        برخلاف load_local_data فایل در حافظه بارگذاری نمی‌شود؛ خطاها هنگام پیمایش
+        رخ می‌دهند
+        Unlike load_local_data the file is never held in memory; errors are
+        raised while iterating.
         """
-        training_data = self.fetch_training_data("all")
-        if training_data:
-            model_instance.train(training_data)
-            return True
-        return False
-
-class VulnerabilityScanner(ABC):
-    """
-    رابط پایه برای تمام اسکنرهای آسیب‌پذیری
-    Base interface for all vulnerability scanners
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
     
-    برای اضافه کردن نوع جدید آسیب‌پذیری، این کلاس را توسعه دهید
-    Extend this class to add new vulnerability types
-    """
+    def import_local_data(self, file_path, category):
+        """
+        افزودن فایل محلی (wordlist) به یک دسته از مخزن
+        Import a local wordlist into a corpus category
+        
+        بازگشت / Returns:
+        - تعداد ورودی‌های جدید / Number of new entries
+        """
+        try:
+            added = self.corpus.add(category, self.iter_local_data(file_path))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading local data: {e}")
+            return 0
+        logger.info(f"Imported {added} new '{category}' payloads from {file_path}")
+        return added
     
-    @abstractmethod
-    def scan(self, target_url, parameters):
-        """اسکن هدف برای آسیب‌پذیری خاص / Scan target for specific vulnerability"""
-        pass
+    def training_data(self):
+        """
+        نمای دسته‌های مخزن برای آموزش
+        Corpus category views for training
+        
+        بازگشت / Returns:
+        - دیکشنری دسته -> CorpusCategory (قابل پیمایش و نمونه‌گیری)
+        """
+        return {name: self.corpus.category(name) for name in self.corpus.categories()}
     
-    @abstractmethod
-    def validate_finding(self, response, payload):
-        """اعتبارسنجی یافته‌ها / Validate findings"""
-        pass
-
-class SQLInjectionScanner(VulnerabilityScanner):
-    """اسکنر تزریق SQL / SQL Injection Scanner"""
+    def pending_training_data(self, model_key, batch_size=None):
+        """
+        ورودی‌های جدید مخزن از آخرین آموزش یک مدل
+        Corpus entries added since a model was last trained
+        
+        پارامترها / Parameters:
+        - model_key: نام مدل (کلید watermark)
+        - batch_size: اندازه هر دسته (پیش‌فرض از api_config)
+        
+        بازگشت / Returns:
+        - دیکشنری دسته -> TrainingBatches (فقط دسته‌های دارای داده جدید)
+        """
+        batch_size = batch_size or self.api_config.get('batch_size', 256)
+        watermark = self.watermark(model_key)
+        pending = {}
+        for name, view in self.training_data().items():
+            count = len(view)
+            start = watermark.get(name, 0)
+            if start > count:
+                # مخزن بازسازی شده است / The corpus was rebuilt
+                start = 0
+            if count > start:
+                pending[name] = TrainingBatches(view, start, count, batch_size)
+        return pending
     
-    def scan(self, target_url, parameters):
-        # TODO: پیاده‌سازی منطق اسکن SQL
-        # Implement SQL scanning logic here
-        logger.info(f"Scanning {target_url} for SQL injection")
-        return {"vulnerable": False, "payload": "", "evidence": ""}
+    def _watermark_path(self, model_key):
+        return os.path.join(self.cache_dir, 'watermarks', re.sub(r"[^\w-]", "_", model_key) + '.json')
     
-    def validate_finding(self, response, payload):
-        # TODO: پیاده‌سازی منطق اعتبارسنجی
-        # Implement validation logic here
-        return False
-
-class RCEScanner(VulnerabilityScanner):
-    """اسکنر اجرای کد از راه دور / Remote Code Execution Scanner"""
+    def watermark(self, model_key):
+        """
+        تعداد ورودی‌های آموزش دیده هر دسته برای یک مدل
+        Per-category count of entries a model has already been trained on
+        """
+        try:
+            with open(self._watermark_path(model_key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
     
-    def scan(self, target_url, parameters):
-        # TODO: پیاده‌سازی منطق اسکن RCE
-        # Implement RCE scanning logic here
-        logger.info(f"Scanning {target_url} for RCE")
-        return {"vulnerable": False, "payload": "", "evidence": ""}
+    def advance_watermark(self, model_key, ends):
+        """
+        ثبت پیشرفت آموزش یک مدل (جایگزینی اتمی فایل)
+        Record a model's training progress, replacing the file atomically
+        
+        پارامترها / Parameters:
+        - ends: دیکشنری دسته -> شماره ورودی پایانی آموزش دیده
+        """
+        path = self._watermark_path(model_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        watermark = self.watermark(model_key)
+        watermark.update(ends)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(watermark, f)
+        os.replace(temp_path, path)
     
-    def validate_finding(self, response, payload):
-        # TODO: پیاده‌سازی منطق اعتبارسنجی
-        # Implement validation logic here
-        return False
-
-# =============================================================================
-# ماژول‌های هسته فریمورک / Framework Core Modules
-# =============================================================================
+    def update_model_training(self, model_instance, model_key=None, sync=True):
+        """
+        آموزش افزایشی مدل فقط با داده‌های جدید از آخرین اجرا
+        Incrementally train a model on the data added since its last run
+        
+        پارامترها / Parameters:
+        - model_instance: نمونه مدل
+        - model_key: نام مدل برای watermark (پیش‌فرض نام کلاس)
+        - sync: دریافت داده‌های API پیش از آموزش
+        
+        بازگشت / Returns:
+        - True اگر داده جدیدی برای آموزش وجود داشت
+        """
+        if sync:
+            self.sync_training_data("all")
+        model_key = model_key or type(model_instance).__name__
+        pending = self.pending_training_data(model_key)
+        if not pending:
+            logger.info(f"No new training data for '{model_key}'")
+            return False
+        model_instance.train(pending)
+        _keep_trained_state(model_instance)
+        self.advance_watermark(model_key, {name: batches.end for name, batches in pending.items()})
+        return True
 
-class AdvancedHTTPxClient:
+class SignatureMatch:
     """
-    کلاینت HTTP پیشرفته برای درخواست‌های وب
-    Advanced HTTP client for web requests
-    
-    این ماژول نیازی به تغییر ندارد مگر برای ویژگی‌های خاص
-    This module doesn't need modification unless for specific features
+    یک تطبیق امضا با رابط مشابه re.Match
+    One signature hit, with an re.Match-like interface
     """
     
-    def __init__(self):
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
-        }
+    def __init__(self, signature, string, start, end):
+        self.signature = signature
+        self.string = string
+        self._start = start
+        self._end = end
     
-    def robust_request(self, url, method="GET", **kwargs):
-        """ارسال درخواست وب با مدیریت خطا / Send web request with error handling"""
-        try:
-            with httpx.Client(timeout=30) as client:
-                response = client.request(method, url, **kwargs)
-                return response
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
-            return None
+    def start(self):
+        return self._start
+    
+    def end(self):
+        return self._end
+    
+    def span(self):
+        return self._start, self._end
+    
+    def group(self, index=0):
+        if index != 0:
+            raise IndexError("no such group")
+        return self.string[self._start:self._end]
+    
+    def __repr__(self):
+        return f"<SignatureMatch {self.signature!r} span={self.span()} match={self.group()!r}>"
 
-class WAFEvasionExpert:
+class SignatureMatcher:
     """
-    متخصص دور زدن WAF
-    WAF Evasion Expert
+    تطبیق تک‌گذره یک مجموعه کامل از امضاهای شواهد
+    Single-pass matcher for a whole set of evidence signatures
+    
+    امضاهای رشته‌ای و «لنگر» رشته‌ای هر regex در یک خودکاره Aho–Corasick قرار
+    می‌گیرند (pyahocorasick در صورت نصب، وگرنه یک regex درختی زیر lookahead که
+    تمام تطبیق‌های همپوشان را گزارش می‌کند). هر regex فقط وقتی اجرا می‌شود که
+    لنگرش در بدنه دیده شود و regexهای بدون لنگر در یک regex ترکیبی اجرا می‌شوند.
+    Literal signatures and the literal every regex signature requires (its
+    anchor) go into one Aho–Corasick automaton: pyahocorasick when
+    installed, otherwise a trie-shaped regex under a lookahead that reports
+    every overlapping hit. A regex only runs on bodies containing its
+    anchor; regexes without one share a combined alternation with a named
+    group each.
+    
+    امضا یک دیکشنری {'name', 'literal'} یا {'name', 'regex'[, 'ignore_case']} است.
+    A signature is a {'name', 'literal'} or {'name', 'regex'[, 'ignore_case']}
+    dict; regexes must not use named groups or backreferences. Invalid
+    signatures raise ValueError naming the offending signature.
+    
+    مجموعه با load() یا با تغییر فایل path (هر check_interval ثانیه) به صورت
+    اتمی جایگزین می‌شود
+    The set is swapped atomically by load(), or when the JSON file at path
+    changes (checked at most every check_interval seconds).
+    """
+    
+    MIN_ANCHOR = 3
+    # پرچم‌های سراسری ابتدای الگو، مانند (?i) / Global flags at the start of a pattern, like (?i)
+    GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+    
+    def __init__(self, signatures=None, path=None, ignore_case=True, check_interval=5.0):
+        """
+        پارامترها / Parameters:
+        - signatures: لیست امضاها
+        - path: فایل JSON امضاها برای بارگذاری مجدد خودکار (اختیاری)
+        - ignore_case: تطبیق بدون حساسیت به حروف (پیش‌فرض امضاها)
+        - check_interval: فاصله بررسی تغییر فایل (ثانیه)
+        """
+        self.ignore_case = ignore_case
+        self.path = path
+        self.check_interval = check_interval
+        self.signatures = list(signatures or [])
+        self._compiled = None
+        self._mtime = None
+        self._checked = float('-inf')
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.signatures)
+    
+    def load(self, signatures):
+        """
+        جایگزینی اتمی مجموعه امضاها (جستجوهای در حال اجرا نسخه قبلی را می‌بینند)
+        Atomically replace the signature set; running scans keep the old one
+        """
+        signatures = list(signatures)
+        compiled = self._compile(signatures)
+        with self._lock:
+            self.signatures = signatures
+            self._compiled = compiled
+        logger.info(f"Loaded {len(signatures)} signatures ({compiled['backend']})")
+    
+    def load_file(self, path):
+        """بارگذاری از فایل JSON (لیست یا JSON lines) / Load from a JSON list or JSON lines file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        stripped = text.lstrip()
+        if stripped.startswith('['):
+            signatures = json.loads(text)
+        else:
+            signatures = [json.loads(line) for line in text.splitlines() if line.strip()]
+        mtime = os.path.getmtime(path)
+        self.load(signatures)
+        self.path, self._mtime = path, mtime
+    
+    def reload_if_changed(self):
+        """
+        بارگذاری مجدد در صورت تغییر فایل path
+        Reload when the file at path has changed
+        
+        در صورت خطا مجموعه قبلی حفظ می‌شود
+        On errors the previous set stays in place.
+        """
+        self._checked = time.monotonic()
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.load_file(self.path)
+                return True
+        except (OSError, ValueError, KeyError, re.error) as e:
+            logger.error(f"Error reloading signatures from {self.path}: {e}")
+        return False
+    
+    def _state(self):
+        if self.path and time.monotonic() - self._checked >= self.check_interval:
+            self.reload_if_changed()
+        state = self._compiled
+        if state is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._compiled = self._compile(self.signatures)
+                state = self._compiled
+        return state
+    
+    @staticmethod
+    def _literal_runs(pattern, flags):
+        """
+        رشته‌های ثابتی که regex حتما شامل آنهاست
+        Literal runs the regex always contains
+        
+        از parser داخلی re استفاده می‌کند؛ اگر در دسترس نباشد یا تجزیه شکست بخورد
+        لیست خالی برمی‌گرداند و regex در regex ترکیبی بدون لنگر اجرا می‌شود
+        Uses re's private parser; when it is unavailable or fails, returns []
+        so the regex falls back to the combined residual alternation.
+        """
+        try:
+            parser = importlib.import_module('re._parser')
+        except ImportError:
+            try:
+                parser = importlib.import_module('sre_parse')
+            except ImportError:
+                return []
+        runs, run = [], []
+        
+        def walk(items):
+            for op, value in items:
+                if op is parser.LITERAL:
+                    run.append(chr(value))
+                    continue
+                if op is parser.SUBPATTERN and not any(inner[0] is parser.BRANCH for inner in value[-1]):
+                    walk(value[-1])
+                    continue
+                runs.append(''.join(run))
+                run.clear()
+        
+        try:
+            walk(parser.parse(pattern, flags))
+        except Exception as e:
+            logger.debug(f"No literal anchor for {pattern!r}: {e}")
+            return []
+        runs.append(''.join(run))
+        return [run for run in runs if run]
+    
+    @classmethod
+    def _scoped(cls, regex):
+        """
+        الگوی regex با پرچم‌هایش به صورت گروه محدود، برای قرار گرفتن در regex ترکیبی
+        The regex as a scoped-flag group, safe to embed in a combined regex
+        
+        پرچم‌های سراسری مانند (?i) فقط در ابتدای کل regex مجازند، پس از الگو حذف و
+        به گروه منتقل می‌شوند
+        Global flags like (?i) are only legal at the very start of a regex,
+        so they are stripped from the pattern and moved onto the group.
+        """
+        pattern = regex.pattern
+        while True:
+            match = cls.GLOBAL_FLAGS.match(pattern)
+            if match is None:
+                break
+            pattern = pattern[match.end():]
+        enabled = ''.join(letter for letter, flag in (('a', re.ASCII), ('i', re.IGNORECASE),
+                                                      ('m', re.MULTILINE), ('s', re.DOTALL), ('x', re.VERBOSE))
+                          if regex.flags & flag)
+        disabled = ''.join(letter for letter in 'imsx' if letter not in enabled)
+        return f"(?{enabled}{'-' + disabled if disabled else ''}:{pattern})"
+    
+    @staticmethod
+    def _trie_pattern(words):
+        """regex درختی (پیشوندهای مشترک ادغام شده) / Trie-shaped regex with shared prefixes merged"""
+        trie = {}
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = True
+        
+        def build(node):
+            branches = [re.escape(char) + build(node[char]) for char in sorted(key for key in node if key)]
+            if not branches:
+                return ''
+            if len(branches) == 1 and '' not in node:
+                return branches[0]
+            return '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
+        
+        return build(trie)
+    
+    def _compile(self, signatures):
+        literals = defaultdict(list)
+        anchored = defaultdict(list)
+        regexes, runs, residual, names, exact = {}, {}, [], [], {}
+        for index, signature in enumerate(signatures):
+            try:
+                names.append(signature['name'])
+                if 'literal' in signature:
+                    literals[signature['literal'].lower()].append(index)
+                    exact[index] = signature['literal']
+                    continue
+                flags = re.IGNORECASE if signature.get('ignore_case', self.ignore_case) else 0
+                regex = regexes[index] = re.compile(signature['regex'], flags)
+                if regex.groupindex:
+                    raise ValueError("named groups are not supported")
+                re.compile(self._scoped(regex))
+            except (KeyError, TypeError, AttributeError, ValueError, re.error) as e:
+                name = signature.get('name') if isinstance(signature, dict) else None
+                raise ValueError(f"Invalid signature #{index} ({name!r}): {e}") from e
+            runs[index] = {run.lower() for run in self._literal_runs(signature['regex'], flags)
+                           if len(run) >= self.MIN_ANCHOR}
+        
+        # لنگر هر regex کمیاب‌ترین (و سپس طولانی‌ترین) رشته آن در کل مجموعه است
+        # تا یک تطبیق، regexهای زیادی را نامزد نکند
+        # Each regex is anchored on its rarest (then longest) run across the
+        # set, so one hit does not make many regexes candidates.
+        frequency = defaultdict(int)
+        for index_runs in runs.values():
+            for run in index_runs:
+                frequency[run] += 1
+        for index, index_runs in runs.items():
+            if index_runs:
+                anchored[min(index_runs, key=lambda run: (frequency[run], -len(run), run))].append(index)
+            else:
+                residual.append(index)
+        
+        keys = sorted(set(literals).union(anchored))
+        state = {'names': names, 'literals': dict(literals), 'anchored': dict(anchored), 'exact': exact,
+                 'regexes': regexes, 'automaton': None, 'trie': None, 'prefixes': None, 'residual': None}
+        try:
+            import ahocorasick
+            automaton = ahocorasick.Automaton()
+            for key in keys:
+                automaton.add_word(key, key)
+            if keys:
+                automaton.make_automaton()
+                state['automaton'] = automaton
+            state['backend'] = 'pyahocorasick'
+        except ImportError:
+            state['backend'] = 'trie-regex'
+        if keys:
+            # تمام لنگرهایی که پیشوند یک تطبیق هستند هم در همان نقطه تطبیق دارند
+            # Every key that prefixes a hit also occurs at the same position
+            key_set = set(keys)
+            state['prefixes'] = {key: [key[:size] for size in range(1, len(key) + 1) if key[:size] in key_set]
+                                 for key in keys}
+            state['trie'] = re.compile(f"(?=((?i:{self._trie_pattern(keys)})))")
+        if residual:
+            state['residual'] = re.compile('|'.join(
+                f"(?P<s{index}>{self._scoped(regexes[index])})" for index in residual))
+        return state
+    
+    def _hits(self, state, text):
+        """(کلید، شروع) برای تمام تطبیق‌های همپوشان / (key, start) of every overlapping hit"""
+        if state['automaton'] is not None:
+            lowered = text.lower()
+            if len(lowered) == len(text):
+                for end, key in state['automaton'].iter(lowered):
+                    yield key, end - len(key) + 1
+                return
+        if state['trie'] is None:
+            return
+        prefixes = state['prefixes']
+        for match in state['trie'].finditer(text):
+            for key in prefixes.get(match.group(1).lower(), ()):
+                yield key, match.start()
+    
+    def finditer(self, text):
+        """
+        تمام تطبیق‌ها به ترتیب موقعیت (یک گذر روی بدنه به علاوه تایید regexهای نامزد)
+        All hits in position order: one pass over the body, plus verification
+        of the candidate regexes whose anchor occurred
+        """
+        state = self._state()
+        names, matches, candidates = state['names'], [], set()
+        for key, start in self._hits(state, text):
+            for index in state['literals'].get(key, ()):
+                if self.ignore_case or text.startswith(state['exact'][index], start):
+                    matches.append(SignatureMatch(names[index], text, start, start + len(key)))
+            candidates.update(state['anchored'].get(key, ()))
+        for index in candidates:
+            matches.extend(SignatureMatch(names[index], text, match.start(), match.end())
+                           for match in state['regexes'][index].finditer(text))
+        if state['residual'] is not None:
+            for match in state['residual'].finditer(text):
+                matches.append(SignatureMatch(names[int(match.lastgroup[1:])], text, match.start(), match.end()))
+        matches.sort(key=SignatureMatch.start)
+        return iter(matches)
+    
+    def search(self, text):
+        """اولین تطبیق یا None / Earliest hit or None"""
+        return next(self.finditer(text), None)
+    
+    def matches(self, text):
+        """نام امضاهای تطبیق یافته / Names of the signatures that matched"""
+        return {match.signature for match in self.finditer(text)}
+    
+    def stats(self):
+        state = self._state()
+        return {
+            'signatures': len(state['names']),
+            'literals': sum(map(len, state['literals'].values())),
+            'anchored_regexes': sum(map(len, state['anchored'].values())),
+            'residual_regexes': len(state['regexes']) - sum(map(len, state['anchored'].values())),
+            'backend': state['backend']
+        }
+
+class VulnerabilityScanner(ABC):
+    """
+    رابط پایه برای تمام اسکنرهای آسیب‌پذیری
+    Base interface for all vulnerability scanners
+    
+    برای اضافه کردن نوع جدید آسیب‌پذیری، این کلاس را توسعه دهید
+    Extend this class to add new vulnerability types
+    """
+    
+    @abstractmethod
+    def scan(self, target_url, parameters):
+        """اسکن هدف برای آسیب‌پذیری خاص / Scan target for specific vulnerability"""
+        pass
+    
+    @abstractmethod
+    def validate_finding(self, response, payload):
+        """اعتبارسنجی یافته‌ها / Validate findings"""
+        pass
+    
+    async def ascan(self, target_url, parameters):
+        """
+        نسخه async اسکن (اختیاری)
+        Async variant of scan (optional)
+        
+        اسکنرهای غیرهمزمان این متد را بازنویسی می‌کنند؛ در غیر این صورت
+        متد scan در یک thread جداگانه اجرا می‌شود
+        Async-native scanners override this; otherwise the synchronous scan
+        runs in a worker thread so it does not block the event loop.
+        """
+        return await asyncio.to_thread(self.scan, target_url, parameters)
+    
+    # پیلودهای اسکنر؛ هر کدام برای هر پارامتر یک واحد کار جدا (و جدا checkpoint شده) است
+    # The scanner's payloads; each is its own (separately checkpointed) work unit per parameter
+    PAYLOADS = ()
+    
+    def payload_variants(self, target_url):
+        """
+        گونه‌های پیلود که برنامه‌ریز برای هر پارامتر یک واحد کار جدا می‌سازد
+        Payload variants the planner turns into separate work units per parameter
+
+        پیش‌فرض PAYLOADS است و بدون آن ('',): یک واحد برای هر پارامتر و انتخاب
+        پیلود با خود scan()
+        Defaults to PAYLOADS; without any, ('',) plans one unit per parameter
+        and leaves payload choice to scan().
+        """
+        return tuple(self.PAYLOADS) or ('',)
+    
+    def scan_variant(self, target_url, parameters, payload=''):
+        """
+        اسکن پارامترها با یک گونه پیلود
+        Scan parameters with one payload variant
+        
+        اسکنرهای دارای PAYLOADS این متد را بازنویسی می‌کنند تا فقط همان پیلود
+        ارسال شود؛ پیش‌فرض کل scan() را اجرا می‌کند
+        Scanners listing PAYLOADS override this to send only `payload`; the
+        default runs the whole scan().
+        """
+        return self.scan(target_url, parameters)
+    
+    # موتور اثرانگشت و WAFEvasionExpert مشترک (هنگام ثبت توسط فریمورک تنظیم می‌شوند)
+    # Shared FingerprintEngine and WAFEvasionExpert, attached on registration
+    fingerprints = None
+    waf_evasion = None
+    
+    def response_delta(self, response):
+        """
+        متن جدید پاسخ نسبت به baseline همان endpoint
+        Text the response adds relative to its endpoint baseline
+        
+        اگر اثرانگشت پاسخ با baseline یکسان باشد رشته خالی برمی‌گرداند
+        Returns '' when the fingerprint matches the baseline; without an
+        engine the (bounded) body itself is returned.
+        """
+        if self.fingerprints is None:
+            return response.text[:FingerprintEngine.MAX_DIFF_CHARS]
+        return self.fingerprints.delta(response)
+    
+    # الگوی شواهد برای validate_stream (در زیرکلاس‌ها تنظیم می‌شود)
+    # Evidence pattern used by validate_stream, set by subclasses
+    EVIDENCE_PATTERN = None
+    STREAM_OVERLAP = 512
+    
+    def validate_stream(self, chunks, url, payload, max_body_size=10 * 1024 * 1024, status_code=200):
+        """
+        اعتبارسنجی جریانی: بدنه فقط تا اولین شاهد جدید خوانده می‌شود
+        Streaming validation: the body is consumed only until new evidence shows up
+        
+        شاهدی که در نمونه baseline همان endpoint هم وجود دارد نادیده گرفته می‌شود.
+        پس از تصمیم، فراخواننده می‌تواند جریان را زودتر با release() ببندد.
+        اسکنرهای بدون EVIDENCE_PATTERN بدنه را تا max_body_size بافر می‌کنند و
+        validate_finding را صدا می‌زنند
+        Matches also present in the endpoint's baseline sample are ignored.
+        Once this returns, the caller can release() the stream early.
+        Scanners without an EVIDENCE_PATTERN buffer the body up to
+        max_body_size and fall back to validate_finding.
+        
+        پارامترها / Parameters:
+        - chunks: تکه‌های متنی بدنه (مثلا AdvancedHTTPxClient.iter_text)
+        - url: URL درخواست (برای یافتن baseline)
+        - payload: پیلود ارسال شده
+        - max_body_size: سقف بافر در حالت جایگزین (کاراکتر، None = بدون سقف)
+        - status_code: کد وضعیت پاسخ برای حالت جایگزین
+        """
+        if self.EVIDENCE_PATTERN is None:
+            return self._validate_buffered(chunks, url, payload, max_body_size, status_code)
+        baseline = self.fingerprints.baseline(url) if self.fingerprints is not None else None
+        baseline_text = baseline[1] if baseline else ''
+        tail = ''
+        for chunk in chunks:
+            window = tail + chunk
+            for match in self.EVIDENCE_PATTERN.finditer(window):
+                if match.group(0) not in baseline_text:
+                    return True
+            tail = window[-self.STREAM_OVERLAP:]
+        return False
+    
+    def _validate_buffered(self, chunks, url, payload, max_body_size, status_code):
+        """بافر بدنه و فراخوانی validate_finding / Buffer the body and call validate_finding"""
+        parts = []
+        size = 0
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk)
+            if max_body_size is not None and size >= max_body_size:
+                break
+        text = ''.join(parts)
+        if max_body_size is not None:
+            text = text[:max_body_size]
+        response = httpx.Response(status_code, text=text, request=httpx.Request('GET', url))
+        return bool(self.validate_finding(response, payload))
+
+class SQLInjectionScanner(VulnerabilityScanner):
+    """اسکنر تزریق SQL / SQL Injection Scanner"""
+    
+    # امضاهای خطای پایگاه داده / DBMS error signatures
+    ERROR_SIGNATURES = SignatureMatcher([
+        {'name': 'mysql-syntax', 'regex': r"SQL syntax.*?MySQL"},
+        {'name': 'mysql-warning', 'regex': r"Warning.*?\Wmysqli?_"},
+        {'name': 'mysql-result', 'literal': "valid MySQL result"},
+        {'name': 'mysql-manual', 'literal': "check the manual that corresponds to your MySQL"},
+        {'name': 'mysql-exception', 'literal': "MySqlException"},
+        {'name': 'mysql-jdbc', 'literal': "com.mysql.jdbc"},
+        {'name': 'mariadb-manual', 'literal': "check the manual that corresponds to your MariaDB"},
+        {'name': 'postgresql-error', 'regex': r"PostgreSQL.*?ERROR"},
+        {'name': 'postgresql-warning', 'regex': r"Warning.*?\Wpg_"},
+        {'name': 'postgresql-unterminated', 'literal': "unterminated quoted string at or near"},
+        {'name': 'postgresql-jdbc', 'literal': "org.postgresql.util.PSQLException"},
+        {'name': 'oracle-error', 'regex': r"ORA-\d{5}"},
+        {'name': 'oracle-unterminated', 'literal': "quoted string not properly terminated"},
+        {'name': 'mssql-oledb', 'literal': "Microsoft OLE DB Provider for SQL Server"},
+        {'name': 'mssql-odbc', 'literal': "[Microsoft][ODBC SQL Server Driver]"},
+        {'name': 'mssql-unclosed', 'literal': "Unclosed quotation mark"},
+        {'name': 'mssql-syntax', 'regex': r"Incorrect syntax near '[^']*'"},
+        {'name': 'mssql-sqlclient', 'literal': "System.Data.SqlClient.SqlException"},
+        {'name': 'sqlite-jdbc', 'literal': "SQLite/JDBCDriver"},
+        {'name': 'sqlite-python', 'literal': "sqlite3.OperationalError"},
+        {'name': 'sqlite-error', 'literal': "SQLITE_ERROR"},
+        {'name': 'db2-error', 'regex': r"DB2 SQL error.*?SQLCODE"},
+        {'name': 'firebird-error', 'literal': "Dynamic SQL Error"},
+        {'name': 'pdo-sqlstate', 'literal': "SQLSTATE["},
+    ])
+    EVIDENCE_PATTERN = ERROR_SIGNATURES
+    
+    def scan(self, target_url, parameters):
+        # TODO: پیاده‌سازی منطق اسکن SQL
+        # Implement SQL scanning logic here
+        logger.info(f"Scanning {target_url} for SQL injection")
+        return {"vulnerable": False, "payload": "", "evidence": ""}
+    
+    def validate_finding(self, response, payload):
+        """
+        پاسخ معتبر است اگر خطای پایگاه داده‌ای نشان دهد که در baseline نبوده
+        Valid when the response shows a DBMS error absent from the baseline
+        """
+        if response is None:
+            return False
+        delta = self.response_delta(response)
+        return bool(delta and self.EVIDENCE_PATTERN.search(delta))
+
+class RCEScanner(VulnerabilityScanner):
+    """اسکنر اجرای کد از راه دور / Remote Code Execution Scanner"""
+    
+    # امضاهای خروجی دستورات سیستمی / Command output signatures
+    OUTPUT_SIGNATURES = SignatureMatcher([
+        {'name': 'unix-id', 'regex': r"uid=\d+\([\w.-]+\)\s+gid=\d+"},
+        {'name': 'unix-passwd', 'regex': r"root:[x*]?:0:0:"},
+        {'name': 'unix-passwd-daemon', 'regex': r"daemon:[x*]?:1:1:"},
+        {'name': 'unix-uname', 'regex': r"Linux \S+ \d+\.\d+\.\d+\S* #\d+"},
+        {'name': 'windows-ipconfig', 'literal': "Windows IP Configuration"},
+        {'name': 'windows-dir', 'literal': "Volume Serial Number is"},
+        {'name': 'windows-boot-ini', 'literal': "[boot loader]"},
+        {'name': 'windows-whoami', 'literal': "nt authority\\system"},
+        {'name': 'windows-ver', 'regex': r"Microsoft Windows \[Version \d+\.\d+"},
+    ])
+    EVIDENCE_PATTERN = OUTPUT_SIGNATURES
+    
+    def scan(self, target_url, parameters):
+        # TODO: پیاده‌سازی منطق اسکن RCE
+        # Implement RCE scanning logic here
+        logger.info(f"Scanning {target_url} for RCE")
+        return {"vulnerable": False, "payload": "", "evidence": ""}
+    
+    def validate_finding(self, response, payload):
+        """
+        پاسخ معتبر است اگر خروجی دستور سیستمی در آن ظاهر شود که در baseline نبوده
+        Valid when command output absent from the baseline shows up
+        """
+        if response is None:
+            return False
+        delta = self.response_delta(response)
+        return bool(delta and self.EVIDENCE_PATTERN.search(delta))
+
+# =============================================================================
+# ماژول‌های هسته فریمورک / Framework Core Modules
+# =============================================================================
+
+class Histogram:
+    """
+    هیستوگرام با سطل‌های ثابت (تجمعی در خروجی OpenMetrics)
+    Fixed-bucket histogram, exported cumulatively as OpenMetrics
+    """
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value):
+        import bisect
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+class _StageTimer:
+    """زمان‌سنج یک مرحله (context manager) / Times one stage as a context manager"""
+    
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+class MetricsRegistry:
+    """
+    شمارنده‌ها و هیستوگرام‌های مراحل اسکن با خروجی OpenMetrics
+    Scan stage counters and histograms with OpenMetrics export
+    
+    در حالت غیرفعال تمام متدها بدون هزینه برمی‌گردند و timer یک context
+    manager خالی مشترک است
+    When disabled every method returns immediately and timer() hands out a
+    shared no-op context manager.
+    
+    پارامترها / Parameters:
+    - enabled: فعال بودن ثبت متریک
+    - buckets: مرزهای سطل هیستوگرام (ثانیه)
+    - namespace: پیشوند نام متریک‌ها
+    - export_path: فایل OpenMetrics که پس از هر اسکن نوشته می‌شود (اختیاری)
+    """
+    
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+    
+    def __init__(self, enabled=True, buckets=None, namespace="ai_hacker", export_path=None):
+        import contextlib
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self.namespace = namespace
+        self.export_path = export_path
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self._null_timer = contextlib.nullcontext()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        """ساخت از config['metrics'] (True، dict یا False) / Build from config['metrics']"""
+        if not config:
+            return cls(enabled=False)
+        return cls(**({} if config is True else config))
+    
+    def inc(self, name, value=1, **labels):
+        """افزایش یک شمارنده / Increment a counter"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+    
+    def observe(self, name, value, **labels):
+        """ثبت یک مقدار در هیستوگرام / Record a value in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+    
+    def timer(self, name, **labels):
+        """زمان‌سنجی یک بلوک with / Time a with-block into a histogram"""
+        if not self.enabled:
+            return self._null_timer
+        return _StageTimer(self, name, labels)
+    
+    def instrument(self, func, name, **labels):
+        """
+        پیچیدن یک تابع با timer (در حالت غیرفعال خود تابع برمی‌گردد)
+        Wrap a callable with a timer; returned unchanged when disabled
+        """
+        if not self.enabled:
+            return func
+        import functools
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _StageTimer(self, name, labels):
+                return func(*args, **kwargs)
+        
+        return wrapper
+    
+    def snapshot(self):
+        """
+        کپی ساده متریک‌ها
+        Plain copy of the metrics
+        
+        بازگشت / Returns:
+        - {'counters': {name: [{labels, value}]}, 'histograms': {name: [{labels, count, sum, buckets}]}}
+        """
+        with self._lock:
+            counters = defaultdict(list)
+            for (name, labels), value in self.counters.items():
+                counters[name].append({'labels': dict(labels), 'value': value})
+            histograms = defaultdict(list)
+            for (name, labels), histogram in self.histograms.items():
+                histograms[name].append({'labels': dict(labels), 'count': histogram.count,
+                                         'sum': histogram.sum, 'buckets': list(histogram.counts)})
+        return {'counters': dict(counters), 'histograms': dict(histograms)}
+    
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                   for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+    
+    def to_openmetrics(self):
+        """متن OpenMetrics (سازگار با Prometheus) / OpenMetrics (Prometheus-compatible) text"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, list(h.counts), h.count, h.sum) for key, h in self.histograms.items())
+        lines = []
+        declared = None
+        for (name, labels), value in counters:
+            metric = f"{self.namespace}_{name}"
+            if metric != declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared = metric
+            lines.append(f"{metric}_total{self._labels(labels)} {value:g}")
+        for (name, labels), counts, count, total in histograms:
+            metric = f"{self.namespace}_{name}"
+            if metric != declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared = metric
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float('inf') else f"{bound:g}"
+                lines.append(f"{metric}_bucket{self._labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{metric}_count{self._labels(labels)} {count}")
+            lines.append(f"{metric}_sum{self._labels(labels)} {total:g}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path=None):
+        """نوشتن فایل OpenMetrics (جایگزینی اتمی) / Write the OpenMetrics file atomically"""
+        path = path or self.export_path
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_openmetrics())
+        os.replace(temp_path, path)
+        return path
+    
+    def serve(self, port=9464, host="127.0.0.1"):
+        """
+        ارائه /metrics روی HTTP در thread پس‌زمینه
+        Serve /metrics over HTTP from a background thread
+        
+        بازگشت / Returns:
+        - ThreadingHTTPServer (با shutdown() متوقف می‌شود)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.to_openmetrics().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", registry.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+    
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+class TokenBucket:
+    """
+    سطل توکن برای محدودسازی نرخ درخواست
+    Token bucket used to cap the request rate
+    
+    توکن‌ها به صورت رزرو برداشته می‌شوند تا نسخه sync و async یکسان رفتار کنند
+    Tokens are reserved up front (the balance may go negative) so sync and
+    async callers share the same bucket and simply sleep for their delay.
+    """
+    
+    def __init__(self, rate, burst=None):
+        """
+        پارامترها / Parameters:
+        - rate: تعداد درخواست مجاز در ثانیه
+        - burst: حداکثر توکن ذخیره شده (پیش‌فرض: rate)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self):
+        """رزرو یک توکن و بازگرداندن زمان انتظار / Reserve one token and return wait time"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self):
+        """دریافت توکن (مسدودکننده) / Acquire a token (blocking)"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def async_acquire(self):
+        """دریافت توکن (async) / Acquire a token (async)"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class SharedTokenBucket(TokenBucket):
+    """
+    سطل توکن مشترک بین کارگرها (وضعیت در صف کار)
+    Token bucket whose state lives in a shared WorkQueue backend
+    
+    نرخ هر میزبان برای تمام کارگرها و گره‌ها با هم اعمال می‌شود، نه برای هر کارگر
+    The host's rate holds across all workers and nodes together rather than
+    per worker.
+    """
+    
+    def __init__(self, backend, host, rate, burst=None):
+        super().__init__(rate, burst)
+        self.backend = backend
+        self.host = host
+    
+    def _reserve(self):
+        return self.backend.reserve(self.host, self.rate, self.burst)
+    
+    async def async_acquire(self):
+        """
+        دریافت توکن (async)؛ رزرو در صف مشترک I/O همگام است و در thread اجرا می‌شود
+        Acquire a token (async); the shared reservation is blocking I/O, so it runs in a thread
+        """
+        delay = await asyncio.to_thread(self._reserve)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class AdaptiveConcurrencyController:
+    """
+    کنترل‌کننده همزمانی تطبیقی (AIMD)
+    Adaptive (AIMD) concurrency controller for a single host
+    
+    تا زمانی که p95 تاخیر ثابت بماند سقف همزمانی به صورت جمعی افزایش می‌یابد و
+    با 429/503، timeout یا افزایش تاخیر به صورت ضربی کاهش می‌یابد
+    The in-flight limit grows additively while p95 latency stays close to
+    the best p95 observed, and shrinks multiplicatively on 429/503,
+    transport errors or latency inflation.
+    """
+    
+    BACKOFF_STATUSES = (429, 503)
+    
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64,
+                 decrease_factor=0.5, latency_tolerance=1.5, latency_slack=0.01,
+                 window=50):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_slack = latency_slack
+        self.latencies = deque(maxlen=window)
+        self.baseline_p95 = None
+        self.in_flight = 0
+        self.requests = 0
+        self.backoffs = 0
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+    
+    def _has_capacity(self):
+        return self.in_flight < max(int(self.limit), self.min_limit)
+    
+    def acquire(self):
+        """گرفتن یک جایگاه (مسدودکننده) / Take an in-flight slot (blocking)"""
+        with self._condition:
+            while not self._has_capacity():
+                self._condition.wait()
+            self.in_flight += 1
+    
+    async def async_acquire(self):
+        """گرفتن یک جایگاه (async) / Take an in-flight slot (async)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._has_capacity():
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+            self._async_waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # جایگاه پیش از لغو تحویل شده بود / The slot was granted just before the cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+    
+    def _grant(self, future):
+        """تحویل جایگاه به waiter async / Hand a slot to an async waiter"""
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+    
+    def _wake(self):
+        """بیدار کردن waiterها در صورت وجود ظرفیت / Wake waiters while capacity remains"""
+        while self._async_waiters and self._has_capacity():
+            loop, future = self._async_waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+        self._condition.notify_all()
+    
+    def release(self):
+        """آزادسازی جایگاه بدون ثبت نتیجه / Release a slot without recording an outcome"""
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+    
+    def record(self, latency, status=None, error=False):
+        """
+        ثبت نتیجه درخواست و تنظیم سقف همزمانی
+        Record request outcome, adjust the limit and release the slot
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            if error or status in self.BACKOFF_STATUSES:
+                self._decrease()
+            else:
+                self.latencies.append(latency)
+                p95 = self._p95()
+                if p95 is not None:
+                    if self.baseline_p95 is None or p95 < self.baseline_p95:
+                        self.baseline_p95 = p95
+                    if p95 > self.baseline_p95 * self.latency_tolerance + self.latency_slack:
+                        self._decrease()
+                    else:
+                        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._wake()
+    
+    def _decrease(self):
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.latencies.clear()
+        self.backoffs += 1
+    
+    def _p95(self):
+        if len(self.latencies) < 10:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+    
+    def metrics(self):
+        """وضعیت کنترل‌کننده / Controller state"""
+        with self._lock:
+            return {
+                'concurrency_limit': self.limit,
+                'in_flight': self.in_flight,
+                'p95_latency': self._p95(),
+                'baseline_p95_latency': self.baseline_p95,
+                'requests': self.requests,
+                'backoffs': self.backoffs
+            }
+
+class RequestScheduler:
+    """
+    زمان‌بند درخواست به ازای هر میزبان
+    Per-host request scheduler (token bucket + adaptive concurrency)
+    
+    نرخ هر میزبان از config['rate_limits'][host] یا config['rate_limit'] خوانده می‌شود
+    Each host gets its own rate from config['rate_limits'][host], falling
+    back to config['rate_limit'] (None means unlimited). With rate_backend
+    set to a WorkQueue, the buckets are shared by every worker of the queue.
+    """
+    
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.rate_limit = self.config.get('rate_limit')
+        self.rate_limits = self.config.get('rate_limits', {})
+        self.rate_burst = self.config.get('rate_burst')
+        self.adaptive = self.config.get('adaptive_concurrency', {})
+        self.rate_backend = None
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _state(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                rate = self.rate_limits.get(host, self.rate_limit)
+                bucket = None
+                if rate and self.rate_backend is not None:
+                    bucket = SharedTokenBucket(self.rate_backend, host, rate, self.rate_burst)
+                elif rate:
+                    bucket = TokenBucket(rate, self.rate_burst)
+                controller = None
+                if self.adaptive is not False:
+                    controller = AdaptiveConcurrencyController(**(self.adaptive or {}))
+                state = self._hosts[host] = (bucket, controller)
+        return state
+    
+    def acquire(self, url):
+        """انتظار برای مجوز ارسال / Wait until the request may be sent"""
+        bucket, controller = self._state(url)
+        if controller:
+            controller.acquire()
+        if bucket:
+            try:
+                bucket.acquire()
+            except BaseException:
+                if controller:
+                    controller.release()
+                raise
+        return controller
+    
+    async def async_acquire(self, url):
+        """
+        انتظار async برای مجوز ارسال
+        Async wait until the request may be sent
+        
+        در صورت لغو حین انتظار برای توکن، جایگاه همزمانی آزاد می‌شود
+        A cancellation while waiting for a token gives the concurrency slot back.
+        """
+        bucket, controller = self._state(url)
+        if controller:
+            await controller.async_acquire()
+        if bucket:
+            try:
+                await bucket.async_acquire()
+            except BaseException:
+                if controller:
+                    controller.release()
+                raise
+        return controller
+    
+    def metrics(self):
+        """متریک‌های هر میزبان / Per-host metrics"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        result = {}
+        for host, (bucket, controller) in hosts.items():
+            entry = controller.metrics() if controller else {}
+            entry['rate_limit'] = bucket.rate if bucket else None
+            result[host] = entry
+        return result
+
+def normalize_url(url):
+    """
+    نرمال‌سازی URL برای مقایسه و کلید کش
+    Normalize a URL for comparison and cache keys
+    
+    scheme و host کوچک می‌شوند، پورت پیش‌فرض و fragment حذف و query مرتب می‌شود
+    Lowercases scheme/host, drops default ports and the fragment and sorts
+    the query string.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, parsed.port) in (('http', 80), ('https', 443)):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, query, ''))
+
+class ResponseCache:
+    """
+    کش پاسخ‌های HTTP با حذف LRU بر اساس حجم
+    HTTP response cache with byte-bounded LRU eviction
+    
+    ورودی‌ها در حافظه نگهداری می‌شوند و در صورت تنظیم disk_dir، ورودی‌های حذف شده
+    روی دیسک ذخیره می‌شوند. ورودی‌های منقضی با ETag/Last-Modified اعتبارسنجی می‌شوند.
+    Entries live in memory; with disk_dir set, evicted entries spill to an
+    on-disk tier. Entries older than ttl are revalidated with
+    If-None-Match/If-Modified-Since when the response carried validators.
+    """
+    
+    VARY_HEADERS = ('accept', 'accept-language', 'authorization', 'cookie')
+    STRIP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+    
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=60, disk_dir=None,
+                 methods=('GET', 'HEAD'), vary_headers=None):
+        """
+        پارامترها / Parameters:
+        - max_bytes: حداکثر حجم بدنه‌های نگهداری شده در حافظه
+        - ttl: مدت تازه ماندن ورودی بدون اعتبارسنجی (ثانیه)
+        - disk_dir: پوشه لایه دیسکی (اختیاری)
+        - methods: متدهای قابل کش
+        - vary_headers: هدرهای موثر در کلید کش
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.methods = methods
+        self.vary_headers = vary_headers or self.VARY_HEADERS
+        self.entries = OrderedDict()
+        self.size = 0
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+    
+    def make_key(self, request):
+        """
+        ساخت کلید کش از (متد، URL نرمال، هدرهای مرتبط، هش بدنه)
+        Build cache key from (method, normalized URL, relevant headers, body hash)
+        
+        برای درخواست‌های غیرقابل کش None برمی‌گرداند
+        Returns None when the request is not cacheable.
+        """
+        if request.method not in self.methods:
+            return None
+        try:
+            body = request.content
+        except Exception:
+            return None
+        parts = [request.method, normalize_url(str(request.url))]
+        parts.extend(f"{name}:{request.headers.get(name, '')}" for name in self.vary_headers)
+        parts.append(hashlib.sha256(body).hexdigest() if body else '')
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """دریافت ورودی از حافظه یا دیسک / Get entry from memory or disk"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+        entry = self._disk_read(key)
+        if entry is not None:
+            self.record('disk_hits')
+            self._store(key, entry)
+        return entry
+    
+    def record(self, name):
+        """افزایش یک شمارنده کش (thread-safe) / Increment a cache counter, thread-safely"""
+        with self._lock:
+            self.counters[name] += 1
+    
+    def is_fresh(self, entry):
+        return time.monotonic() - entry['stored_at'] < self.ttl
+    
+    def conditional_headers(self, entry):
+        """هدرهای اعتبارسنجی شرطی / Conditional revalidation headers"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def put(self, key, response):
+        """ذخیره پاسخ موفق در کش / Store a successful response"""
+        if response.status_code != 200:
+            return
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+        entry = {
+            'status': response.status_code,
+            'headers': [(k, v) for k, v in response.headers.items()
+                        if k.lower() not in self.STRIP_HEADERS],
+            'content': content,
+            'method': response.request.method,
+            'url': str(response.request.url),
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'stored_at': time.monotonic()
+        }
+        self.record('stores')
+        self._store(key, entry)
+    
+    def touch(self, key, entry):
+        """تمدید ورودی پس از پاسخ 304 / Refresh entry after a 304"""
+        with self._lock:
+            entry['stored_at'] = time.monotonic()
+            self.counters['revalidations'] += 1
+    
+    def _store(self, key, entry):
+        evicted = []
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous['content'])
+            self.entries[key] = entry
+            self.size += len(entry['content'])
+            while self.size > self.max_bytes and self.entries:
+                old_key, old_entry = self.entries.popitem(last=False)
+                self.size -= len(old_entry['content'])
+                self.counters['evictions'] += 1
+                evicted.append((old_key, old_entry))
+        for old_key, old_entry in evicted:
+            self._disk_write(old_key, old_entry)
+    
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.cache")
+    
+    def _disk_write(self, key, entry):
+        if not self.disk_dir:
+            return
+        meta = {k: v for k, v in entry.items() if k not in ('content', 'stored_at')}
+        try:
+            with open(self._disk_path(key), 'wb') as f:
+                f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                f.write(entry['content'])
+        except OSError as e:
+            logger.error(f"Error writing cache entry: {e}")
+    
+    def _disk_read(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                meta = json.loads(f.readline())
+                meta['content'] = f.read()
+        except (OSError, ValueError):
+            return None
+        # ورودی دیسکی همیشه نیاز به اعتبارسنجی دارد / Disk entries always revalidate
+        meta['stored_at'] = float('-inf')
+        return meta
+    
+    def to_response(self, entry):
+        """بازسازی httpx.Response از ورودی کش / Rebuild httpx.Response from entry"""
+        return httpx.Response(
+            entry['status'],
+            headers=entry['headers'],
+            content=entry['content'],
+            request=httpx.Request(entry['method'], entry['url'])
+        )
+    
+    def stats(self):
+        """شمارنده‌های کش / Cache counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats.update(entries=len(self.entries), bytes=self.size)
+        for name in ('hits', 'misses', 'revalidations', 'stores', 'evictions', 'disk_hits'):
+            stats.setdefault(name, 0)
+        return stats
+
+class RequestCoalescer:
+    """
+    ادغام درخواست‌های یکسان همزمان با نگهداری کوتاه‌مدت نتیجه
+    Coalesce identical in-flight requests and briefly memoize the result
+    
+    اولین درخواست از هر نوع (leader) ارسال می‌شود و درخواست‌های یکسانی که در
+    همین حین می‌رسند پاسخ همان را دریافت می‌کنند. پاسخ تا memo_ttl ثانیه به
+    درخواست‌های یکسان بعدی هم داده می‌شود. کلید آن بایت‌های دقیق درخواست است.
+    probeها (memoize=False) فقط در حین ارسال ادغام می‌شوند، چون probeهای
+    زمانی و تاییدی باید پاسخ تازه ببینند.
+    The first request of a kind (the leader) goes to the network and
+    identical requests arriving meanwhile share its response, which is also
+    handed to identical requests for memo_ttl seconds. It keys on the exact
+    request bytes. Probes (memoize=False) only share in-flight requests,
+    since time-based and confirmation probes must see a fresh response.
+    Failures, 429s and 5xx responses are shared in flight but not memoized.
+    """
+    
+    def __init__(self, memo_ttl=2.0, max_entries=1024, max_body=1024 * 1024, methods=('GET', 'HEAD')):
+        """
+        پارامترها / Parameters:
+        - memo_ttl: مدت نگهداری نتیجه (ثانیه، 0 = فقط ادغام همزمان)
+        - max_entries: حداکثر تعداد نتایج نگهداری شده
+        - max_body: بدنه‌های بزرگتر نگهداری نمی‌شوند (بایت)
+        - methods: متدهای قابل ادغام
+        """
+        self.memo_ttl = memo_ttl
+        self.max_entries = max_entries
+        self.max_body = max_body
+        self.methods = methods
+        self.in_flight = {}
+        self.memo = OrderedDict()
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def make_key(self, request):
+        """
+        کلید از متد، URL دقیق، تمام هدرها و بدنه
+        Key over the method, exact URL, every header and the body
+        
+        برای درخواست‌های غیرقابل ادغام None برمی‌گرداند
+        Returns None when the request cannot be coalesced.
+        """
+        if request.method not in self.methods:
+            return None
+        try:
+            body = request.content
+        except Exception:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{request.method} {request.url}".encode('utf-8'))
+        for name, value in request.headers.raw:
+            digest.update(b"\0" + name + b":" + value)
+        digest.update(b"\0" + body)
+        return digest.digest()
+    
+    def _claim(self, key, memoize=True):
+        """
+        بازگشت ('memo', پاسخ)، ('wait', Future) یا ('lead', Future)
+        Return ('memo', response), ('wait', future) or ('lead', future)
+        """
+        from concurrent.futures import Future
+        with self._lock:
+            memo = self.memo.get(key) if memoize else None
+            if memo is not None:
+                if memo[0] > time.monotonic():
+                    self.counters['memo_hits'] += 1
+                    return 'memo', memo[1]
+                del self.memo[key]
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.counters['coalesced'] += 1
+                return 'wait', future
+            future = self.in_flight[key] = Future()
+            self.counters['sent'] += 1
+            return 'lead', future
+    
+    def _complete(self, key, future, response, memoize=True):
+        with self._lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+            if (memoize and response is not None and self.memo_ttl > 0 and response.status_code != 429
+                    and response.status_code < 500 and len(response.content) <= self.max_body):
+                self.memo[key] = (time.monotonic() + self.memo_ttl, response)
+                self.memo.move_to_end(key)
+                while len(self.memo) > self.max_entries:
+                    self.memo.popitem(last=False)
+        if not future.done():
+            future.set_result(response)
+    
+    def request(self, key, send, memoize=True):
+        """
+        ارسال از طریق ادغام‌کننده
+        Send through the coalescer
+        
+        پارامترها / Parameters:
+        - key: خروجی make_key
+        - send: تابع بدون آرگومان که درخواست را ارسال می‌کند
+        - memoize: False برای probeها (فقط ادغام همزمان)
+        """
+        kind, value = self._claim(key, memoize)
+        if kind == 'memo':
+            return value
+        if kind == 'wait':
+            return value.result()
+        response = None
+        try:
+            response = send()
+        finally:
+            self._complete(key, value, response, memoize)
+        return response
+    
+    async def arequest(self, key, send, memoize=True):
+        """نسخه async؛ send یک coroutine function است / Async variant; send is a coroutine function"""
+        kind, value = self._claim(key, memoize)
+        if kind == 'memo':
+            return value
+        if kind == 'wait':
+            # لغو یک منتظر نباید Future مشترک leader را لغو کند
+            # Cancelling one waiter must not cancel the leader's shared future
+            return await asyncio.shield(asyncio.wrap_future(value))
+        response = None
+        try:
+            response = await send()
+        finally:
+            self._complete(key, value, response, memoize)
+        return response
+    
+    def stats(self):
+        """شمارنده‌های ادغام / Coalescing counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats.update(in_flight=len(self.in_flight), entries=len(self.memo))
+        for name in ('sent', 'coalesced', 'memo_hits'):
+            stats.setdefault(name, 0)
+        return stats
+
+class DNSCache:
+    """
+    کش DNS درون‌فرایندی با رعایت TTL و کش منفی
+    In-process DNS cache honoring record TTLs, with negative caching
+    
+    نمونه مشترک dns_cache بین تمام کلاینت‌ها استفاده می‌شود تا هر نام فقط یک بار
+    در هر TTL از resolver سیستم پرسیده شود. با نصب dnspython یک جستجوی
+    resolve_name هم آدرس‌ها (A و AAAA) و هم TTL رکورد را می‌دهد؛ در غیر این
+    صورت یا برای نام‌هایی که DNS پاسخ نمی‌دهد (مثل /etc/hosts) getaddrinfo با
+    ttl پیش‌فرض استفاده می‌شود. خطای «نام وجود ندارد» به مدت negative_ttl
+    نگهداری می‌شود ولی خطاهای موقت نه.
+    The shared dns_cache instance serves every client that opts in so each
+    name reaches the resolver once per TTL. With dnspython installed a single
+    resolve_name call supplies both the addresses (A and AAAA) and the record
+    TTL; without it, or for names DNS doesn't answer (e.g. /etc/hosts
+    entries), getaddrinfo is used with the default ttl. "No such name"
+    answers are cached for negative_ttl seconds, transient failures are not
+    cached.
+    """
+    
+    NEGATIVE_ERRORS = ('EAI_NONAME', 'EAI_NODATA')
+    
+    def __init__(self, ttl=60.0, negative_ttl=10.0, min_ttl=1.0, max_ttl=3600.0, max_entries=4096, resolver=None):
+        """
+        پارامترها / Parameters:
+        - ttl: TTL پیش‌فرض وقتی TTL رکورد در دسترس نیست (ثانیه)
+        - negative_ttl: مدت نگهداری پاسخ‌های منفی (ثانیه)
+        - min_ttl, max_ttl: محدوده مجاز TTL رکوردها
+        - max_entries: حداکثر تعداد نام‌های نگهداری شده
+        - resolver: تابع (host, port) -> (آدرس‌ها، ttl یا None) به جای getaddrinfo (اختیاری)
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.max_entries = max_entries
+        self.resolver = resolver
+        self.entries = OrderedDict()
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+        self._host_locks = {}
+    
+    def configure(self, **options):
+        """تغییر تنظیمات (برای نمونه مشترک) / Change settings, e.g. of the shared instance"""
+        for name, value in options.items():
+            if name not in ('ttl', 'negative_ttl', 'min_ttl', 'max_ttl', 'max_entries', 'resolver'):
+                raise TypeError(f"Unknown DNS cache option '{name}'")
+            setattr(self, name, value)
+        return self
+    
+    @staticmethod
+    def is_address(host):
+        """host یک آدرس IP است / host is an IP literal"""
+        import ipaddress
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return True
+    
+    def resolve(self, host, port=0):
+        """
+        آدرس‌های IP یک نام از کش یا resolver
+        IP addresses of a name, from the cache or the resolver
+        
+        درخواست‌های همزمان برای یک نام فقط یک جستجو انجام می‌دهند
+        Concurrent lookups of the same name share a single resolver call.
+        
+        بازگشت / Returns:
+        - لیست آدرس‌ها؛ برای نام‌های ناموجود socket.gaierror
+        """
+        if self.is_address(host):
+            return [host]
+        host = host.lower()
+        entry = self._cached(host)
+        if entry is None:
+            with self._lock:
+                host_lock = self._host_locks.setdefault(host, threading.Lock())
+            with host_lock:
+                entry = self._cached(host)
+                if entry is None:
+                    entry = self._fetch(host, port)
+            with self._lock:
+                self._host_locks.pop(host, None)
+        expires, addresses, error = entry
+        if error is not None:
+            import socket
+            raise socket.gaierror(*error)
+        return addresses
+    
+    async def aresolve(self, host, port=0):
+        """نسخه async؛ جستجو در thread انجام می‌شود / Async variant; lookups run in a thread"""
+        if self.is_address(host):
+            return [host]
+        entry = self._cached(host.lower())
+        if entry is None:
+            return await asyncio.to_thread(self.resolve, host, port)
+        if entry[2] is not None:
+            import socket
+            raise socket.gaierror(*entry[2])
+        return entry[1]
+    
+    def _cached(self, host):
+        with self._lock:
+            entry = self.entries.get(host)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[host]
+                return None
+            self.entries.move_to_end(host)
+            self.counters['negative_hits' if entry[2] is not None else 'hits'] += 1
+            return entry
+    
+    def _fetch(self, host, port):
+        import socket
+        with self._lock:
+            self.counters['misses'] += 1
+        try:
+            addresses, ttl = self._lookup(host, port)
+        except socket.gaierror as e:
+            if e.errno not in {getattr(socket, name, None) for name in self.NEGATIVE_ERRORS}:
+                raise
+            entry = (time.monotonic() + self.negative_ttl, None, e.args)
+        else:
+            ttl = self.ttl if ttl is None else min(max(ttl, self.min_ttl), self.max_ttl)
+            entry = (time.monotonic() + ttl, addresses, None)
+        with self._lock:
+            self.entries[host] = entry
+            self.entries.move_to_end(host)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+    
+    def _lookup(self, host, port):
+        """
+        جستجوی واقعی نام
+        Resolve a name for real
+        
+        بازگشت / Returns:
+        - (لیست آدرس‌ها، TTL رکورد یا None)
+        """
+        if self.resolver is not None:
+            return self.resolver(host, port)
+        import socket
+        try:
+            import dns.resolver
+        except ImportError:
+            pass
+        else:
+            try:
+                answers = dns.resolver.resolve_name(host, lifetime=2.0)
+            except Exception:
+                # نام‌های /etc/hosts یا خطای DNS: getaddrinfo تصمیم می‌گیرد
+                # /etc/hosts names or DNS failures: let getaddrinfo decide
+                pass
+            else:
+                return list(answers.addresses()), min(answer.rrset.ttl for answer in answers.values())
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos)), None
+    
+    def clear(self):
+        """خالی کردن کش / Drop every cached name"""
+        with self._lock:
+            self.entries.clear()
+    
+    def stats(self):
+        """شمارنده‌های کش DNS / DNS cache counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self.entries)
+        for name in ('hits', 'negative_hits', 'misses'):
+            stats.setdefault(name, 0)
+        return stats
+
+dns_cache = DNSCache()
+
+# زمان‌بندی درخواست جاری (برای ثبت زمان DNS از backend شبکه)
+# Timings of the request in flight, so the network backend can add DNS time
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+class RequestTimings:
+    """
+    زمان مراحل یک درخواست از رویدادهای trace در httpcore
+    Per-phase timings of one request, collected from httpcore trace events
+    
+    dns، connect و tls فقط برای اتصال‌های جدید مقدار دارند و برای اتصال‌های
+    استفاده مجدد از pool برابر None هستند. ttfb از شروع ارسال هدرها تا دریافت
+    هدرهای پاسخ است و زمان برقراری اتصال را شامل نمی‌شود.
+    dns, connect and tls are only set for new connections and stay None when
+    a pooled connection is reused. ttfb runs from sending the request headers
+    to receiving the response headers, so it excludes connection setup.
+    """
+    
+    __slots__ = ('dns', 'connect', 'tls', 'ttfb', '_marks')
+    PHASES = ('dns', 'connect', 'tls', 'ttfb')
+    
+    def __init__(self):
+        self.dns = self.connect = self.tls = self.ttfb = None
+        self._marks = {}
+    
+    def trace(self, name, info):
+        """callback برای extensions['trace'] / Callback for extensions['trace']"""
+        prefix, _, edge = name.rpartition('.')
+        phase = prefix.rpartition('.')[2]
+        now = time.perf_counter()
+        if edge == 'started':
+            self._marks[phase] = now
+        elif edge == 'complete' and phase in self._marks:
+            if phase == 'connect_tcp':
+                self.connect = now - self._marks[phase] - (self.dns or 0.0)
+            elif phase == 'start_tls':
+                self.tls = now - self._marks[phase]
+            elif phase == 'receive_response_headers':
+                self.ttfb = now - self._marks.get('send_request_headers', self._marks[phase])
+    
+    async def atrace(self, name, info):
+        """نسخه async برای کلاینت async / Async callback for the async client"""
+        self.trace(name, info)
+    
+    def add_dns(self, seconds):
+        self.dns = (self.dns or 0.0) + seconds
+    
+    @property
+    def reused(self):
+        """درخواست روی اتصال موجود pool ارسال شد / Sent on an already pooled connection"""
+        return 'connect_tcp' not in self._marks
+    
+    def as_dict(self):
+        timings = {phase: getattr(self, phase) for phase in self.PHASES}
+        timings['reused'] = self.reused
+        return timings
+
+class _ResolvingBackend:
+    """
+    پوشش backend شبکه httpcore که نام‌ها را از DNSCache حل می‌کند
+    Wraps an httpcore network backend to resolve names through a DNSCache
+    
+    اتصال به ترتیب به آدرس‌های نام تلاش می‌شود. TLS (SNI و بررسی گواهی) با
+    نام اصلی انجام می‌شود چون httpcore آن را جداگانه به start_tls می‌دهد.
+    Addresses are tried in order. TLS (SNI and certificate checks) still
+    uses the original name, which httpcore passes to start_tls separately.
+    """
+    
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+    
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+    
+    def _connect_error(self, host, error):
+        import httpcore
+        return httpcore.ConnectError(f"Could not resolve '{host}': {error}")
+    
+    def _record_dns(self, start):
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add_dns(time.perf_counter() - start)
+    
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        import httpcore
+        start = time.perf_counter()
+        try:
+            addresses = self.cache.resolve(host, port)
+        except OSError as e:
+            raise self._connect_error(host, e) from e
+        finally:
+            self._record_dns(start)
+        error = self._connect_error(host, "no addresses")
+        for address in addresses:
+            try:
+                return self.backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        raise error
+
+class _AsyncResolvingBackend(_ResolvingBackend):
+    """نسخه async از _ResolvingBackend / Async variant of _ResolvingBackend"""
+    
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        import httpcore
+        start = time.perf_counter()
+        try:
+            addresses = await self.cache.aresolve(host, port)
+        except OSError as e:
+            raise self._connect_error(host, e) from e
+        finally:
+            self._record_dns(start)
+        error = self._connect_error(host, "no addresses")
+        for address in addresses:
+            try:
+                return await self.backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        raise error
+
+# کلاس‌های transport پس از بارگذاری httpx ساخته می‌شوند
+# Transport classes, defined once httpx has been imported
+_dns_transport_classes = {}
+
+def _define_dns_transports():
+    """
+    transportهای httpx روی pool مستقیم httpcore
+    httpx transports over a directly built httpcore pool
+    
+    تبدیل درخواست، پاسخ و خطاها همان کاری است که HTTPTransport در httpx انجام
+    می‌دهد و فقط از API عمومی هر دو کتابخانه استفاده می‌کند.
+    Requests, responses and errors are converted the same way httpx's own
+    HTTPTransport does it, using only the public API of both libraries.
+    """
+    import httpcore
+    
+    errors = (httpcore.TimeoutException, httpcore.NetworkError, httpcore.ProtocolError,
+              httpcore.ProxyError, httpcore.UnsupportedProtocol)
+    
+    def httpx_error(error, request):
+        return getattr(httpx, type(error).__name__, httpx.TransportError)(str(error), request=request)
+    
+    def core_request(request):
+        url = httpcore.URL(scheme=request.url.raw_scheme, host=request.url.raw_host,
+                           port=request.url.port, target=request.url.raw_path)
+        return httpcore.Request(method=request.method, url=url, headers=request.headers.raw,
+                                content=request.stream, extensions=request.extensions)
+    
+    class ResponseStream(httpx.SyncByteStream):
+        def __init__(self, stream, request):
+            self.stream = stream
+            self.request = request
+        
+        def __iter__(self):
+            try:
+                for part in self.stream:
+                    yield part
+            except errors as e:
+                raise httpx_error(e, self.request) from e
+        
+        def close(self):
+            if hasattr(self.stream, 'close'):
+                self.stream.close()
+    
+    class AsyncResponseStream(httpx.AsyncByteStream):
+        def __init__(self, stream, request):
+            self.stream = stream
+            self.request = request
+        
+        async def __aiter__(self):
+            try:
+                async for part in self.stream:
+                    yield part
+            except errors as e:
+                raise httpx_error(e, self.request) from e
+        
+        async def aclose(self):
+            if hasattr(self.stream, 'aclose'):
+                await self.stream.aclose()
+    
+    class Transport(httpx.BaseTransport):
+        def __init__(self, pool):
+            self.pool = pool
+        
+        def handle_request(self, request):
+            try:
+                response = self.pool.handle_request(core_request(request))
+            except errors as e:
+                raise httpx_error(e, request) from e
+            return httpx.Response(status_code=response.status, headers=response.headers,
+                                  stream=ResponseStream(response.stream, request), extensions=response.extensions)
+        
+        def close(self):
+            self.pool.close()
+    
+    class AsyncTransport(httpx.AsyncBaseTransport):
+        def __init__(self, pool):
+            self.pool = pool
+        
+        async def handle_async_request(self, request):
+            try:
+                response = await self.pool.handle_async_request(core_request(request))
+            except errors as e:
+                raise httpx_error(e, request) from e
+            return httpx.Response(status_code=response.status, headers=response.headers,
+                                  stream=AsyncResponseStream(response.stream, request), extensions=response.extensions)
+        
+        async def aclose(self):
+            await self.pool.aclose()
+    
+    return {'sync': Transport, 'async': AsyncTransport}
+
+def _dns_transport(cache, options, asynchronous=False):
+    """
+    ساخت transport که نام‌ها را از کش DNS حل می‌کند
+    Build a transport whose connections resolve names through a DNSCache
+    
+    backend شبکه از طریق آرگومان مستند network_backend به ConnectionPool در
+    httpcore داده می‌شود و httpx آن را به عنوان transport سفارشی می‌پذیرد، پس
+    به ویژگی‌های خصوصی هیچ‌کدام وابسته نیست.
+    The network backend goes in through httpcore's documented network_backend
+    pool argument and httpx takes the pool as a custom transport, so nothing
+    depends on either library's private attributes.
+    
+    httpx.HTTPTransport این backend را نمی‌پذیرد، پس این transport اختیاری است
+    و این موارد را ندارد: proxy (از جمله متغیرهای محیطی HTTP_PROXY)، retries،
+    local_address/uds، cert کلاینت و http1=False. AdvancedHTTPxClient هیچ‌کدام
+    را تنظیم نمی‌کند و با وجود proxy محیطی از این transport استفاده نمی‌کند.
+    httpx.HTTPTransport has no way to take this backend, so the transport is
+    opt-in and gives up: proxies (including HTTP_PROXY and friends from the
+    environment), retries, local_address/uds, client certificates and
+    http1=False. AdvancedHTTPxClient sets none of those and falls back to the
+    stock transport when an environment proxy is configured.
+    
+    پارامترها / Parameters:
+    - cache: DNSCache
+    - options: تنظیمات AdvancedHTTPxClient._client_options
+    - asynchronous: ساخت transport برای httpx.AsyncClient
+    
+    بازگشت / Returns:
+    - httpx.BaseTransport یا httpx.AsyncBaseTransport
+    """
+    import httpcore
+    if not _dns_transport_classes:
+        _dns_transport_classes.update(_define_dns_transports())
+    limits = options['limits']
+    pool_options = {
+        'ssl_context': httpx.create_ssl_context(verify=options['verify']),
+        'max_connections': limits.max_connections,
+        'max_keepalive_connections': limits.max_keepalive_connections,
+        'keepalive_expiry': limits.keepalive_expiry,
+        'http2': options['http2']
+    }
+    if asynchronous:
+        backend = _AsyncResolvingBackend(httpcore.AnyIOBackend(), cache)
+        return _dns_transport_classes['async'](httpcore.AsyncConnectionPool(network_backend=backend, **pool_options))
+    backend = _ResolvingBackend(httpcore.SyncBackend(), cache)
+    return _dns_transport_classes['sync'](httpcore.ConnectionPool(network_backend=backend, **pool_options))
+
+class AdvancedHTTPxClient:
+    """
+    کلاینت HTTP پیشرفته برای درخواست‌های وب
+    Advanced HTTP client for web requests
+    
+    یک httpx.Client ماندگار با pool اتصال برای تمام درخواست‌ها استفاده می‌شود
+    A single long-lived, pooled httpx.Client is reused for every request so
+    TCP/TLS connections are kept alive per host instead of re-handshaking.
+    
+    با تنظیم dns_cache نام‌ها از کش DNS حل می‌شوند و زمان dns/connect/tls/ttfb
+    هر درخواست در response.extensions['timings'] قرار می‌گیرد
+    With dns_cache set, names are resolved through the DNS cache; each
+    response carries its dns/connect/tls/ttfb breakdown in
+    response.extensions['timings'].
+    
+    این ماژول نیازی به تغییر ندارد مگر برای ویژگی‌های خاص
+    This module doesn't need modification unless for specific features
+    """
+    
+    def __init__(self, config=None, telemetry=None):
+        """
+        مقداردهی اولیه کلاینت با تنظیمات pool
+        Initialize client with connection pool settings
+        
+        پارامترها / Parameters:
+        - config: دیکشنری تنظیمات (timeout, max_connections,
+          max_keepalive_connections, keepalive_expiry, http2, verify,
+          rate_limit, rate_limits, rate_burst, adaptive_concurrency, cache,
+          coalesce, max_body_size, dns_cache, prewarm)
+        - dns_cache: اختیاری؛ dict تنظیمات یک کش اختصاصی ({} = کش مشترک dns_cache)،
+          یک نمونه DNSCache یا False (پیش‌فرض، حل نام توسط httpx)
+        - prewarm: تعداد اتصال‌های پیش‌گرم هر میزبان پیش از اسکن (True = 1)
+        - telemetry: MetricsRegistry برای تاخیر و حجم درخواست‌ها (اختیاری)
+        """
+        self.config = config or {}
+        self.telemetry = telemetry or MetricsRegistry(enabled=False)
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+        }
+        self.timeout = self.config.get('timeout', 30)
+        self.max_connections = self.config.get('max_connections', 100)
+        self.max_keepalive_connections = self.config.get('max_keepalive_connections', 20)
+        self.keepalive_expiry = self.config.get('keepalive_expiry', 30.0)
+        self.http2 = self.config.get('http2', False)
+        self.verify = self.config.get('verify', True)
+        self.max_body_size = self.config.get('max_body_size', 10 * 1024 * 1024)
+        self.scheduler = RequestScheduler(self.config)
+        cache_config = self.config.get('cache', {})
+        self.cache = ResponseCache(**cache_config) if cache_config is not False else None
+        coalesce_config = self.config.get('coalesce', {})
+        self.coalescer = RequestCoalescer(**coalesce_config) if coalesce_config is not False else None
+        dns_config = self.config.get('dns_cache', False)
+        if isinstance(dns_config, DNSCache) or dns_config is False:
+            self.dns_cache = dns_config or None
+        else:
+            # تنظیمات اختصاصی کش خودش را می‌سازد تا کش مشترک تغییر نکند
+            # Options get a private cache so the shared one is never reconfigured
+            self.dns_cache = DNSCache(**dns_config) if dns_config else dns_cache
+        self.prewarm_connections = int(self.config.get('prewarm', 0))
+        self._client = None
+        self._async_client = None
+    
+    def _client_options(self):
+        """تنظیمات مشترک کلاینت‌های sync و async / Options shared by sync and async clients"""
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' is not installed - falling back to HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        return {
+            'timeout': self.timeout,
+            'limits': limits,
+            'http2': http2,
+            'verify': self.verify,
+            'headers': self.headers
+        }
+    
+    def _use_dns_transport(self):
+        """
+        استفاده از transport کش DNS برای کلاینت جدید
+        Whether a new client should use the DNS cache transport
+        
+        با proxy محیطی، transport پیش‌فرض httpx حفظ می‌شود چون transport صریح
+        proxyهای محیطی را غیرفعال می‌کند و proxy خودش نام‌ها را حل می‌کند
+        With an environment proxy the stock httpx transport is kept: an explicit
+        transport turns environment proxies off, and the proxy resolves names
+        itself anyway.
+        """
+        if self.dns_cache is None:
+            return False
+        import urllib.request
+        if any(scheme in urllib.request.getproxies() for scheme in ('http', 'https', 'all')):
+            logger.warning("Environment proxy configured - DNS cache disabled for this client")
+            return False
+        return True
+    
+    def _build_client(self):
+        """ساخت کلاینت pool شده / Build pooled client"""
+        options = self._client_options()
+        if self._use_dns_transport():
+            options['transport'] = _dns_transport(self.dns_cache, options)
+        return httpx.Client(**options)
+    
+    @property
+    def client(self):
+        """کلاینت ماندگار (ساخت در اولین استفاده) / Long-lived client (created on first use)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+    
+    def _prepare(self, client, url, method, kwargs):
+        """
+        ساخت درخواست و بررسی کش
+        Build the request and consult the cache
+        
+        بازگشت / Returns:
+        - (request, send_kwargs, key, entry)
+        """
+        probe = kwargs.pop('probe', False)
+        send_kwargs = {name: kwargs.pop(name) for name in ('auth', 'follow_redirects') if name in kwargs}
+        request = client.build_request(method, url, **kwargs)
+        key = entry = None
+        if self.cache is not None and not probe:
+            key = self.cache.make_key(request)
+            if key is not None:
+                entry = self.cache.get(key)
+                if entry is not None and not self.cache.is_fresh(entry):
+                    request.headers.update(self.cache.conditional_headers(entry))
+        return request, send_kwargs, key, entry
+    
+    def _finish(self, response, key, entry):
+        """به‌روزرسانی کش با پاسخ دریافتی / Update cache with the received response"""
+        if key is None:
+            return response
+        if entry is not None and response.status_code == 304:
+            self.cache.touch(key, entry)
+            return self.cache.to_response(entry)
+        self.cache.record('misses')
+        if not response.extensions.get('truncated'):
+            self.cache.put(key, response)
+        return response
+    
+    def robust_request(self, url, method="GET", **kwargs):
+        """
+        ارسال درخواست وب با مدیریت خطا
+        Send web request with error handling
+        
+        درخواست‌های probe=True هرگز از کش یا memo ادغام‌کننده استفاده نمی‌کنند
+        Requests made with probe=True always bypass the response cache and
+        the coalescer's memo; they only share identical in-flight requests.
+        """
+        probe = kwargs.get('probe', False)
+        try:
+            request, send_kwargs, key, entry = self._prepare(self.client, url, method, kwargs)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            return None
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record('hits')
+            return self.cache.to_response(entry)
+        
+        coalesce_key = self.coalescer.make_key(request) if self.coalescer is not None else None
+        if coalesce_key is None:
+            return self._send(url, request, send_kwargs, key, entry)
+        return self.coalescer.request(coalesce_key, lambda: self._send(url, request, send_kwargs, key, entry),
+                                      memoize=not probe)
+    
+    def _send(self, url, request, send_kwargs, key, entry):
+        """ارسال واقعی درخواست آماده شده / Put a prepared request on the wire"""
+        controller = self.scheduler.acquire(url)
+        start = time.perf_counter()
+        response = None
+        timings = RequestTimings()
+        request.extensions['trace'] = timings.trace
+        token = _request_timings.set(timings)
+        try:
+            response = self.client.send(request, stream=True, **send_kwargs)
+            response.extensions['timings'] = timings
+            return self._finish(self._read_capped(response), key, entry)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            return None
+        finally:
+            _request_timings.reset(token)
+            self._record(request, controller, start, response, timings=timings)
+    
+    def stream_request(self, url, method="GET", **kwargs):
+        """
+        ارسال درخواست با بدنه جریانی (بدون کش)
+        Send a request whose body is streamed (never cached)
+        
+        فراخواننده باید پاسخ را با release() (یا close()) ببندد
+        The caller must release() (or close()) the returned response.
+        """
+        controller = self.scheduler.acquire(url)
+        start = time.perf_counter()
+        request = response = None
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        try:
+            request = self.client.build_request(method, url, **kwargs)
+            request.extensions['trace'] = timings.trace
+            response = self.client.send(request, stream=True)
+            response.extensions['timings'] = timings
+            return response
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            return None
+        finally:
+            _request_timings.reset(token)
+            self._record(request, controller, start, response, streamed=True, timings=timings)
+    
+    def _fits(self, response):
+        """طول اعلام شده بدنه در محدوده است / Declared body length is within the cap"""
+        length = response.headers.get('content-length')
+        return (self.max_body_size is None
+                or ('content-encoding' not in response.headers and length is not None
+                    and length.isdigit() and int(length) <= self.max_body_size))
+    
+    def _read_capped(self, response):
+        """
+        خواندن بدنه جریانی حداکثر تا max_body_size
+        Read a streamed body up to max_body_size
+        
+        بدنه‌های بزرگتر بریده شده و extensions['truncated'] تنظیم می‌شود؛ از حافظه
+        بیش از سقف استفاده نمی‌شود
+        Longer bodies are cut off and marked with extensions['truncated'];
+        memory never grows past the cap.
+        """
+        try:
+            if self._fits(response):
+                response.read()
+                return response
+            chunks = list(self.iter_bytes(response, self.max_body_size + 1))
+        finally:
+            response.close()
+        return self._capped_response(response, chunks)
+    
+    async def _aread_capped(self, response):
+        """نسخه async از _read_capped / Async variant of _read_capped"""
+        try:
+            if self._fits(response):
+                await response.aread()
+                return response
+            chunks = []
+            async for chunk in self.aiter_bytes(response, self.max_body_size + 1):
+                chunks.append(chunk)
+        finally:
+            await response.aclose()
+        return self._capped_response(response, chunks)
+    
+    def _capped_response(self, response, chunks):
+        content = b"".join(chunks)
+        truncated = len(content) > self.max_body_size
+        if truncated:
+            logger.warning(f"Response body of {response.url} truncated at {self.max_body_size} bytes")
+            content = content[:self.max_body_size]
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in ResponseCache.STRIP_HEADERS]
+        extensions = {name: value for name, value in response.extensions.items() if name != 'network_stream'}
+        extensions['truncated'] = truncated
+        return httpx.Response(response.status_code, headers=headers, content=content,
+                              request=response.request, extensions=extensions)
+    
+    def iter_bytes(self, response, max_bytes=None, chunk_size=None):
+        """
+        پیمایش بدنه رمزگشایی شده (gzip/br به صورت افزایشی) تا سقف
+        Iterate the decoded body (decompressed incrementally) up to a cap
+        
+        پارامترها / Parameters:
+        - max_bytes: سقف بایت‌ها (پیش‌فرض max_body_size)
+        - chunk_size: اندازه تکه‌ها (پیش‌فرض تکه‌های شبکه)
+        """
+        remaining = self.max_body_size if max_bytes is None else max_bytes
+        for chunk in response.iter_bytes(chunk_size):
+            if remaining is not None:
+                if len(chunk) >= remaining:
+                    yield chunk[:remaining]
+                    return
+                remaining -= len(chunk)
+            yield chunk
+    
+    async def aiter_bytes(self, response, max_bytes=None, chunk_size=None):
+        """نسخه async از iter_bytes / Async variant of iter_bytes"""
+        remaining = self.max_body_size if max_bytes is None else max_bytes
+        async for chunk in response.aiter_bytes(chunk_size):
+            if remaining is not None:
+                if len(chunk) >= remaining:
+                    yield chunk[:remaining]
+                    return
+                remaining -= len(chunk)
+            yield chunk
+    
+    def iter_text(self, response, max_bytes=None, chunk_size=None):
+        """
+        پیمایش بدنه به صورت متن با رمزگشایی افزایشی
+        Iterate the body as text, decoding incrementally
+        
+        مصرف‌کننده می‌تواند هر زمان متوقف شود؛ سپس پاسخ را با release() ببندد
+        The consumer may stop at any point and then release() the response.
+        """
+        import codecs
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        for chunk in self.iter_bytes(response, max_bytes, chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    
+    def release(self, response):
+        """
+        بستن پاسخ جریانی و ثبت حجم دریافتی آن
+        Close a streamed response and record the bytes it received
+        """
+        response.close()
+        self.telemetry.inc('http_received_bytes', response.num_bytes_downloaded, host=response.url.host)
+    
+    def _record(self, request, controller, start, response, streamed=False, timings=None):
+        """
+        ثبت نتیجه درخواست برای کنترل همزمانی و متریک‌ها
+        Feed a request's outcome to the concurrency controller and metrics
+        
+        زمان dns/connect/tls/ttfb در هیستوگرام‌های جداگانه http_<phase>_seconds ثبت می‌شود
+        DNS, connect, TLS and TTFB go to separate http_<phase>_seconds histograms.
+        """
+        latency = time.perf_counter() - start
+        status = response.status_code if response is not None else None
+        if controller:
+            controller.record(latency, status, response is None)
+        if not self.telemetry.enabled or request is None:
+            return
+        host = request.url.host
+        self.telemetry.observe('http_request_seconds', latency, host=host)
+        self.telemetry.inc('http_requests', host=host, status=status or 'error')
+        sent = len(request.method) + len(request.url.raw_path) + int(request.headers.get('content-length', 0))
+        sent += sum(len(name) + len(value) + 4 for name, value in request.headers.raw)
+        self.telemetry.inc('http_sent_bytes', sent, host=host)
+        if response is not None and not streamed:
+            self.telemetry.inc('http_received_bytes', response.num_bytes_downloaded, host=host)
+        if timings is not None:
+            for phase in RequestTimings.PHASES:
+                value = getattr(timings, phase)
+                if value is not None:
+                    self.telemetry.observe(f'http_{phase}_seconds', value, host=host)
+    
+    @property
+    def async_client(self):
+        """
+        کلاینت async ماندگار (وابسته به event loop جاری)
+        Long-lived async client (bound to the running event loop)
+        """
+        if self._async_client is None or self._async_client.is_closed:
+            options = self._client_options()
+            if self._use_dns_transport():
+                options['transport'] = _dns_transport(self.dns_cache, options, asynchronous=True)
+            self._async_client = httpx.AsyncClient(**options)
+        return self._async_client
+    
+    async def async_robust_request(self, url, method="GET", **kwargs):
+        """ارسال درخواست async با مدیریت خطا / Send async request with error handling"""
+        probe = kwargs.get('probe', False)
+        try:
+            request, send_kwargs, key, entry = self._prepare(self.async_client, url, method, kwargs)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            return None
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record('hits')
+            return self.cache.to_response(entry)
+        
+        coalesce_key = self.coalescer.make_key(request) if self.coalescer is not None else None
+        if coalesce_key is None:
+            return await self._asend(url, request, send_kwargs, key, entry)
+        return await self.coalescer.arequest(
+            coalesce_key, lambda: self._asend(url, request, send_kwargs, key, entry), memoize=not probe)
+    
+    async def _asend(self, url, request, send_kwargs, key, entry):
+        controller = await self.scheduler.async_acquire(url)
+        start = time.perf_counter()
+        response = None
+        timings = RequestTimings()
+        request.extensions['trace'] = timings.atrace
+        token = _request_timings.set(timings)
+        try:
+            response = await self.async_client.send(request, stream=True, **send_kwargs)
+            response.extensions['timings'] = timings
+            return self._finish(await self._aread_capped(response), key, entry)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            return None
+        finally:
+            _request_timings.reset(token)
+            self._record(request, controller, start, response, timings=timings)
+    
+    @staticmethod
+    def _origins(urls):
+        origins = {}
+        for url in urls:
+            parts = urlsplit(url if '://' in url else f"https://{url}")
+            origins.setdefault(f"{parts.scheme}://{parts.netloc.lower()}/", None)
+        return list(origins)
+    
+    def prewarm(self, urls, connections=None):
+        """
+        حل نام و باز کردن اتصال‌های pool میزبان‌ها پیش از اسکن
+        Resolve and open pooled connections to hosts before scanning
+        
+        برای هر origin به تعداد connections درخواست HEAD همزمان (با رعایت محدودیت
+        نرخ) ارسال می‌شود تا اتصال‌های keep-alive آماده باشند
+        Sends `connections` concurrent HEAD requests per origin, within the
+        host rate limits, so keep-alive connections are ready in the pool.
+        
+        پارامترها / Parameters:
+        - urls: URLها یا نام میزبان‌ها
+        - connections: اتصال برای هر میزبان (پیش‌فرض prewarm یا 1)
+        
+        بازگشت / Returns:
+        - {origin: تعداد اتصال‌های آماده}
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        jobs = self._prewarm_jobs(urls, connections)
+        if not jobs:
+            return {}
+        start = time.perf_counter()
+        requests = [self.client.build_request('HEAD', origin) for origin in jobs]
+        with ThreadPoolExecutor(max_workers=min(len(jobs), 32)) as pool:
+            responses = list(pool.map(lambda origin, request: self._send(origin, request, {}, None, None),
+                                      jobs, requests))
+        return self._prewarm_report(jobs, responses, start)
+    
+    async def aprewarm(self, urls, connections=None):
+        """نسخه async از prewarm برای کلاینت async / Async variant of prewarm for the async client"""
+        jobs = self._prewarm_jobs(urls, connections)
+        if not jobs:
+            return {}
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            self._asend(origin, self.async_client.build_request('HEAD', origin), {}, None, None)
+            for origin in jobs))
+        return self._prewarm_report(jobs, responses, start)
+    
+    def _prewarm_jobs(self, urls, connections):
+        connections = min(connections or self.prewarm_connections or 1, self.max_keepalive_connections)
+        return [origin for origin in self._origins(urls) for _ in range(connections)]
+    
+    def _prewarm_report(self, jobs, responses, start):
+        ready = dict.fromkeys(jobs, 0)
+        for origin, response in zip(jobs, responses):
+            if response is not None:
+                ready[origin] += 1
+        logger.info(f"Pre-warmed {sum(ready.values())} connections to {len(ready)} hosts "
+                    f"in {time.perf_counter() - start:.2f}s")
+        return ready
+    
+    def metrics(self):
+        """متریک‌های لایه HTTP / HTTP layer metrics"""
+        return {
+            'hosts': self.scheduler.metrics(),
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'coalescing': self.coalescer.stats() if self.coalescer is not None else None,
+            'dns': self.dns_cache.stats() if self.dns_cache is not None else None
+        }
+    
+    def close(self):
+        """بستن اتصال‌های pool / Close pooled connections"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    async def aclose(self):
+        """بستن اتصال‌های async / Close async pooled connections"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class WAFEvasionExpert:
+    """
+    متخصص دور زدن WAF
+    WAF Evasion Expert
+    
+    نسخه‌های تبدیل شده هر (پیلود، زنجیره تکنیک) یک بار محاسبه و در یک LRU محدود
+    که بین اسکنرها مشترک است نگهداری می‌شوند
+    Transformed variants are computed once per (payload, technique chain)
+    and kept in a bounded LRU shared by all scanners.
     
     توسعه‌دهندگان می‌توانند تکنیک‌های جدید دور زدن اضافه کنند
     Developers can add new evasion techniques
     """
     
-    def __init__(self):
-        self.techniques = [
-            self.url_encode,
-            self.double_url_encode,
-            self.unicode_encode
-        ]
+    def __init__(self, cache_size=4096):
+        """
+        پارامترها / Parameters:
+        - cache_size: حداکثر تعداد نسخه‌های نگهداری شده (0 = بدون کش)
+        """
+        self.techniques = [
+            self.url_encode,
+            self.double_url_encode,
+            self.unicode_encode
+        ]
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def url_encode(self, payload):
+        """کدگذاری URL / URL Encoding"""
+        return quote(payload)
+    
+    def double_url_encode(self, payload):
+        """کدگذاری دوگانه URL / Double URL Encoding"""
+        return quote(quote(payload))
+    
+    def unicode_encode(self, payload):
+        """کدگذاری یونیکد / Unicode Encoding"""
+        return ''.join(f'%u{ord(c):04x}' for c in payload)
+    
+    def add_evasion_technique(self, technique_func):
+        """
+        اضافه کردن تکنیک جدید دور زدن
+        Add new evasion technique
+        
+        پارامترها / Parameters:
+        - technique_func: تابعی که یک پیلود می‌گیرد و نسخه تغییر یافته را برمی‌گرداند
+        """
+        self.techniques.append(technique_func)
+    
+    def transform(self, payload, chain):
+        """
+        اعمال زنجیره‌ای از تکنیک‌ها با استفاده از کش
+        Apply a chain of techniques, using the shared cache
+        
+        پارامترها / Parameters:
+        - payload: پیلود اصلی
+        - chain: دنباله‌ای از توابع تکنیک که به ترتیب اعمال می‌شوند
+        """
+        key = (payload, tuple(chain))
+        with self._lock:
+            variant = self._cache.get(key)
+            if variant is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return variant
+            self.misses += 1
+        
+        variant = payload
+        for technique in key[1]:
+            variant = technique(variant)
+        
+        if self.cache_size:
+            with self._lock:
+                self._cache[key] = variant
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return variant
+    
+    def iter_variants(self, payload, chains=None):
+        """
+        تولید تنبل نسخه‌های پیلود
+        Lazily yield payload variants
+        
+        هر نسخه فقط زمانی محاسبه می‌شود که اسکنر آن را مصرف کند
+        Each variant is only computed when the scanner consumes it.
+        
+        پارامترها / Parameters:
+        - payload: پیلود اصلی
+        - chains: لیست زنجیره‌های تکنیک (پیش‌فرض: هر تکنیک به تنهایی)
+        """
+        if chains is None:
+            chains = [(technique,) for technique in self.techniques]
+        for chain in chains:
+            yield self.transform(payload, chain)
+    
+    def stats(self):
+        """آمار کش / Cache statistics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._cache)
+            }
+
+def _shared_memory_call(func, name, size, args):
+    """
+    اجرای تابع تحلیل روی بدنه موجود در حافظه مشترک (درون فرایند کارگر)
+    Run an analysis function on a body held in shared memory (worker side)
+    """
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        with shm.buf[:size] as body:
+            return func(body, *args)
+    finally:
+        shm.close()
+
+class AnalysisExecutor:
+    """
+    اجراکننده قابل تعویض برای تحلیل‌های پرمصرف CPU
+    Pluggable executor for CPU-heavy response analysis
+    
+    حالت‌ها / Modes:
+    - inline: اجرا در همان thread (پیش‌فرض) / run in the calling thread (default)
+    - thread: اجرا در ThreadPoolExecutor / run in a thread pool
+    - process: اجرا در ProcessPoolExecutor؛ بدنه از طریق حافظه مشترک و بدون
+      pickle شدن منتقل می‌شود / run in a process pool; bodies are handed over
+      through shared memory instead of being pickled
+    
+    حداکثر max_pending تحلیل در جریان است و submit تا آزاد شدن جایگاه مسدود می‌شود،
+    بنابراین سمت دریافت هیچ‌گاه بیش از N پاسخ از تحلیل جلو نمی‌افتد.
+    At most max_pending analyses are in flight and submit() blocks until a
+    slot frees up, so fetching never runs more than N responses ahead.
+    
+    توابع تحلیل باید در سطح ماژول تعریف شوند و بدنه را به صورت bytes-like بگیرند
+    Analysis functions must be module-level and take a bytes-like body first.
+    """
+    
+    MODES = ('inline', 'thread', 'process')
+    
+    def __init__(self, mode='inline', workers=None, max_pending=32):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown analysis mode '{mode}' - expected one of {self.MODES}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+                pool_class = ThreadPoolExecutor if self.mode == 'thread' else ProcessPoolExecutor
+                self._pool = pool_class(max_workers=self.workers)
+            return self._pool
+    
+    def submit(self, func, body, *args):
+        """
+        ثبت تحلیل و بازگرداندن Future
+        Submit an analysis and return a Future
+        
+        پارامترها / Parameters:
+        - func: تابع تحلیل سطح ماژول با امضای func(body, *args)
+        - body: بدنه پاسخ (bytes)
+        """
+        from concurrent.futures import Future
+        if self.mode == 'inline':
+            future = Future()
+            try:
+                future.set_result(func(body, *args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        self._slots.acquire()
+        try:
+            if self.mode == 'thread':
+                future = self._get_pool().submit(func, body, *args)
+            else:
+                from multiprocessing import shared_memory
+                size = len(body)
+                shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+                shm.buf[:size] = body
+                future = self._get_pool().submit(_shared_memory_call, func, shm.name, size, args)
+                future.add_done_callback(lambda _: (shm.close(), shm.unlink()))
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def run(self, func, body, *args):
+        """اجرای تحلیل و انتظار برای نتیجه / Run an analysis and wait for its result"""
+        return self.submit(func, body, *args).result()
+    
+    def shutdown(self):
+        """توقف pool کارگرها / Shut down the worker pool"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+def compute_baseline(body, encoding, status, max_chars):
+    """تابع تحلیل: ساخت baseline / Analysis function: build a baseline"""
+    text = str(body, encoding or 'utf-8', 'replace')
+    return ResponseFingerprint.from_text(status, text), text[:max_chars]
+
+def compute_delta(body, encoding, status, baseline, max_distance, max_chars):
+    """تابع تحلیل: متن افزوده نسبت به baseline / Analysis function: delta against a baseline"""
+    text = str(body, encoding or 'utf-8', 'replace')
+    fingerprint, baseline_text = baseline
+    if fingerprint.matches(ResponseFingerprint.from_text(status, text), max_distance):
+        return ''
+    return FingerprintEngine.bounded_diff(baseline_text, text[:max_chars])
+
+def extract_parameters(body, encoding, base_url, parser):
+    """تابع تحلیل: استخراج پارامتر از بدنه کامل / Analysis function: extract parameters"""
+    text = str(body, encoding or 'utf-8', 'replace')
+    return ParameterDiscoverer(None, parser=parser).extract(base_url, [text])
+
+class ResponseFingerprint:
+    """
+    اثرانگشت فشرده یک پاسخ HTTP
+    Compact fingerprint of an HTTP response
+    
+    شامل وضعیت، دسته طول، simhash توکن‌ها و هش ساختار DOM
+    Holds the status, a length bucket, a 64-bit simhash of the tokens and a
+    hash of the tag sequence, so two responses compare in O(1).
+    """
+    
+    TOKEN_PATTERN = re.compile(r"\w+")
+    TAG_PATTERN = re.compile(r"<\s*([a-zA-Z][\w:-]*)")
+    MAX_TOKENS = 4096
+    
+    def __init__(self, status, length, simhash, structure):
+        self.status = status
+        self.length = length
+        self.length_bucket = int(math.log2(length + 1) * 4)
+        self.simhash = simhash
+        self.structure = structure
+    
+    @classmethod
+    def from_text(cls, status, text):
+        """ساخت اثرانگشت از متن بدنه / Build fingerprint from body text"""
+        tags = cls.TAG_PATTERN.findall(text)
+        structure = hashlib.blake2b(' '.join(tags).lower().encode('utf-8'), digest_size=8).hexdigest()
+        return cls(status, len(text), cls.simhash_of(text), structure)
+    
+    @classmethod
+    def from_response(cls, response):
+        return cls.from_text(response.status_code, response.text)
+    
+    @classmethod
+    def simhash_of(cls, text):
+        """simhash ۶۴ بیتی توکن‌ها / 64-bit simhash of the tokens"""
+        counts = defaultdict(int)
+        for match in cls.TOKEN_PATTERN.finditer(text):
+            token = match.group().lower()
+            if token in counts or len(counts) < cls.MAX_TOKENS:
+                counts[token] += 1
+        weights = [0] * 64
+        for token, weight in counts.items():
+            value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+            for bit in range(64):
+                weights[bit] += weight if value >> bit & 1 else -weight
+        return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    
+    def distance(self, other):
+        """فاصله همینگ simhash / Simhash Hamming distance"""
+        return bin(self.simhash ^ other.simhash).count('1')
+    
+    def matches(self, other, max_distance=3):
+        """
+        بررسی هم‌ارزی دو اثرانگشت
+        Whether two fingerprints describe equivalent responses
+        """
+        return (
+            self.status == other.status
+            and abs(self.length_bucket - other.length_bucket) <= 1
+            and self.structure == other.structure
+            and self.distance(other) <= max_distance
+        )
+
+class FingerprintEngine:
+    """
+    موتور مقایسه پاسخ‌ها با baseline
+    Response comparison engine against per-endpoint baselines
+    
+    baseline هر endpoint یک بار محاسبه و بین همه اسکنرها به اشتراک گذاشته می‌شود.
+    ابتدا اثرانگشت‌ها مقایسه می‌شوند و فقط در صورت تفاوت، diff محدود اجرا می‌شود.
+    Each endpoint's baseline is computed once and shared by every scanner.
+    Fingerprints are compared first; a bounded line diff runs only when
+    they differ. At most max_baselines baselines are kept (LRU), so memory
+    stays flat across crawls of millions of endpoints.
+    """
+    
+    MAX_DIFF_CHARS = 64 * 1024
+    
+    def __init__(self, http_client, max_distance=3, executor=None, max_baselines=4096):
+        self.http_client = http_client
+        self.max_distance = max_distance
+        self.executor = executor or AnalysisExecutor()
+        self.max_baselines = max_baselines
+        self.baselines = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def endpoint_key(url):
+        parsed = urlsplit(normalize_url(str(url)))
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    
+    def baseline(self, url):
+        """
+        دریافت (یا محاسبه) baseline یک endpoint
+        Get (or compute) the baseline for an endpoint
+        
+        بازگشت / Returns:
+        - (ResponseFingerprint, نمونه محدود متن) یا None
+        """
+        key = self.endpoint_key(url)
+        with self._lock:
+            if key in self.baselines:
+                self.baselines.move_to_end(key)
+                return self.baselines[key]
+        response = self.http_client.robust_request(str(url))
+        baseline = None
+        if response is not None:
+            baseline = self._compute_baseline(response)
+        with self._lock:
+            if key in self.baselines:
+                return self.baselines[key]
+            self._store(key, baseline)
+        return baseline
+    
+    def set_baseline(self, url, response):
+        """ثبت پاسخ موجود به عنوان baseline / Use an existing response as baseline"""
+        baseline = self._compute_baseline(response)
+        with self._lock:
+            self._store(self.endpoint_key(url), baseline)
+        return baseline
+    
+    def _store(self, key, baseline):
+        self.baselines[key] = baseline
+        self.baselines.move_to_end(key)
+        while len(self.baselines) > self.max_baselines:
+            self.baselines.popitem(last=False)
+    
+    def _compute_baseline(self, response):
+        return self.executor.run(compute_baseline, response.content, response.encoding,
+                                 response.status_code, self.MAX_DIFF_CHARS)
+    
+    def delta(self, response, baseline_url=None):
+        """
+        متن افزوده شده در پاسخ نسبت به baseline
+        Text added by the response relative to the baseline
+        """
+        url = baseline_url or self.endpoint_key(response.request.url)
+        baseline = self.baseline(url)
+        if baseline is None:
+            return response.text[:self.MAX_DIFF_CHARS]
+        return self.executor.run(compute_delta, response.content, response.encoding, response.status_code,
+                                 baseline, self.max_distance, self.MAX_DIFF_CHARS)
+    
+    @staticmethod
+    def bounded_diff(old_text, new_text):
+        """diff خطی محدود؛ فقط خطوط جدید / Bounded line diff returning added lines"""
+        import difflib
+        old_lines = old_text.splitlines()
+        new_lines = new_text.splitlines()
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+        added = []
+        for tag, _, _, j1, j2 in matcher.get_opcodes():
+            if tag in ('replace', 'insert'):
+                added.extend(new_lines[j1:j2])
+        return '\n'.join(added)
+
+class ParameterCollector:
+    """
+    جمع‌آوری پارامترها و لینک‌ها از رویدادهای parser
+    Collects parameters and links from parser events
+    
+    پارامترها به ازای هر endpoint (URL نرمال بدون query) بدون تکرار نگهداری و
+    نام‌ها intern می‌شوند
+    Parameters are deduplicated per endpoint (normalized URL without query);
+    endpoint and parameter names are interned, since the same few names
+    repeat across every crawled page.
+    """
+    
+    LINK_ATTRIBUTES = {'a': 'href', 'link': 'href', 'area': 'href', 'iframe': 'src',
+                       'frame': 'src', 'script': 'src', 'img': 'src'}
+    CRAWL_TAGS = ('a', 'area', 'iframe', 'frame')
+    FIELD_TAGS = ('input', 'select', 'textarea', 'button')
+    JS_PATTERNS = re.compile(
+        r"""[?&]([A-Za-z_][\w\-\[\]]*)="""
+        r"""|(?:searchParams|params|URLSearchParams\([^)]*\))\.(?:get|set|append|has)\(\s*['"]([\w\-\[\]]+)['"]"""
+        r"""|\.append\(\s*['"]([\w\-\[\]]+)['"]\s*,"""
+    )
+    MAX_SCRIPT_CHARS = 1024 * 1024
+    
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.endpoints = defaultdict(dict)
+        self.links = {}
+        self._form_endpoint = None
+        self._script = None
+        self.add_url(base_url)
+    
+    @staticmethod
+    def _endpoint_from_parts(parsed):
+        netloc = parsed.netloc.lower()
+        if (parsed.scheme, parsed.port) in (('http', 80), ('https', 443)):
+            netloc = netloc.rsplit(':', 1)[0]
+        return sys.intern(f"{parsed.scheme}://{netloc}{parsed.path or '/'}")
+    
+    def _endpoint(self, url):
+        return self._endpoint_from_parts(urlsplit(url))
+    
+    def add_url(self, url):
+        """افزودن پارامترهای query یک URL / Add query parameters of a URL"""
+        parsed = urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            return None
+        endpoint = self._endpoint_from_parts(parsed)
+        if parsed.query:
+            params = self.endpoints[endpoint]
+            for name, _ in parse_qsl(parsed.query, keep_blank_values=True):
+                params[sys.intern(name)] = None
+        return endpoint
+    
+    def start(self, tag, attrs):
+        """رویداد شروع تگ / Tag start event"""
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag == 'form':
+            action = urljoin(self.base_url, attrs.get('action') or self.base_url)
+            self._form_endpoint = self.add_url(action)
+        elif tag in self.FIELD_TAGS:
+            name = attrs.get('name')
+            if name:
+                endpoint = self._form_endpoint or self._endpoint(self.base_url)
+                self.endpoints[endpoint][sys.intern(name)] = None
+        if tag in self.LINK_ATTRIBUTES:
+            target = attrs.get(self.LINK_ATTRIBUTES[tag])
+            if target:
+                url = urljoin(self.base_url, target.strip())
+                if self.add_url(url) is not None and tag in self.CRAWL_TAGS:
+                    self.links[url.split('#', 1)[0]] = None
+        if tag == 'script' and not attrs.get('src'):
+            self._script = []
+    
+    def data(self, text):
+        """متن داخل تگ / Text content"""
+        if self._script is not None and sum(map(len, self._script)) < self.MAX_SCRIPT_CHARS:
+            self._script.append(text)
+    
+    def end(self, tag, text=None):
+        """رویداد پایان تگ / Tag end event"""
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag == 'form':
+            self._form_endpoint = None
+        elif tag == 'script' and self._script is not None:
+            script = text if text is not None else ''.join(self._script)
+            self._script = None
+            self.add_script(script[:self.MAX_SCRIPT_CHARS])
+    
+    def add_script(self, script):
+        """استخراج پارامتر از JS درون‌خطی / Extract parameters from inline JS"""
+        endpoint = self._endpoint(self.base_url)
+        for match in self.JS_PATTERNS.finditer(script):
+            name = next(group for group in match.groups() if group)
+            self.endpoints[endpoint][sys.intern(name)] = None
+
+class _StdlibHTMLBackend:
+    """parser افزایشی html.parser / Incremental html.parser backend"""
+    
+    name = 'html.parser'
+    
+    def __init__(self, collector):
+        from html.parser import HTMLParser
+        
+        class Parser(HTMLParser):
+            def handle_starttag(self, tag, attrs):
+                collector.start(tag, dict(attrs))
+            
+            def handle_startendtag(self, tag, attrs):
+                collector.start(tag, dict(attrs))
+            
+            def handle_data(self, data):
+                collector.data(data)
+            
+            def handle_endtag(self, tag):
+                collector.end(tag)
+        
+        self.parser = Parser(convert_charrefs=True)
+    
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+    
+    def close(self):
+        self.parser.close()
+
+class _LxmlHTMLBackend:
+    """
+    parser افزایشی مبتنی بر lxml (C)
+    Incremental lxml (C) backend
+    
+    المان‌های پردازش شده پاک می‌شوند تا درخت در حافظه رشد نکند
+    Processed elements are cleared so the tree does not grow in memory.
+    """
+    
+    name = 'lxml'
+    
+    def __init__(self, collector):
+        from lxml import etree
+        self.collector = collector
+        self.parser = etree.HTMLPullParser(events=('start', 'end'))
+    
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+        self._drain()
+    
+    def close(self):
+        self.parser.close()
+        self._drain()
+    
+    def _drain(self):
+        for event, element in self.parser.read_events():
+            if event == 'start':
+                self.collector.start(element.tag, element.attrib)
+            else:
+                self.collector.end(element.tag, element.text if element.tag == 'script' else None)
+                element.clear()
+                parent = element.getparent()
+                if parent is not None and element.tag != 'html':
+                    parent.remove(element)
+
+class ParameterDiscoverer:
+    """
+    کشف کننده پارامترهای URL و فرم
+    URL and Form Parameter Discoverer
+    
+    پارامترها از query string، فیلدهای فرم، لینک‌ها و JS درون‌خطی استخراج می‌شوند.
+    بدنه پاسخ به صورت جریانی parse می‌شود و در صورت نصب بودن lxml از آن استفاده می‌شود.
+    Parameters come from query strings, form fields, links and inline JS.
+    The body is parsed incrementally as it streams in, using lxml when it is
+    installed and html.parser otherwise.
+    """
+    
+    COMMON_PARAMETERS = ['id', 'page', 'file', 'cmd', 'search', 'query']
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, http_client, parser=None, executor=None):
+        """
+        پارامترها / Parameters:
+        - http_client: نمونه AdvancedHTTPxClient
+        - parser: 'lxml' یا 'html.parser' (پیش‌فرض: سریع‌ترین موجود)
+        - executor: AnalysisExecutor برای parse خارج از thread دریافت (اختیاری)
+        """
+        self.http_client = http_client
+        self.executor = executor
+        self.backend = self._select_backend(parser)
+        self.endpoints = {}
+        self.links = []
+    
+    @staticmethod
+    def _select_backend(parser):
+        if parser in (None, 'lxml'):
+            try:
+                import lxml.etree  # noqa: F401
+                return _LxmlHTMLBackend
+            except ImportError:
+                if parser == 'lxml':
+                    logger.warning("lxml is not installed - falling back to html.parser")
+        return _StdlibHTMLBackend
+    
+    def extract(self, base_url, chunks):
+        """
+        استخراج پارامترها از قطعه‌های متن HTML
+        Extract parameters from an iterable of HTML text chunks
+        
+        بازگشت / Returns:
+        - ParameterCollector با endpointها و لینک‌ها
+        """
+        collector = ParameterCollector(base_url)
+        parser = self.backend(collector)
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+        return collector
+    
+    def fetch(self, url):
+        """
+        دریافت و parse یک صفحه (thread-safe)
+        Fetch and parse a single page (thread-safe)
+        
+        بدنه‌های غیر HTML parse نمی‌شوند
+        Non-HTML bodies are not parsed. With an inline (or no) executor the
+        body is parsed while it streams in; other executors receive the
+        whole body so parsing happens off the fetch thread.
+        
+        بازگشت / Returns:
+        - ParameterCollector
+        """
+        response = self.http_client.stream_request(url)
+        if response is None:
+            return ParameterCollector(url)
+        try:
+            content_type = response.headers.get('content-type', 'text/html')
+            if 'html' not in content_type and 'xml' not in content_type:
+                return ParameterCollector(url)
+            if self.executor is not None and self.executor.mode != 'inline':
+                return self.executor.run(extract_parameters, b"".join(self.http_client.iter_bytes(response)),
+                                         response.encoding, url, self.backend.name)
+            return self.extract(url, self.http_client.iter_text(response, chunk_size=self.CHUNK_SIZE))
+        except Exception as e:
+            logger.error(f"Error parsing {url}: {e}")
+            return ParameterCollector(url)
+        finally:
+            self.http_client.release(response)
+    
+    def discover_endpoints(self, url):
+        """
+        کشف پارامترها به تفکیک endpoint
+        Discover parameters grouped by endpoint
+        
+        بازگشت / Returns:
+        - دیکشنری endpoint -> لیست پارامترها
+        """
+        collector = self.fetch(url)
+        self.endpoints = {endpoint: list(params) for endpoint, params in collector.endpoints.items()}
+        self.links = list(collector.links)
+        return self.endpoints
+    
+    def discover_parameters(self, url):
+        """کشف پارامترهای هدف / Discover target parameters"""
+        endpoints = self.discover_endpoints(url)
+        parameters = list(dict.fromkeys(name for params in endpoints.values() for name in params))
+        if not parameters:
+            logger.info("No parameters discovered - falling back to common parameter names")
+            return list(self.COMMON_PARAMETERS)
+        return parameters
+
+class BloomFilter:
+    """
+    فیلتر Bloom برای مجموعه‌های بزرگ
+    Bloom filter for very large membership sets
+    
+    اندیس‌ها با double hashing از یک digest ساخته می‌شوند
+    Bit indices are derived from one digest with double hashing.
+    """
+    
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        import math
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _indexes(self, digest):
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+    
+    def add(self, digest):
+        """
+        افزودن digest؛ اگر (احتمالا) از قبل وجود داشته False برمی‌گرداند
+        Add a digest; returns False if it was (probably) already present
+        """
+        bits = self.bits
+        added = False
+        for index in self._indexes(digest):
+            mask = 1 << (index & 7)
+            if not bits[index >> 3] & mask:
+                bits[index >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+    
+    def __contains__(self, digest):
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(digest))
+
+class SeenSet:
+    """
+    مجموعه فشرده URLهای دیده شده
+    Compact set of seen URLs
+    
+    URLها به صورت digest شانزده بایتی نگهداری می‌شوند و پس از رسیدن به
+    bloom_threshold به یک فیلتر Bloom منتقل می‌شوند (با bloom_threshold=None
+    مجموعه همیشه دقیق می‌ماند)
+    URLs are stored as 16-byte digests and migrate to a Bloom filter once
+    bloom_threshold entries have been seen; with bloom_threshold=None the
+    set stays exact.
+    """
+    
+    def __init__(self, bloom_threshold=100_000, bloom_capacity=10_000_000, error_rate=0.001):
+        self.bloom_threshold = bloom_threshold
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.digests = set()
+        self.bloom = None
+    
+    @staticmethod
+    def _digest(url):
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+    
+    def add(self, url):
+        """
+        افزودن URL؛ اگر قبلا دیده شده False برمی‌گرداند
+        Add a URL; returns False if it had already been seen
+        """
+        digest = self._digest(url)
+        if self.bloom is not None:
+            return self.bloom.add(digest)
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        if self.bloom_threshold is not None and len(self.digests) >= self.bloom_threshold:
+            self.bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+            for old_digest in self.digests:
+                self.bloom.add(old_digest)
+            self.digests = set()
+        return True
+    
+    def __contains__(self, url):
+        digest = self._digest(url)
+        if self.bloom is not None:
+            return digest in self.bloom
+        return digest in self.digests
+    
+    def __len__(self):
+        return self.bloom.count if self.bloom is not None else len(self.digests)
+
+class WebCrawler:
+    """
+    خزنده همزمان محدود به دامنه
+    Concurrent, scope-restricted breadth-first crawler
+    
+    صفحات با N کارگر همزمان دریافت می‌شوند و نتیجه هر صفحه بلافاصله yield می‌شود
+    Pages are fetched by N concurrent workers and each page's parameters are
+    yielded as soon as it has been parsed, so scanning can start while the
+    crawl is still running.
+    """
+    
+    def __init__(self, discoverer, config=None):
+        """
+        پارامترها / Parameters:
+        - discoverer: نمونه ParameterDiscoverer
+        - config: دیکشنری تنظیمات (max_depth, max_pages, workers, scope, bloom_threshold)
+        """
+        self.discoverer = discoverer
+        self.config = config or {}
+        self.max_depth = self.config.get('max_depth', 2)
+        self.max_pages = self.config.get('max_pages', 100)
+        self.workers = self.config.get('workers', 4)
+        self.scope = self.config.get('scope')
+        self.bloom_threshold = self.config.get('bloom_threshold', 100_000)
+    
+    def _allowed_hosts(self, start_url):
+        if self.scope:
+            return {host.lower() for host in self.scope}
+        return {urlsplit(start_url).netloc.lower()}
+    
+    @staticmethod
+    def in_scope(url, allowed_hosts):
+        """بررسی قرارگیری URL در محدوده مجاز / Check URL against scope allowlist"""
+        parsed = urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        host = parsed.netloc.lower()
+        for allowed in allowed_hosts:
+            if host == allowed or (allowed.startswith('*.') and host.endswith(allowed[1:])):
+                return True
+        return False
+    
+    def crawl(self, start_url):
+        """
+        خزش از start_url و تولید نتایج صفحه به صفحه
+        Crawl from start_url, yielding results page by page
+        
+        بازگشت / Yields:
+        - (page_url, endpoints) که endpoints دیکشنری endpoint -> tuple پارامترهای intern شده است
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        
+        allowed_hosts = self._allowed_hosts(start_url)
+        start_url = normalize_url(start_url)
+        seen = SeenSet(self.bloom_threshold)
+        seen.add(start_url)
+        frontier = deque([(start_url, 0)])
+        pending = {}
+        fetched = 0
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while frontier or pending:
+                while frontier and len(pending) < self.workers and fetched < self.max_pages:
+                    url, depth = frontier.popleft()
+                    pending[executor.submit(self.discoverer.fetch, url)] = (url, depth)
+                    fetched += 1
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = pending.pop(future)
+                    collector = future.result()
+                    if depth < self.max_depth:
+                        for link in collector.links:
+                            link = normalize_url(link)
+                            if self.in_scope(link, allowed_hosts) and seen.add(link):
+                                frontier.append((link, depth + 1))
+                    endpoints = {endpoint: tuple(params) for endpoint, params in collector.endpoints.items()
+                                 if self.in_scope(endpoint, allowed_hosts)}
+                    yield url, endpoints
+        
+        logger.info(f"Crawl finished: {fetched} pages fetched, {len(seen)} URLs seen")
+
+# =============================================================================
+# خروجی جریانی یافته‌ها / Streaming Findings Output
+# =============================================================================
+
+# مبدا ساعت دیواری برای زمان‌های monotonic / Wall-clock origin of monotonic timestamps
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+def format_timestamp(monotonic_ns):
+    """
+    تبدیل زمان monotonic (نانوثانیه) به رشته ISO فقط هنگام خروجی
+    Format a monotonic nanosecond timestamp as ISO 8601, only at output time
+    """
+    return datetime.fromtimestamp((_WALL_CLOCK_OFFSET_NS + monotonic_ns) / 1e9).isoformat()
+
+class StringTable:
+    """
+    جدول رشته‌های یکتا برای ذخیره ستونی
+    Table of unique strings for columnar storage
+    
+    هر رشته یک بار ذخیره و با اندیس صحیح ارجاع داده می‌شود
+    Each string is stored once and referenced by an integer index.
+    """
+    
+    __slots__ = ('index', 'strings')
+    
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+    
+    def add(self, value):
+        """اندیس رشته (در صورت نیاز افزودن) / Index of a string, adding it if needed"""
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return position
+    
+    def __getitem__(self, position):
+        return self.strings[position]
+    
+    def __len__(self):
+        return len(self.strings)
+
+class Finding(Mapping):
+    """
+    رکورد فشرده یک یافته
+    Compact record of one finding
+    
+    به جای دیکشنری با __slots__ ذخیره می‌شود؛ URL، نوع و پارامتر intern شده‌اند
+    و زمان به صورت عدد صحیح monotonic نگهداری و فقط هنگام خواندن 'timestamp'
+    قالب‌بندی می‌شود. رابط Mapping دسترسی finding['type'] را حفظ می‌کند.
+    Stored in __slots__ instead of a dict: type, URL and parameter are
+    interned and the time is kept as a monotonic integer that is only
+    formatted when 'timestamp' is read. The Mapping interface keeps
+    finding['type'] and dict(finding) working.
+    """
+    
+    __slots__ = ('type', 'url', 'parameter', 'payload', 'evidence', 'created_ns')
+    FIELDS = ('type', 'url', 'parameter', 'payload', 'evidence', 'timestamp')
+    
+    def __init__(self, type, url, parameter='', payload='', evidence='', created_ns=None):
+        self.type = sys.intern(type)
+        self.url = sys.intern(url)
+        self.parameter = sys.intern(parameter)
+        self.payload = payload
+        self.evidence = evidence
+        self.created_ns = time.monotonic_ns() if created_ns is None else created_ns
+    
+    @property
+    def timestamp(self):
+        return format_timestamp(self.created_ns)
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __len__(self):
+        return len(self.FIELDS)
+    
+    def to_dict(self):
+        """دیکشنری قابل سریال‌سازی / JSON-serializable dict"""
+        return {key: getattr(self, key) for key in self.FIELDS}
+    
+    def __repr__(self):
+        return f"Finding({self.type!r}, {self.url!r}, parameter={self.parameter!r})"
+
+class FindingTable(Sequence):
+    """
+    مجموعه ستونی یافته‌ها برای نگهداری حجیم
+    Columnar collection of findings, for bulk storage
+    
+    نوع، URL و پارامتر به صورت اندیس در StringTable و زمان‌ها در array نگهداری
+    می‌شوند؛ Finding فقط هنگام دسترسی ساخته می‌شود. scan_target لیست دیکشنری
+    برمی‌گرداند؛ برای اسکن‌های بزرگ FindingTable(framework.iter_scan(url)) را
+    بسازید و با to_dicts() سریال کنید
+    Type, URL and parameter are stored as StringTable indexes and times in
+    an array; Finding records are only built on access. scan_target returns
+    a list of dicts; for large scans build FindingTable(framework.iter_scan(url))
+    and serialize it with to_dicts().
+    """
+    
+    def __init__(self, findings=()):
+        import array
+        self.strings = StringTable()
+        self.types = array.array('I')
+        self.urls = array.array('I')
+        self.parameters = array.array('I')
+        self.payloads = []
+        self.evidence = []
+        self.created_ns = array.array('q')
+        for finding in findings:
+            self.append(finding)
+    
+    def append(self, finding):
+        """
+        افزودن یافته (Finding یا دیکشنری)
+        Append a Finding or finding dict
+        
+        زمان 'timestamp' دیکشنری (ISO 8601) حفظ می‌شود
+        A dict's ISO 8601 'timestamp' is preserved.
+        """
+        if not isinstance(finding, Finding):
+            timestamp = finding.get('timestamp')
+            created_ns = None
+            if timestamp:
+                wall_ns = round(datetime.fromisoformat(timestamp).timestamp() * 1_000_000) * 1000
+                created_ns = wall_ns - _WALL_CLOCK_OFFSET_NS
+            finding = Finding(finding['type'], finding['url'], finding.get('parameter', ''),
+                              finding.get('payload', ''), finding.get('evidence', ''), created_ns)
+        self.types.append(self.strings.add(finding.type))
+        self.urls.append(self.strings.add(finding.url))
+        self.parameters.append(self.strings.add(finding.parameter))
+        self.payloads.append(finding.payload)
+        self.evidence.append(finding.evidence)
+        self.created_ns.append(finding.created_ns)
+    
+    def __len__(self):
+        return len(self.created_ns)
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(len(self)))]
+        strings = self.strings
+        return Finding(strings[self.types[position]], strings[self.urls[position]],
+                       strings[self.parameters[position]], self.payloads[position],
+                       self.evidence[position], self.created_ns[position])
+    
+    def to_dicts(self):
+        """لیست دیکشنری‌ها برای سریال‌سازی / List of dicts for serialization"""
+        return [finding.to_dict() for finding in self]
+
+class FindingSink(ABC):
+    """
+    رابط پایه مقصد یافته‌ها
+    Base interface for findings sinks
+    
+    یافته‌ها به محض تولید نوشته می‌شوند؛ checkpoint داده‌های بافر شده را روی دیسک
+    قطعی می‌کند
+    Findings are written as soon as they are produced; checkpoint() makes
+    buffered data durable.
+    """
+    
+    @abstractmethod
+    def write(self, finding):
+        """نوشتن یک یافته / Write one finding"""
+        pass
+    
+    def checkpoint(self):
+        """قطعی‌سازی داده‌های بافر شده / Make buffered data durable"""
+        pass
+    
+    def close(self):
+        """بستن مقصد / Close the sink"""
+        self.checkpoint()
+
+class _FileSink(FindingSink):
+    """مقصد فایلی بافر شده با fsync دوره‌ای / Buffered file sink with periodic fsync"""
+    
+    def __init__(self, path, checkpoint_every=100, buffer_size=64 * 1024):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.count = 0
+        self._file = open(path, 'a', encoding='utf-8', buffering=buffer_size)
+        self._lock = threading.Lock()
+    
+    def _append(self, text):
+        with self._lock:
+            self._file.write(text)
+            self.count += 1
+            if self.count % self.checkpoint_every == 0:
+                self._sync()
+    
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def checkpoint(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+    
+    def close(self):
+        self.checkpoint()
+        with self._lock:
+            self._file.close()
+
+class JSONLSink(_FileSink):
+    """خروجی JSON Lines (یک یافته در هر خط) / JSON Lines output, one finding per line"""
+    
+    def write(self, finding):
+        self._append(json.dumps(dict(finding), ensure_ascii=False) + '\n')
+
+class SARIFSink(_FileSink):
+    """
+    خروجی SARIF 2.1.0
+    SARIF 2.1.0 output
+    
+    سرآیند هنگام باز شدن و پایان‌بند هنگام close نوشته می‌شود؛ نتایج بین آن‌ها
+    به صورت افزایشی اضافه می‌شوند
+    The header is written on open and the footer on close(); results are
+    appended incrementally in between.
+    """
+    
+    def __init__(self, path, checkpoint_every=100, buffer_size=64 * 1024):
+        with open(path, 'w', encoding='utf-8'):
+            pass
+        super().__init__(path, checkpoint_every, buffer_size)
+        self._file.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            '"runs": [{"tool": {"driver": {"name": "AI-Hacker"}}, "results": [\n'
+        )
+    
+    def write(self, finding):
+        result = {
+            'ruleId': finding['type'],
+            'level': 'error',
+            'message': {'text': f"{finding['type']} via parameter '{finding['parameter']}'"},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': finding['url']}}}],
+            'properties': {key: finding[key] for key in ('parameter', 'payload', 'evidence', 'timestamp')}
+        }
+        separator = ',\n' if self.count else ''
+        self._append(separator + json.dumps(result, ensure_ascii=False))
+    
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.write('\n]}]}\n')
+        super().close()
+
+class StdoutSink(FindingSink):
+    """چاپ یافته‌ها در خروجی استاندارد / Print findings to stdout"""
+    
+    def __init__(self):
+        self.count = 0
+    
+    def write(self, finding):
+        if not self.count:
+            print("\n" + "=" * 40)
+            print("SCAN RESULTS / نتایج اسکن")
+            print("=" * 40)
+        self.count += 1
+        print(f"Type: {finding['type']}")
+        print(f"Parameter: {finding['parameter']}")
+        print(f"Payload: {finding['payload']}")
+        print("-" * 20, flush=True)
+
+# =============================================================================
+# دفتر کار قابل ازسرگیری / Resumable Work Ledger
+# =============================================================================
+
+class ScanLedger:
+    """
+    دفتر کار پایدار مبتنی بر SQLite (حالت WAL)
+    Persistent SQLite (WAL mode) work ledger for resumable scans
+    
+    هر واحد کار (endpoint, parameter, scanner, payload) پس از اتمام ثبت می‌شود.
+    commitها دسته‌ای انجام می‌شوند تا سربار پایین بماند؛ در صورت خرابی حداکثر
+    یک دسته دوباره اجرا می‌شود.
+    Every (endpoint, parameter, scanner, payload) work unit is recorded once
+    done. Commits are batched to keep overhead low; after a crash at most
+    one batch of units is re-run. before_commit runs ahead of every commit
+    so findings of those units are durable before the units count as done.
+    """
+    
+    def __init__(self, path, scan_id=None, batch_size=500, flush_interval=1.0, before_commit=None):
+        """
+        پارامترها / Parameters:
+        - path: مسیر فایل SQLite
+        - scan_id: شناسه اسکن برای ازسرگیری (پیش‌فرض: شناسه جدید)
+        - batch_size: تعداد واحدها در هر commit
+        - flush_interval: حداکثر فاصله زمانی بین commitها (ثانیه)
+        - before_commit: تابع بدون آرگومان که پیش از هر commit اجرا می‌شود (مثلا checkpoint مقصدها)
+        """
+        import sqlite3
+        import uuid
+        self.path = path
+        self.scan_id = scan_id or uuid.uuid4().hex[:12]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.before_commit = before_commit
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scans (scan_id TEXT PRIMARY KEY, target TEXT, "
+            "scan_types TEXT, started REAL, status TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS units (scan_id TEXT, unit BLOB, "
+            "PRIMARY KEY (scan_id, unit)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+        self.done = {row[0] for row in self.connection.execute(
+            "SELECT unit FROM units WHERE scan_id = ?", (self.scan_id,))}
+    
+    @staticmethod
+    def unit_key(endpoint, parameter, scanner, payload=''):
+        """کلید فشرده یک واحد کار / Compact key for a work unit"""
+        raw = '\x1f'.join((endpoint, parameter, scanner, payload)).encode('utf-8')
+        return hashlib.blake2b(raw, digest_size=16).digest()
+    
+    def start(self, target, scan_types):
+        """ثبت یا ازسرگیری رکورد اسکن / Create or resume the scan record"""
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO scans (scan_id, target, scan_types, started, status) VALUES (?, ?, ?, ?, 'running') "
+                "ON CONFLICT(scan_id) DO UPDATE SET status = 'running'",
+                (self.scan_id, target, json.dumps(scan_types), time.time())
+            )
+            self.connection.commit()
+    
+    def scan_info(self):
+        """اطلاعات اسکن ذخیره شده / Stored scan record"""
+        row = self.connection.execute(
+            "SELECT target, scan_types, status FROM scans WHERE scan_id = ?", (self.scan_id,)).fetchone()
+        if row is None:
+            return None
+        return {'target': row[0], 'scan_types': json.loads(row[1]), 'status': row[2]}
+    
+    def is_done(self, endpoint, parameter, scanner, payload=''):
+        return self.unit_key(endpoint, parameter, scanner, payload) in self.done
+    
+    def mark_done(self, endpoint, parameter, scanner, payload=''):
+        """ثبت اتمام یک واحد کار / Record a completed work unit"""
+        key = self.unit_key(endpoint, parameter, scanner, payload)
+        with self._lock:
+            if key in self.done:
+                return
+            self.done.add(key)
+            self._pending.append((self.scan_id, key))
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+    
+    def _flush(self):
+        if self._pending:
+            if self.before_commit is not None:
+                self.before_commit()
+            self.connection.executemany("INSERT OR IGNORE INTO units (scan_id, unit) VALUES (?, ?)", self._pending)
+            self.connection.commit()
+            self._pending = []
+        self._last_flush = time.monotonic()
+    
+    def flush(self):
+        """commit واحدهای در انتظار / Commit pending units"""
+        with self._lock:
+            self._flush()
+    
+    def finish(self):
+        """علامت‌گذاری اسکن به عنوان کامل / Mark the scan as completed"""
+        with self._lock:
+            self._flush()
+            self.connection.execute("UPDATE scans SET status = 'completed' WHERE scan_id = ?", (self.scan_id,))
+            self.connection.commit()
+    
+    def close(self):
+        with self._lock:
+            self._flush()
+            self.connection.close()
+
+# =============================================================================
+# برنامه‌ریزی اسکن / Scan Planning
+# =============================================================================
+
+# واحد کار فشرده: یک (endpoint، پارامتر، اسکنر، گونه پیلود). رشته‌ها توسط
+# ScanPlanner intern می‌شوند. namedtuple می‌ماند (نه __slots__) چون GC تاپل‌های
+# تمام‌رشته‌ای را از ردیابی خارج می‌کند و GC کامل روی میلیون‌ها واحد ارزان می‌ماند
+# Compact work unit: one (endpoint, parameter, scanner, payload variant).
+# Strings are interned by the ScanPlanner. It stays a namedtuple rather than
+# a __slots__ class because the GC untracks all-string tuples, which keeps
+# full collections cheap with millions of units alive.
+WorkUnit = namedtuple('WorkUnit', ('host', 'endpoint', 'parameter', 'scanner', 'payload'), defaults=('',))
+
+class WorkUnitTable:
+    """
+    ذخیره ستونی واحدهای کار برای برنامه‌های کامل
+    Columnar storage of work units for fully materialized plans
+    
+    هر ستون یک array از اندیس‌های StringTable است (۲۰ بایت برای هر واحد)
+    Every column is an array of StringTable indexes, 20 bytes per unit.
+    """
+    
+    COLUMNS = WorkUnit._fields
+    
+    def __init__(self, units=()):
+        import array
+        self.strings = StringTable()
+        self.columns = {name: array.array('I') for name in self.COLUMNS}
+        for unit in units:
+            self.append(unit)
+    
+    def append(self, unit):
+        add = self.strings.add
+        for name, column in self.columns.items():
+            column.append(add(getattr(unit, name)))
+    
+    def __len__(self):
+        return len(self.columns['endpoint'])
+    
+    def __getitem__(self, position):
+        strings = self.strings
+        return WorkUnit(*(strings[self.columns[name][position]] for name in self.COLUMNS))
+    
+    def __iter__(self):
+        strings = self.strings
+        columns = [self.columns[name] for name in self.COLUMNS]
+        for row in zip(*columns):
+            yield WorkUnit(*(strings[index] for index in row))
+    
+    def nbytes(self):
+        """حجم ستون‌ها (بدون رشته‌ها) / Size of the columns, excluding strings"""
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+class ScanPlanner:
+    """
+    کامپایلر برنامه اسکن: تبدیل جریان (endpoint، پارامترها) به واحدهای کار
+    Scan plan compiler: turns a stream of (endpoint, parameters) into work units
+    
+    واحدهای تکراری (همان مسیر با مقادیر query متفاوت، یا پارامتری که قبلا
+    برنامه‌ریزی شده) حذف می‌شوند، واحدهای هر host کنار هم می‌مانند تا اتصال‌ها
+    دوباره استفاده شوند و hostها نوبتی اجرا می‌شوند تا هیچ هدفی زیر بار نرود.
+    Duplicate units (the same path with different query values, or a
+    parameter planned before) are dropped. Units of one host stay together
+    for connection reuse, and hosts take turns so no single target is
+    hammered.
+    
+    برنامه جریانی است: حداکثر window واحد در بافر نگه داشته می‌شود و برای هر
+    جفت (endpoint، پارامتر) فقط یک digest شانزده بایتی در یک SeenSet دقیق ثبت
+    می‌شود. فیلتر Bloom پیش‌فرض نیست چون مثبت کاذب آن پارامترها را بی‌صدا از
+    اسکن حذف می‌کند.
+    The plan is streamed: at most window units are buffered and each
+    (endpoint, parameter) pair costs one 16-byte digest in an exact SeenSet.
+    A Bloom filter is opt-in only, since its false positives would silently
+    drop parameters from the scan.
+    """
+    
+    def __init__(self, scanners, scan_types=None, ledger=None, window=10_000, burst=64,
+                 bloom_threshold=None, bloom_capacity=10_000_000):
+        """
+        پارامترها / Parameters:
+        - scanners: دیکشنری نوع اسکن -> نمونه VulnerabilityScanner
+        - scan_types: انواع اسکن (پیش‌فرض: تمام اسکنرها)
+        - ledger: ScanLedger برای رد کردن واحدهای انجام شده (اختیاری)
+        - window: حداکثر واحدهای بافر شده پیش از تخلیه
+        - burst: حداکثر واحدهای متوالی یک host در هر نوبت
+        - bloom_threshold, bloom_capacity: تنظیمات SeenSet (None = همیشه دقیق)
+        """
+        if scan_types is None:
+            scan_types = list(scanners.keys())
+        self.scanners = {sys.intern(scan_type): scanners[scan_type] for scan_type in scan_types
+                         if scan_type in scanners}
+        self.ledger = ledger
+        self.window = window
+        self.burst = burst
+        self.seen = SeenSet(bloom_threshold, bloom_capacity)
+        self.queues = {}
+        self.ring = deque()
+        self.buffered = 0
+        self.counters = {'targets': 0, 'units': 0, 'duplicates': 0, 'completed': 0, 'max_buffered': 0}
+        self.hosts = set()
+    
+    def expand(self, endpoint, parameters):
+        """
+        گسترش یک endpoint به واحدهای کار جدید
+        Expand one endpoint into its new work units
+        
+        کلید تکرار endpoint بدون مقادیر query است
+        Duplicates are keyed on (endpoint without query values, parameter);
+        the scanner and payload expansion of a pair is the same every time,
+        so only one key per pair is kept.
+        """
+        parts = urlsplit(endpoint)
+        host = sys.intern(parts.netloc.lower())
+        endpoint_key = f"{parts.scheme.lower()}://{host}{parts.path or '/'}"
+        endpoint = sys.intern(endpoint)
+        self.hosts.add(host)
+        variants = [(scan_type, sys.intern(payload)) for scan_type, scanner in self.scanners.items()
+                    for payload in scanner.payload_variants(endpoint)]
+        fresh = [sys.intern(name) for name in parameters if self.seen.add(f"{endpoint_key}\x1f{name}")]
+        self.counters['duplicates'] += (len(parameters) - len(fresh)) * len(variants)
+        for scan_type, payload in variants:
+            for parameter in fresh:
+                if self.ledger is not None and self.ledger.is_done(endpoint, parameter, scan_type, payload):
+                    self.counters['completed'] += 1
+                    continue
+                yield WorkUnit(host, endpoint, parameter, scan_type, payload)
+    
+    def _enqueue(self, units):
+        for unit in units:
+            queue = self.queues.get(unit.host)
+            if queue is None:
+                queue = self.queues[unit.host] = deque()
+                self.ring.append(unit.host)
+            queue.append(unit)
+            self.buffered += 1
+        self.counters['max_buffered'] = max(self.counters['max_buffered'], self.buffered)
+    
+    def _turn(self):
+        """
+        یک نوبت host بعدی: تا burst واحد با همان (endpoint، اسکنر، پیلود)
+        One turn of the next host: up to burst units sharing (endpoint, scanner, payload)
+        """
+        host = self.ring.popleft()
+        queue = self.queues[host]
+        first = queue.popleft()
+        batch = [first]
+        while queue and len(batch) < self.burst:
+            unit = queue[0]
+            if (unit.endpoint, unit.scanner, unit.payload) != (first.endpoint, first.scanner, first.payload):
+                break
+            batch.append(queue.popleft())
+        if queue:
+            self.ring.append(host)
+        else:
+            del self.queues[host]
+        self.buffered -= len(batch)
+        self.counters['units'] += len(batch)
+        return batch
+    
+    def batches(self, targets):
+        """
+        تولید دسته‌های اجرایی به ترتیب برنامه
+        Yield execution batches in plan order
+        
+        هر دسته لیستی از WorkUnitهای یک (endpoint، اسکنر، پیلود) است. window
+        پنجره پیش‌نگری است: کار یک host تنها تا پر شدن آن نگه داشته می‌شود تا
+        hostهای بعدی برسند؛ وقتی چند host کار دارند پس از هر هدف یک دور کامل
+        اجرا می‌شود. window=0 هر هدف را بلافاصله اجرا می‌کند.
+        Each batch is a list of WorkUnits sharing (endpoint, scanner,
+        payload). window is the lookahead: while a single host has work, its
+        units are held until window is exceeded so later hosts can be
+        interleaved; once several hosts have work, one full round is released
+        after every target. window=0 runs every target immediately.
+        
+        پارامترها / Parameters:
+        - targets: iterable از (endpoint، لیست پارامترها)
+        """
+        for endpoint, parameters in targets:
+            self.counters['targets'] += 1
+            self._enqueue(self.expand(endpoint, parameters))
+            if len(self.ring) > 1:
+                for _ in range(len(self.ring)):
+                    yield self._turn()
+            while self.buffered > self.window:
+                yield self._turn()
+        while self.ring:
+            yield self._turn()
+    
+    def plan(self, targets):
+        """تولید تک‌تک واحدهای کار به ترتیب برنامه / Yield single work units in plan order"""
+        for batch in self.batches(targets):
+            yield from batch
+    
+    def compile(self, targets):
+        """برنامه کامل به صورت WorkUnitTable / The whole plan as a WorkUnitTable"""
+        return WorkUnitTable(self.plan(targets))
+    
+    def stats(self):
+        """آمار برنامه / Plan statistics"""
+        return {**self.counters, 'hosts': len(self.hosts), 'buffered': self.buffered}
+
+# =============================================================================
+# اجرای توزیع‌شده / Distributed Execution
+# =============================================================================
+
+def _encode_unit(unit):
+    return json.dumps([unit.host, unit.endpoint, unit.parameter, unit.scanner, unit.payload])
+
+def _decode_unit(data):
+    return WorkUnit(*(sys.intern(value) for value in json.loads(data)))
+
+def _encode_finding(finding):
+    # زمان monotonic در فرایند دیگر معنا ندارد؛ زمان دیواری ارسال می‌شود
+    # Monotonic times mean nothing in another process, so wall-clock ns travel instead
+    data = {key: getattr(finding, key) for key in ('type', 'url', 'parameter', 'payload', 'evidence')}
+    data['time_ns'] = _WALL_CLOCK_OFFSET_NS + finding.created_ns
+    return json.dumps(data, ensure_ascii=False)
+
+def _decode_finding(data):
+    data = json.loads(data)
+    return Finding(data['type'], data['url'], data['parameter'], data['payload'], data['evidence'],
+                   data['time_ns'] - _WALL_CLOCK_OFFSET_NS)
+
+class WorkQueue(ABC):
+    """
+    رابط پایه صف کار مشترک بین هماهنگ‌کننده و کارگرها
+    Base interface for the work queue shared by the coordinator and workers
+    
+    هماهنگ‌کننده واحدهای کار را منتشر می‌کند و کارگرها آن‌ها را با lease برمی‌دارند.
+    واحدی که تا پایان visibility timeout تایید (ack) نشود دوباره قابل lease است،
+    پس کار یک کارگر از کار افتاده به دیگران می‌رسد؛ پس از max_attempts بار lease
+    واحد کنار گذاشته می‌شود. یافته‌ها از همین صف به هماهنگ‌کننده بازمی‌گردند و
+    سطل‌های نرخ میزبان‌ها هم در آن نگهداری می‌شوند.
+    The coordinator publishes work units and workers lease them. A unit not
+    acknowledged before its visibility timeout can be leased again, so the
+    work of a crashed worker is picked up by the others; after max_attempts
+    leases the unit is set aside as dead. Findings stream back through the
+    same queue, which also holds the per-host rate buckets.
     
-    def url_encode(self, payload):
-        """کدگذاری URL / URL Encoding"""
-        return quote(payload)
+    start() هر اسکن جدید واحدها و یافته‌های باقیمانده اسکن قبلی را دور می‌ریزد و
+    شماره اسکن (stats()['scan']) را افزایش می‌دهد
+    Each start() discards the previous scan's leftover units and findings
+    and bumps the scan number (stats()['scan']).
+    """
     
-    def double_url_encode(self, payload):
-        """کدگذاری دوگانه URL / Double URL Encoding"""
-        return quote(quote(payload))
+    def __init__(self, name='default', max_attempts=3):
+        self.name = name
+        self.max_attempts = max_attempts
     
-    def unicode_encode(self, payload):
-        """کدگذاری یونیکد / Unicode Encoding"""
-        return ''.join(f'%u{ord(c):04x}' for c in payload)
+    @abstractmethod
+    def start(self):
+        """
+        شروع انتشار یک اسکن جدید
+        Begin publishing a new scan, discarding the previous scan's units and findings
+        """
+        pass
     
-    def add_evasion_technique(self, technique_func):
+    @abstractmethod
+    def put(self, units):
+        """انتشار واحدهای کار؛ تعداد را برمی‌گرداند / Publish work units, returning the count"""
+        pass
+    
+    @abstractmethod
+    def lease(self, count, visibility_timeout):
         """
-        اضافه کردن تکنیک جدید دور زدن
-        Add new evasion technique
+        برداشتن حداکثر count واحد به ترتیب انتشار
+        Lease up to count units, in publication order
         
+        بازگشت / Returns:
+        - لیست (ticket، WorkUnit)
+        """
+        pass
+    
+    @abstractmethod
+    def renew(self, tickets, visibility_timeout):
+        """تمدید lease واحدهای در حال اجرا / Extend the lease of running units"""
+        pass
+    
+    @abstractmethod
+    def ack(self, tickets):
+        """تایید اتمام واحدها / Acknowledge completed units"""
+        pass
+    
+    @abstractmethod
+    def finish(self):
+        """اعلام پایان انتشار / Mark publishing as finished"""
+        pass
+    
+    @abstractmethod
+    def stats(self):
+        """
+        تعداد واحدهای pending، leased و dead، یافته‌های در صف، finished و شماره اسکن
+        Queue counters: pending, leased and dead units, queued findings, finished and the scan number
+        """
+        pass
+    
+    def drained(self, stats=None):
+        """انتشار تمام شده و واحد زنده‌ای باقی نمانده / Publishing finished and no live units left"""
+        stats = stats or self.stats()
+        return stats['finished'] and not stats['pending'] and not stats['leased']
+    
+    @abstractmethod
+    def push_findings(self, findings):
+        """ارسال یافته‌ها به هماهنگ‌کننده / Send findings to the coordinator"""
+        pass
+    
+    @abstractmethod
+    def pop_findings(self, limit=100):
+        """دریافت یافته‌های رسیده / Take findings that have arrived"""
+        pass
+    
+    @abstractmethod
+    def reserve(self, host, rate, burst):
+        """
+        رزرو یک توکن از سطل مشترک میزبان و بازگرداندن زمان انتظار
+        Reserve one token from the host's shared bucket and return the wait time
+        """
+        pass
+    
+    def close(self):
+        """بستن اتصال / Close the connection"""
+        pass
+
+class InProcessWorkQueue(WorkQueue):
+    """
+    صف کار درون فرایندی (جایگزین broker برای تست و کارگرهای thread)
+    In-process work queue, the broker stand-in for tests and thread workers
+    """
+    
+    def __init__(self, name='default', max_attempts=3):
+        super().__init__(name, max_attempts)
+        self.units = {}
+        self.pending = deque()
+        self.leases = {}
+        self.attempts = defaultdict(int)
+        self.dead = 0
+        self.findings = deque()
+        self.buckets = {}
+        self.finished = False
+        self.scan = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+    
+    def start(self):
+        with self._lock:
+            self.units.clear()
+            self.pending.clear()
+            self.leases.clear()
+            self.attempts.clear()
+            self.findings.clear()
+            self.dead = 0
+            self.scan += 1
+            self.finished = False
+    
+    def put(self, units):
+        with self._lock:
+            count = 0
+            for unit in units:
+                ticket = next(self._ids)
+                self.units[ticket] = _encode_unit(unit)
+                self.pending.append(ticket)
+                count += 1
+            return count
+    
+    def _requeue_expired(self, now):
+        expired = sorted(ticket for ticket, until in self.leases.items() if until <= now)
+        for ticket in expired:
+            del self.leases[ticket]
+            self.pending.appendleft(ticket)
+    
+    def lease(self, count, visibility_timeout):
+        with self._lock:
+            now = time.time()
+            self._requeue_expired(now)
+            leased = []
+            while self.pending and len(leased) < count:
+                ticket = self.pending.popleft()
+                if ticket not in self.units:
+                    continue
+                self.attempts[ticket] += 1
+                if self.attempts[ticket] > self.max_attempts:
+                    del self.units[ticket]
+                    self.dead += 1
+                    continue
+                self.leases[ticket] = now + visibility_timeout
+                leased.append((ticket, _decode_unit(self.units[ticket])))
+            return leased
+    
+    def renew(self, tickets, visibility_timeout):
+        with self._lock:
+            until = time.time() + visibility_timeout
+            for ticket in tickets:
+                if ticket in self.leases:
+                    self.leases[ticket] = until
+    
+    def ack(self, tickets):
+        with self._lock:
+            for ticket in tickets:
+                self.units.pop(ticket, None)
+                self.leases.pop(ticket, None)
+                self.attempts.pop(ticket, None)
+    
+    def finish(self):
+        with self._lock:
+            self.finished = True
+    
+    def stats(self):
+        with self._lock:
+            return {'pending': len(self.units) - len(self.leases), 'leased': len(self.leases),
+                    'dead': self.dead, 'findings': len(self.findings), 'finished': self.finished,
+                    'scan': self.scan}
+    
+    def push_findings(self, findings):
+        with self._lock:
+            self.findings.extend(_encode_finding(finding) for finding in findings)
+    
+    def pop_findings(self, limit=100):
+        with self._lock:
+            taken = [self.findings.popleft() for _ in range(min(limit, len(self.findings)))]
+        return [_decode_finding(data) for data in taken]
+    
+    def reserve(self, host, rate, burst):
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(rate, burst)
+        return bucket._reserve()
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    صف کار مبتنی بر SQLite (حالت WAL) برای چند فرایند روی یک میزبان
+    SQLite (WAL mode) work queue for several processes on one machine
+    
+    lease و رزرو توکن هر کدام یک دستور UPDATE ... RETURNING اتمی هستند. هر فرایند
+    باید اتصال خود را باز کند (پس از fork دوباره بسازید).
+    Leasing and token reservation are each one atomic UPDATE ... RETURNING
+    statement. Every process must open its own instance (re-create after fork).
+    """
+    
+    def __init__(self, path, name='default', max_attempts=3, timeout=30.0):
+        """
         پارامترها / Parameters:
-        - technique_func: تابعی که یک پیلود می‌گیرد و نسخه تغییر یافته را برمی‌گرداند
+        - path: مسیر فایل SQLite
+        - name: نام صف (چند اسکن می‌توانند یک فایل را به اشتراک بگذارند)
+        - max_attempts: حداکثر دفعات lease یک واحد
+        - timeout: زمان انتظار قفل پایگاه داده (ثانیه)
         """
-        self.techniques.append(technique_func)
+        import sqlite3
+        super().__init__(name, max_attempts)
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS work_units (id INTEGER PRIMARY KEY, queue TEXT, unit TEXT, "
+            "lease_until REAL DEFAULT 0, attempts INTEGER DEFAULT 0)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS work_units_ready ON work_units (queue, attempts, lease_until, id)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS work_findings (id INTEGER PRIMARY KEY, queue TEXT, finding TEXT)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS work_queues (queue TEXT PRIMARY KEY, finished INTEGER, scan INTEGER DEFAULT 0)")
+        if 'scan' not in {row[1] for row in self.connection.execute("PRAGMA table_info(work_queues)")}:
+            self.connection.execute("ALTER TABLE work_queues ADD COLUMN scan INTEGER DEFAULT 0")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (host TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+    
+    def _execute(self, sql, parameters=()):
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+    
+    def start(self):
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute("DELETE FROM work_units WHERE queue = ?", (self.name,))
+                self.connection.execute("DELETE FROM work_findings WHERE queue = ?", (self.name,))
+                self.connection.execute("INSERT INTO work_queues (queue, finished, scan) VALUES (?, 0, 1) "
+                                        "ON CONFLICT(queue) DO UPDATE SET finished = 0, scan = scan + 1", (self.name,))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+    
+    def put(self, units):
+        rows = [(self.name, _encode_unit(unit)) for unit in units]
+        with self._lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany("INSERT INTO work_units (queue, unit) VALUES (?, ?)", rows)
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return len(rows)
+    
+    def lease(self, count, visibility_timeout):
+        now = time.time()
+        rows = self._execute(
+            "UPDATE work_units SET lease_until = ?, attempts = attempts + 1 WHERE id IN "
+            "(SELECT id FROM work_units WHERE queue = ? AND attempts < ? AND lease_until <= ? ORDER BY id LIMIT ?) "
+            "RETURNING id, unit",
+            (now + visibility_timeout, self.name, self.max_attempts, now, count)
+        )
+        return [(ticket, _decode_unit(data)) for ticket, data in sorted(rows)]
+    
+    def renew(self, tickets, visibility_timeout):
+        until = time.time() + visibility_timeout
+        with self._lock:
+            self.connection.executemany("UPDATE work_units SET lease_until = ? WHERE id = ?",
+                                        [(until, ticket) for ticket in tickets])
+    
+    def ack(self, tickets):
+        with self._lock:
+            self.connection.executemany("DELETE FROM work_units WHERE id = ?", [(ticket,) for ticket in tickets])
+    
+    def finish(self):
+        self._execute("UPDATE work_queues SET finished = 1 WHERE queue = ?", (self.name,))
+    
+    def stats(self):
+        now = time.time()
+        (pending, leased, dead), = self._execute(
+            "SELECT coalesce(sum(attempts < ? AND lease_until <= ?), 0), coalesce(sum(lease_until > ?), 0), "
+            "coalesce(sum(attempts >= ? AND lease_until <= ?), 0) FROM work_units WHERE queue = ?",
+            (self.max_attempts, now, now, self.max_attempts, now, self.name)
+        )
+        (findings,), = self._execute("SELECT count(*) FROM work_findings WHERE queue = ?", (self.name,))
+        state = self._execute("SELECT finished, scan FROM work_queues WHERE queue = ?", (self.name,))
+        finished, scan = state[0] if state else (0, 0)
+        return {'pending': pending, 'leased': leased, 'dead': dead, 'findings': findings,
+                'finished': bool(finished), 'scan': scan or 0}
+    
+    def push_findings(self, findings):
+        with self._lock:
+            self.connection.executemany("INSERT INTO work_findings (queue, finding) VALUES (?, ?)",
+                                        [(self.name, _encode_finding(finding)) for finding in findings])
+    
+    def pop_findings(self, limit=100):
+        rows = self._execute(
+            "DELETE FROM work_findings WHERE id IN "
+            "(SELECT id FROM work_findings WHERE queue = ? ORDER BY id LIMIT ?) RETURNING id, finding",
+            (self.name, limit)
+        )
+        return [_decode_finding(data) for _, data in sorted(rows)]
+    
+    def reserve(self, host, rate, burst):
+        (tokens,), = self._execute(
+            "INSERT INTO rate_buckets (host, tokens, updated) VALUES (?, ? - 1, ?) "
+            "ON CONFLICT(host) DO UPDATE SET "
+            "tokens = min(?, tokens + max(0, excluded.updated - updated) * ?) - 1, "
+            "updated = max(updated, excluded.updated) RETURNING tokens",
+            (host, burst, time.time(), burst, rate)
+        )
+        return 0.0 if tokens >= 0 else -tokens / rate
+    
+    def close(self):
+        with self._lock:
+            self.connection.close()
 
-class ParameterDiscoverer:
+class RedisWorkQueue(WorkQueue):
     """
-    کشف کننده پارامترهای URL و فرم
-    URL and Form Parameter Discoverer
+    صف کار مبتنی بر Redis برای کارگرهای چند گره‌ای (نیازمند بسته redis)
+    Redis work queue for workers spread over several nodes (needs the redis package)
+    
+    واحدها در یک hash، ترتیب در یک list و leaseها در یک sorted set با زمان انقضا
+    نگهداری می‌شوند. lease و رزرو توکن اسکریپت‌های Lua اتمی هستند و زمان را از
+    TIME خود Redis می‌گیرند تا اختلاف ساعت گره‌ها اثری نداشته باشد.
+    Units live in a hash, their order in a list and leases in a sorted set
+    scored by expiry. Leasing and token reservation are atomic Lua scripts
+    that read Redis' own TIME, so clock skew between nodes does not matter.
     """
     
-    def __init__(self, http_client):
-        self.http_client = http_client
+    LEASE_SCRIPT = """
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+    for index = #expired, 1, -1 do
+        redis.call('ZREM', KEYS[2], expired[index])
+        redis.call('LPUSH', KEYS[1], expired[index])
+    end
+    local leased = {}
+    while #leased < tonumber(ARGV[1]) * 2 do
+        local ticket = redis.call('LPOP', KEYS[1])
+        if not ticket then break end
+        local unit = redis.call('HGET', KEYS[3], ticket)
+        if unit then
+            if redis.call('HINCRBY', KEYS[4], ticket, 1) > tonumber(ARGV[3]) then
+                redis.call('HDEL', KEYS[3], ticket)
+                redis.call('HDEL', KEYS[4], ticket)
+                redis.call('INCR', KEYS[5])
+            else
+                redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), ticket)
+                table.insert(leased, ticket)
+                table.insert(leased, unit)
+            end
+        end
+    end
+    return leased
+    """
     
-    def discover_parameters(self, url):
-        """کشف پارامترهای هدف / Discover target parameters"""
-        # TODO: پیاده‌سازی منطق کشف پارامتر
-        # Implement parameter discovery logic
-        common_params = ['id', 'page', 'file', 'cmd', 'search', 'query']
-        return common_params
+    RENEW_SCRIPT = """
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    for index = 2, #ARGV do
+        redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[1]), ARGV[index])
+    end
+    return 0
+    """
+    
+    RESERVE_SCRIPT = """
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate) - 1
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], 3600)
+    return tostring(tokens)
+    """
+    
+    def __init__(self, url='redis://localhost:6379/0', name='default', max_attempts=3, prefix='ai-hacker'):
+        """
+        پارامترها / Parameters:
+        - url: آدرس Redis
+        - name: نام صف
+        - max_attempts: حداکثر دفعات lease یک واحد
+        - prefix: پیشوند کلیدها
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisWorkQueue requires the 'redis' package (pip install redis)") from e
+        super().__init__(name, max_attempts)
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.keys = {part: f"{prefix}:{name}:{part}"
+                     for part in ('ids', 'pending', 'leased', 'units', 'attempts', 'dead', 'findings', 'finished',
+                                  'scan')}
+        self._lease = self.redis.register_script(self.LEASE_SCRIPT)
+        self._renew = self.redis.register_script(self.RENEW_SCRIPT)
+        self._reserve = self.redis.register_script(self.RESERVE_SCRIPT)
+    
+    def start(self):
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.delete(*(self.keys[part] for part in
+                          ('pending', 'leased', 'units', 'attempts', 'dead', 'findings', 'finished')))
+        pipeline.incr(self.keys['scan'])
+        pipeline.execute()
+    
+    def put(self, units):
+        encoded = [_encode_unit(unit) for unit in units]
+        if not encoded:
+            return 0
+        last = self.redis.incrby(self.keys['ids'], len(encoded))
+        tickets = [str(ticket) for ticket in range(last - len(encoded) + 1, last + 1)]
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.hset(self.keys['units'], mapping=dict(zip(tickets, encoded)))
+        pipeline.rpush(self.keys['pending'], *tickets)
+        pipeline.execute()
+        return len(encoded)
+    
+    def lease(self, count, visibility_timeout):
+        keys = [self.keys[part] for part in ('pending', 'leased', 'units', 'attempts', 'dead')]
+        flat = self._lease(keys=keys, args=[count, visibility_timeout, self.max_attempts])
+        return [(flat[index], _decode_unit(flat[index + 1])) for index in range(0, len(flat), 2)]
+    
+    def renew(self, tickets, visibility_timeout):
+        if tickets:
+            self._renew(keys=[self.keys['leased']], args=[visibility_timeout, *tickets])
+    
+    def ack(self, tickets):
+        if tickets:
+            pipeline = self.redis.pipeline(transaction=True)
+            pipeline.zrem(self.keys['leased'], *tickets)
+            pipeline.hdel(self.keys['units'], *tickets)
+            pipeline.hdel(self.keys['attempts'], *tickets)
+            pipeline.execute()
+    
+    def finish(self):
+        self.redis.set(self.keys['finished'], 1)
+    
+    def stats(self):
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.hlen(self.keys['units'])
+        pipeline.zcard(self.keys['leased'])
+        pipeline.get(self.keys['dead'])
+        pipeline.llen(self.keys['findings'])
+        pipeline.exists(self.keys['finished'])
+        pipeline.get(self.keys['scan'])
+        units, leased, dead, findings, finished, scan = pipeline.execute()
+        return {'pending': units - leased, 'leased': leased, 'dead': int(dead or 0),
+                'findings': findings, 'finished': bool(finished), 'scan': int(scan or 0)}
+    
+    def push_findings(self, findings):
+        encoded = [_encode_finding(finding) for finding in findings]
+        if encoded:
+            self.redis.rpush(self.keys['findings'], *encoded)
+    
+    def pop_findings(self, limit=100):
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.lrange(self.keys['findings'], 0, limit - 1)
+        pipeline.ltrim(self.keys['findings'], limit, -1)
+        taken, _ = pipeline.execute()
+        return [_decode_finding(data) for data in taken]
+    
+    def reserve(self, host, rate, burst):
+        tokens = float(self._reserve(keys=[f"{self.prefix}:rate:{host}"], args=[rate, burst]))
+        return 0.0 if tokens >= 0 else -tokens / rate
+    
+    def close(self):
+        self.redis.close()
+
+# صف‌های درون فرایندی بر اساس نام / In-process queues by name
+_IN_PROCESS_QUEUES = {}
+
+def open_work_queue(url=None, name='default', **options):
+    """
+    باز کردن صف کار از روی آدرس
+    Open a work queue from its URL
+    
+    پارامترها / Parameters:
+    - url: memory:// (پیش‌فرض)، sqlite:///path/queue.db یا redis://host:6379/0
+    - name: نام صف
+    - options: تنظیمات اضافی سازنده صف (max_attempts, ...)
+    """
+    if not url or url.startswith('memory:'):
+        queue = _IN_PROCESS_QUEUES.get(name)
+        if queue is None:
+            queue = _IN_PROCESS_QUEUES[name] = InProcessWorkQueue(name, **options)
+        return queue
+    if url.startswith('sqlite:///'):
+        return SQLiteWorkQueue(url[len('sqlite:///'):], name, **options)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisWorkQueue(url, name, **options)
+    raise ValueError(f"Unsupported work queue URL '{url}'")
+
+class ScanWorker:
+    """
+    کارگر اسکن: lease واحدها از صف، اجرا با اسکنرهای فریمورک و ارسال یافته‌ها
+    Scan worker: leases units from the queue, runs them with the framework's
+    scanners and streams findings back
+    
+    واحدهای متوالی با (endpoint، اسکنر، پیلود) یکسان در یک فراخوانی scan اجرا
+    می‌شوند. واحدی که اسکنرش خطا بدهد تایید نمی‌شود تا پس از visibility timeout
+    دوباره اجرا شود؛ پس از max_attempts صف آن را کنار می‌گذارد.
+    Consecutive units sharing (endpoint, scanner, payload) run in one scan
+    call. Units whose scanner raises are not acknowledged, so they are
+    retried after the visibility timeout until the queue's max_attempts.
+    
+    یک thread ضربان، lease دسته فعلی را هر یک سوم visibility timeout تمدید
+    می‌کند تا اسکن طولانی یک گروه باعث lease دوباره و اجرای تکراری نشود
+    A heartbeat thread renews the current batch's lease every third of the
+    visibility timeout, so a long-running group is not leased out again and
+    scanned twice.
+    
+    کارگری که صف را تمام شده و خالی بیابد (اسکن قبلی) تا شروع اسکن بعدی منتظر
+    می‌ماند، پس کارگرها می‌توانند پیش از هماهنگ‌کننده اجرا شوند
+    A worker that finds the queue finished and empty (a previous scan)
+    waits for the next scan to start, so workers may be launched before
+    the coordinator.
+    """
+    
+    def __init__(self, framework, queue, worker_id=None, batch_size=8, visibility_timeout=300.0,
+                 poll_interval=0.5, exit_when_drained=True):
+        """
+        پارامترها / Parameters:
+        - framework: نمونه VulnerabilityScannerFramework با اسکنرهای ثبت شده
+        - queue: نمونه WorkQueue
+        - worker_id: شناسه کارگر برای لاگ
+        - batch_size: تعداد واحد در هر lease
+        - visibility_timeout: مدت lease (ثانیه)
+        - poll_interval: فاصله بررسی صف خالی (ثانیه)
+        - exit_when_drained: خروج پس از اتمام اسکن منتشر شده
+        """
+        self.framework = framework
+        self.queue = queue
+        self.worker_id = worker_id or f"worker-{os.getpid()}"
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.exit_when_drained = exit_when_drained
+        self.counters = {'leased': 0, 'completed': 0, 'failed': 0, 'findings': 0}
+        self._stop = threading.Event()
+    
+    def stop(self):
+        """توقف پس از دسته فعلی / Stop after the current batch"""
+        self._stop.set()
+    
+    def run(self):
+        """
+        اجرای حلقه کارگر تا تخلیه صف یا stop()
+        Run the worker loop until the queue is drained or stop() is called
+        
+        بازگشت / Returns:
+        - شمارنده‌های کارگر / Worker counters
+        """
+        self.framework.http_client.scheduler.rate_backend = self.queue
+        logger.info(f"Worker {self.worker_id} polling queue '{self.queue.name}'")
+        stats = self.queue.stats()
+        # اسکن تمام شده قبلی / A previous scan that has already finished
+        stale_scan = stats['scan'] if self.queue.drained(stats) else None
+        if stale_scan is not None:
+            logger.info(f"Worker {self.worker_id} waiting for the next scan on queue '{self.queue.name}'")
+        while not self._stop.is_set():
+            leased = self.queue.lease(self.batch_size, self.visibility_timeout)
+            if not leased:
+                if self.exit_when_drained:
+                    stats = self.queue.stats()
+                    if stats['scan'] != stale_scan and self.queue.drained(stats):
+                        break
+                self._stop.wait(self.poll_interval)
+                continue
+            self.counters['leased'] += len(leased)
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=([ticket for ticket, _ in leased], done),
+                                         name=f"{self.worker_id}-heartbeat", daemon=True)
+            heartbeat.start()
+            try:
+                for _, group in itertools.groupby(
+                        leased, key=lambda item: (item[1].endpoint, item[1].scanner, item[1].payload)):
+                    self._run_group(list(group))
+            finally:
+                done.set()
+                heartbeat.join()
+        logger.info(f"Worker {self.worker_id} finished: {self.counters['completed']} units completed, "
+                    f"{self.counters['failed']} failed")
+        return dict(self.counters)
+    
+    def _heartbeat(self, tickets, done):
+        """تمدید دوره‌ای lease تا پایان دسته / Renew the lease periodically until the batch is done"""
+        while not done.wait(self.visibility_timeout / 3):
+            try:
+                self.queue.renew(tickets, self.visibility_timeout)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} failed to renew its lease: {e}")
+    
+    def _run_group(self, group):
+        unit = group[0][1]
+        scanner = self.framework.scanners.get(unit.scanner)
+        if scanner is None:
+            logger.error(f"Worker {self.worker_id} has no scanner '{unit.scanner}'")
+            self.counters['failed'] += len(group)
+            return
+        parameters = [item.parameter for _, item in group]
+        try:
+            with self.framework.telemetry.timer('scanner_seconds', scanner=unit.scanner):
+                result = scanner.scan_variant(unit.endpoint, parameters, unit.payload)
+        except Exception as e:
+            logger.error(f"Scanner '{unit.scanner}' failed on {unit.endpoint}: {e}")
+            self.counters['failed'] += len(group)
+            return
+        if result.get('vulnerable', False):
+            self.framework.telemetry.inc('findings', type=unit.scanner)
+            self.queue.push_findings([self.framework._build_finding(unit.scanner, unit.endpoint, result)])
+            self.counters['findings'] += 1
+        self.queue.ack([ticket for ticket, _ in group])
+        self.counters['completed'] += len(group)
 
 # =============================================================================
 # کلاس اصلی فریمورک / Main Framework Class
 # =============================================================================
 
+def _keep_trained_state(model):
+    """
+    جدا کردن مدل آموزش دیده از فایل وزن‌هایش
+    Detach a trained model from its weights file
+    
+    در غیر این صورت _ensure_loaded یا __getstate__ وزن‌های فایل را جایگزین
+    وزن‌های آموزش دیده می‌کنند
+    Otherwise _ensure_loaded or __getstate__ would put the file's weights
+    back in place of the trained ones.
+    """
+    if isinstance(model, MLModel) and model.model_path:
+        model.model_path = None
+
+def _pending_training(name, data_apis):
+    """داده‌های جدید هر API برای یک مدل / Each API's new data for one model"""
+    return {api_name: api.pending_training_data(name) for api_name, api in data_apis.items()}
+
+def _train_model(model, pending, training_data=None):
+    """
+    آموزش یک مدل؛ watermark ها ثبت نمی‌شوند و برگردانده می‌شوند
+    Train one model; watermarks are returned rather than recorded
+    
+    پس از آموزش، وزن‌های آموزش دیده جایگزین فایل وزن‌های مدل می‌شوند تا
+    بارگذاری تنبل (یا unpickle در فرایند دیگر) آن‌ها را بازنویسی نکند
+    After training, the trained state supersedes the model's weights file so
+    a lazy load (or unpickling in another process) never overwrites it.
+    
+    پارامترها / Parameters:
+    - pending: دیکشنری نام API -> خروجی pending_training_data
+    - training_data: داده‌های آموزشی صریح (pending نادیده گرفته می‌شود)
+    
+    بازگشت / Returns:
+    - دیکشنری نام API -> (دسته -> شماره ورودی پایانی)
+    """
+    ends = {}
+    if training_data is not None:
+        model.train(training_data)
+    else:
+        for api_name, api_pending in pending.items():
+            if api_pending:
+                model.train(api_pending)
+                ends[api_name] = {category: batches.end for category, batches in api_pending.items()}
+    if training_data is not None or ends:
+        _keep_trained_state(model)
+    return ends
+
+def _train_model_job(model, pending, training_data, threads):
+    """اجرای آموزش در فرایند فرزند / Run one model's training in a worker process"""
+    if threads and 'torch' in sys.modules:
+        torch.set_num_threads(threads)
+    ends = _train_model(model, pending, training_data)
+    return model, ends
+
 class VulnerabilityScannerFramework:
     """
     چارچوب اصلی اسکنر آسیب‌پذیری
@@ -407,14 +5637,22 @@ class VulnerabilityScannerFramework:
         self.config = config or {}
         
         # ماژول‌های اصلی / Core modules
-        self.http_client = AdvancedHTTPxClient()
-        self.waf_evasion = WAFEvasionExpert()
-        self.param_discoverer = ParameterDiscoverer(self.http_client)
+        self.telemetry = MetricsRegistry.from_config(self.config.get('metrics'))
+        self.http_client = AdvancedHTTPxClient(self.config.get('http', {}), telemetry=self.telemetry)
+        self.analysis = AnalysisExecutor(**self.config.get('analysis', {}))
+        self.waf_evasion = WAFEvasionExpert(**self.config.get('waf_evasion', {}))
+        self.param_discoverer = ParameterDiscoverer(self.http_client, executor=self.analysis)
+        self.crawler = WebCrawler(self.param_discoverer, self.config.get('crawl'))
+        self.fingerprints = FingerprintEngine(self.http_client, executor=self.analysis)
         
         # رابط‌های قابل توسعه / Extensible interfaces
         self.ai_models = {}  # مدل‌های هوش مصنوعی ثبت شده
+        self.model_batchers = {}  # صف‌های micro-batching / Micro-batching queues
+        self._batcher_lock = threading.Lock()
         self.scanners = {}   # اسکنرهای ثبت شده
         self.data_apis = {}  # APIهای داده ثبت شده
+        self.sinks = {}      # مقصدهای خروجی یافته‌ها / Findings sinks
+        self.last_scan_stats = {}  # آمار آخرین اسکن / Last scan statistics
         
         # بارگذاری پیکربندی / Load configuration
         self._load_configuration()
@@ -441,10 +5679,38 @@ class VulnerabilityScannerFramework:
         """
         if isinstance(model_instance, AIModelInterface):
             self.ai_models[name] = model_instance
+            with self._batcher_lock:
+                batcher = self.model_batchers.pop(name, None)
+            if batcher is not None:
+                batcher.close()
             logger.info(f"AI model '{name}' registered successfully")
         else:
             logger.error(f"Model '{name}' must implement AIModelInterface")
     
+    def predict(self, name, input_data):
+        """
+        پیش‌بینی تکی با micro-batching مشترک بین اسکنرها
+        Single prediction routed through the model's shared micro-batcher
+        
+        پارامترها / Parameters:
+        - name: نام مدل ثبت شده
+        - input_data: ورودی پیش‌بینی
+        """
+        return self._get_batcher(name).predict(input_data)
+    
+    async def apredict(self, name, input_data):
+        """نسخه async متد predict / Async variant of predict"""
+        return await self._get_batcher(name).apredict(input_data)
+    
+    def _get_batcher(self, name):
+        with self._batcher_lock:
+            batcher = self.model_batchers.get(name)
+            if batcher is None:
+                batching = self.config.get('batching', {})
+                batcher = self.model_batchers[name] = MicroBatcher(
+                    self.ai_models[name], telemetry=self.telemetry, name=name, **batching)
+            return batcher
+    
     def register_scanner(self, vuln_type, scanner_instance):
         """
         ثبت اسکنر آسیب‌پذیری جدید
@@ -455,6 +5721,17 @@ class VulnerabilityScannerFramework:
         - scanner_instance: نمونه اسکنر (باید از VulnerabilityScanner ارث بری کند)
         """
         if isinstance(scanner_instance, VulnerabilityScanner):
+            scanner_instance.fingerprints = self.fingerprints
+            scanner_instance.waf_evasion = self.waf_evasion
+            signature_file = self.config.get('signatures', {}).get(vuln_type)
+            if signature_file:
+                # امضاهای قابل بارگذاری مجدد از فایل / Hot-reloadable signatures from a file
+                scanner_instance.EVIDENCE_PATTERN = SignatureMatcher(path=signature_file)
+            if self.telemetry.enabled and 'validate_finding' not in vars(scanner_instance):
+                # زمان‌سنجی validate_finding، حتی وقتی خود اسکنر آن را صدا می‌زند
+                # Time validate_finding, including calls made from inside scan()
+                scanner_instance.validate_finding = self.telemetry.instrument(
+                    scanner_instance.validate_finding, 'validate_finding_seconds', scanner=vuln_type)
             self.scanners[vuln_type] = scanner_instance
             logger.info(f"Scanner for '{vuln_type}' registered successfully")
         else:
@@ -472,69 +5749,1676 @@ class VulnerabilityScannerFramework:
         self.data_apis[name] = api_instance
         logger.info(f"Data API '{name}' registered successfully")
     
-    def scan_target(self, target_url, scan_types=None):
+    def scan_target(self, target_url, scan_types=None):
+        """
+        اسکن هدف برای آسیب‌پذیری‌ها
+        Scan target for vulnerabilities
+        
+        پارامترها / Parameters:
+        - target_url: URL هدف
+        - scan_types: لیست انواع اسکن (پیش‌فرض: تمام انواع ثبت شده)
+        
+        بازگشت / Returns:
+        - لیست یافته‌ها (دیکشنری) / List of finding dicts
+        """
+        return [finding.to_dict() for finding in self.iter_scan(target_url, scan_types)]
+    
+    def profile_scan(self, target_url, scan_types=None, output=None, engine="cprofile"):
+        """
+        اجرای یک اسکن زیر profiler
+        Run a single scan under a profiler
+        
+        پارامترها / Parameters:
+        - engine: cprofile (کتابخانه استاندارد) یا pyinstrument (در صورت نصب)
+        - output: مسیر خروجی؛ .prof برای cProfile و .html برای pyinstrument (اختیاری)
+        
+        بازگشت / Returns:
+        - (لیست یافته‌ها، گزارش متنی پروفایل)
+        """
+        if engine == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            try:
+                findings = self.scan_target(target_url, scan_types)
+            finally:
+                profiler.stop()
+            report = profiler.output_text()
+            if output:
+                with open(output, 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html() if output.endswith('.html') else report)
+        else:
+            import cProfile
+            import io
+            import pstats
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                findings = self.scan_target(target_url, scan_types)
+            finally:
+                profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(30)
+            report = stream.getvalue()
+        if output:
+            logger.info(f"Scan profile written to {output}")
+        return findings, report
+    
+    def iter_scan(self, target_url, scan_types=None, scan_id=None):
+        """
+        اسکن جریانی هدف
+        Scan target, yielding findings as they are produced
+        
+        هر یافته پیش از yield در تمام sinkهای ثبت شده نوشته می‌شود. با تنظیم
+        config['checkpoint_db'] واحدهای انجام شده ثبت و در ازسرگیری رد می‌شوند.
+        Each finding is written to every registered sink before it is
+        yielded. With config['checkpoint_db'] set, completed work units are
+        recorded and skipped when the same scan_id is resumed.
+        
+        پارامترها / Parameters:
+        - target_url: URL هدف
+        - scan_types: لیست انواع اسکن (پیش‌فرض: تمام انواع ثبت شده)
+        - scan_id: شناسه اسکن برای ازسرگیری (اختیاری)
+        """
+        if scan_types is None:
+            scan_types = list(self.scanners.keys())
+        
+        logger.info(f"Starting scan for {target_url}")
+        stats_before = self._http_stats()
+        ledger = self._open_ledger(target_url, scan_types, scan_id)
+        if self.http_client.prewarm_connections:
+            self.http_client.prewarm(self._prewarm_targets(target_url))
+        
+        planner = self._planner(scan_types, ledger)
+        
+        try:
+            # کشف پارامترها و اجرای برنامه اسکن / Discover parameters and execute the scan plan
+            targets = self._timed_iter('discovery_seconds', self._iter_targets(target_url))
+            for batch in planner.batches(targets):
+                unit = batch[0]
+                scanner = self.scanners[unit.scanner]
+                parameters = [item.parameter for item in batch]
+                with self.telemetry.timer('scanner_seconds', scanner=unit.scanner):
+                    result = scanner.scan_variant(unit.endpoint, parameters, unit.payload)
+                
+                if result.get('vulnerable', False):
+                    self.telemetry.inc('findings', type=unit.scanner)
+                    finding = self._build_finding(unit.scanner, unit.endpoint, result)
+                    self._emit(finding)
+                    yield finding
+                if ledger is not None:
+                    for item in batch:
+                        ledger.mark_done(item.endpoint, item.parameter, item.scanner, item.payload)
+            if ledger is not None:
+                ledger.finish()
+        finally:
+            self._checkpoint_sinks()
+            if ledger is not None:
+                ledger.close()
+        
+        self._record_scan_stats(stats_before, ledger, planner)
+    
+    def plan_scan(self, target_url, scan_types=None):
+        """
+        برنامه اسکن بدون اجرای آن (کشف پارامترها انجام می‌شود)
+        Yield the scan plan's work units without running them; discovery still runs
+        
+        پارامترها / Parameters:
+        - target_url: URL هدف
+        - scan_types: لیست انواع اسکن (پیش‌فرض: تمام انواع ثبت شده)
+        """
+        planner = self._planner(scan_types)
+        yield from planner.plan(self._iter_targets(target_url))
+        logger.info(f"Scan plan: {planner.counters['units']} work units across {len(planner.hosts)} hosts, "
+                    f"{planner.counters['duplicates']} duplicates removed")
+    
+    def _prewarm_targets(self, target_url):
+        """
+        origin هدف و میزبان‌های محدوده خزش (بدون wildcard)
+        The target's origin plus the crawl scope's hosts, wildcards excluded
+        """
+        scheme = urlsplit(target_url).scheme or 'https'
+        hosts = [host for host in self.crawler._allowed_hosts(target_url) if not host.startswith('*.')]
+        return [target_url] + [f"{scheme}://{host}/" for host in sorted(hosts)]
+    
+    def _planner(self, scan_types=None, ledger=None):
+        """ساخت ScanPlanner با config['plan'] / Build a ScanPlanner from config['plan']"""
+        return ScanPlanner(self.scanners, scan_types, ledger, **self.config.get('plan', {}))
+    
+    def distributed_scan(self, target_url, scan_types=None, queue=None):
+        """
+        اسکن توزیع‌شده: این فرایند هماهنگ‌کننده است
+        Distributed scan with this process as the coordinator
+        
+        کشف و برنامه‌ریزی اینجا انجام می‌شود، واحدهای کار در صف منتشر و توسط
+        کارگرها (run_worker) اجرا می‌شوند و یافته‌ها به محض رسیدن yield می‌شوند.
+        صف حداقل یک بار تحویل می‌دهد، پس یافته‌های تکراری یک واحد (اجرای دوباره
+        پس از انقضای lease) حذف می‌شوند.
+        Discovery and planning run here; work units are published to the
+        queue, executed by workers (run_worker) and findings are yielded as
+        they come back. Delivery is at-least-once, so repeated findings of a
+        unit (re-run after a lease expired) are dropped.
+        
+        پارامترها / Parameters:
+        - target_url: URL هدف
+        - scan_types: لیست انواع اسکن (پیش‌فرض: تمام انواع ثبت شده)
+        - queue: نمونه WorkQueue (پیش‌فرض: از config['distributed'])
+        """
+        options = self.config.get('distributed', {})
+        queue = queue or self._open_work_queue()
+        poll_interval = options.get('poll_interval', 0.5)
+        logger.info(f"Coordinating distributed scan for {target_url} on queue '{queue.name}'")
+        self.http_client.scheduler.rate_backend = queue
+        stats_before = self._http_stats()
+        planner = self._planner(scan_types)
+        queue.start()
+        if self.http_client.prewarm_connections:
+            self.http_client.prewarm(self._prewarm_targets(target_url))
+        
+        seen = set()
+        
+        def fresh(findings):
+            for finding in findings:
+                key = (finding.type, finding.url, finding.parameter, finding.payload)
+                if key in seen:
+                    self.telemetry.inc('duplicate_findings')
+                    continue
+                seen.add(key)
+                self._emit(finding)
+                yield finding
+        
+        try:
+            targets = self._timed_iter('discovery_seconds', self._iter_targets(target_url))
+            for batch in planner.batches(targets):
+                queue.put(batch)
+                yield from fresh(queue.pop_findings())
+            queue.finish()
+            while True:
+                findings = queue.pop_findings()
+                if not findings:
+                    if queue.drained():
+                        findings = queue.pop_findings()
+                        if not findings:
+                            break
+                    else:
+                        time.sleep(poll_interval)
+                        continue
+                yield from fresh(findings)
+        finally:
+            self._checkpoint_sinks()
+        
+        self._record_scan_stats(stats_before, planner=planner)
+        self.last_scan_stats['queue'] = queue.stats()
+        if self.last_scan_stats['queue']['dead']:
+            logger.warning(f"{self.last_scan_stats['queue']['dead']} work units exceeded max_attempts")
+    
+    def run_worker(self, queue=None, worker_id=None):
+        """
+        اجرای این فرایند به عنوان کارگر اسکن توزیع‌شده
+        Run this process as a distributed scan worker
+        
+        اسکنرها باید مانند هماهنگ‌کننده ثبت شده باشند. محدودیت نرخ میزبان‌ها از
+        config['http'] خوانده می‌شود ولی سطل‌ها در صف مشترک‌اند.
+        Scanners must be registered as on the coordinator. Host rate limits
+        come from config['http'], but their buckets live in the shared queue.
+        
+        بازگشت / Returns:
+        - شمارنده‌های کارگر / Worker counters
+        """
+        options = {key: value for key, value in self.config.get('distributed', {}).items()
+                   if key in ('batch_size', 'visibility_timeout', 'poll_interval', 'exit_when_drained')}
+        worker = ScanWorker(self, queue or self._open_work_queue(), worker_id, **options)
+        return worker.run()
+    
+    def _open_work_queue(self):
+        options = self.config.get('distributed', {})
+        return open_work_queue(options.get('queue'), options.get('name', 'default'),
+                               max_attempts=options.get('max_attempts', 3))
+    
+    def resume_scan(self, scan_id):
+        """
+        ازسرگیری اسکن ذخیره شده
+        Resume a checkpointed scan, skipping completed work units
+        
+        پارامترها / Parameters:
+        - scan_id: شناسه اسکن قبلی
+        """
+        path = self.config.get('checkpoint_db')
+        if not path:
+            raise ValueError("Resuming requires config['checkpoint_db']")
+        ledger = ScanLedger(path, scan_id)
+        info = ledger.scan_info()
+        ledger.close()
+        if info is None:
+            raise ValueError(f"Unknown scan id '{scan_id}'")
+        logger.info(f"Resuming scan {scan_id} of {info['target']}")
+        return self.iter_scan(info['target'], info['scan_types'], scan_id=scan_id)
+    
+    def _open_ledger(self, target_url, scan_types, scan_id):
+        path = self.config.get('checkpoint_db')
+        if not path:
+            return None
+        ledger = ScanLedger(path, scan_id, before_commit=self._checkpoint_sinks,
+                            **self.config.get('checkpoint', {}))
+        ledger.start(target_url, scan_types)
+        logger.info(f"Scan id: {ledger.scan_id} ({len(ledger.done)} work units already completed)")
+        return ledger
+    
+    async def async_scan_target(self, target_url, scan_types=None, scan_id=None):
         """
-        اسکن هدف برای آسیب‌پذیری‌ها
-        Scan target for vulnerabilities
+        اسکن همزمان هدف با asyncio
+        Scan target concurrently with asyncio
         
         پارامترها / Parameters:
         - target_url: URL هدف
         - scan_types: لیست انواع اسکن (پیش‌فرض: تمام انواع ثبت شده)
+        - scan_id: شناسه اسکن برای ازسرگیری (اختیاری)
         
         بازگشت / Returns:
-        - لیست یافته‌ها / List of findings
+        - لیست یافته‌ها (دیکشنری) / List of finding dicts
+        """
+        return [finding.to_dict() async for finding in self.aiter_scan(target_url, scan_types, scan_id)]
+    
+    async def aiter_scan(self, target_url, scan_types=None, scan_id=None):
+        """
+        اسکن همزمان و جریانی هدف با asyncio
+        Scan target concurrently, yielding findings as they complete
+        
+        هر ترکیب (اسکنر، پارامتر) یک task جداگانه است و task جدید فقط پس از
+        گرفتن semaphore ساخته می‌شود، پس حداکثر config['concurrency'] task وجود دارد
+        Every (scanner, parameter) pair runs as its own task, so wall-clock time
+        tracks the slowest probe. A task is only created once the semaphore is
+        acquired, so at most config['concurrency'] units are pending at a time.
         """
         if scan_types is None:
             scan_types = list(self.scanners.keys())
         
-        logger.info(f"Starting scan for {target_url}")
-        findings = []
+        logger.info(f"Starting async scan for {target_url}")
+        stats_before = self._http_stats()
+        ledger = self._open_ledger(target_url, scan_types, scan_id)
+        if self.http_client.prewarm_connections:
+            await self.http_client.aprewarm(self._prewarm_targets(target_url))
+        semaphore = asyncio.Semaphore(self.config.get('concurrency', 10))
+        findings = asyncio.Queue()
         
-        # کشف پارامترها / Discover parameters
-        parameters = self.param_discoverer.discover_parameters(target_url)
-        logger.info(f"Discovered {len(parameters)} parameters")
+        planner = self._planner(scan_types, ledger)
         
-        # اجرای اسکن‌ها / Execute scans
-        for scan_type in scan_types:
-            if scan_type in self.scanners:
-                scanner = self.scanners[scan_type]
-                result = scanner.scan(target_url, parameters)
-                
-                if result.get('vulnerable', False):
-                    findings.append({
-                        'type': scan_type,
-                        'url': target_url,
-                        'parameter': result.get('parameter', ''),
-                        'payload': result.get('payload', ''),
-                        'evidence': result.get('evidence', ''),
-                        'timestamp': datetime.now().isoformat()
-                    })
+        async def run_unit(unit):
+            # semaphore توسط produce گرفته شده است / The semaphore was acquired by produce
+            try:
+                await scan_unit(unit)
+            finally:
+                semaphore.release()
+        
+        async def scan_unit(unit):
+            scanner = self.scanners[unit.scanner]
+            try:
+                with self.telemetry.timer('scanner_seconds', scanner=unit.scanner):
+                    if unit.payload:
+                        result = await asyncio.to_thread(
+                            scanner.scan_variant, unit.endpoint, [unit.parameter], unit.payload)
+                    else:
+                        result = await scanner.ascan(unit.endpoint, [unit.parameter])
+            except Exception as e:
+                logger.error(f"Scanner '{unit.scanner}' failed on '{unit.parameter}': {e}")
+                return
+            if result and result.get('vulnerable', False):
+                self.telemetry.inc('findings', type=unit.scanner)
+                result.setdefault('parameter', unit.parameter)
+                finding = self._build_finding(unit.scanner, unit.endpoint, result)
+                # در sinkها پیش از ثبت واحد در دفتر کار / Into the sinks before the ledger marks the unit
+                self._emit(finding)
+                await findings.put(finding)
+            if ledger is not None:
+                ledger.mark_done(unit.endpoint, unit.parameter, unit.scanner, unit.payload)
+        
+        async def produce():
+            # اجرای جریانی برنامه اسکن، هر دسته با یک گام thread
+            # Stream the scan plan into tasks, one thread hop per batch
+            tasks = set()
+            try:
+                targets = self._timed_iter('discovery_seconds', self._iter_targets(target_url))
+                batches = planner.batches(targets)
+                while True:
+                    batch = await asyncio.to_thread(next, batches, None)
+                    if batch is None:
+                        break
+                    for unit in batch:
+                        await semaphore.acquire()
+                        task = asyncio.ensure_future(run_unit(unit))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                await asyncio.gather(*tasks)
+            finally:
+                await findings.put(None)
+        
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                finding = await findings.get()
+                if finding is None:
+                    break
+                yield finding
+            await producer
+            if ledger is not None:
+                ledger.finish()
+        finally:
+            if not producer.done():
+                producer.cancel()
+            self._checkpoint_sinks()
+            if ledger is not None:
+                ledger.close()
+            await self.http_client.aclose()
+        
+        self._record_scan_stats(stats_before, ledger, planner)
+    
+    def register_sink(self, name, sink):
+        """
+        ثبت مقصد خروجی یافته‌ها
+        Register a findings sink
+        
+        پارامترها / Parameters:
+        - name: نام مقصد
+        - sink: نمونه FindingSink (JSONLSink, SARIFSink, StdoutSink, ...)
+        """
+        if isinstance(sink, FindingSink):
+            self.sinks[name] = sink
+            logger.info(f"Findings sink '{name}' registered successfully")
+        else:
+            logger.error(f"Sink '{name}' must implement FindingSink")
+    
+    def _emit(self, finding):
+        for name, sink in self.sinks.items():
+            try:
+                sink.write(finding)
+            except Exception as e:
+                logger.error(f"Error writing finding to sink '{name}': {e}")
+    
+    def _checkpoint_sinks(self):
+        for name, sink in self.sinks.items():
+            try:
+                sink.checkpoint()
+            except Exception as e:
+                logger.error(f"Error checkpointing sink '{name}': {e}")
+    
+    def _iter_targets(self, target_url):
+        """
+        تولید (endpoint، پارامترها) برای اسکن
+        Yield (endpoint, parameters) pairs to scan
+        
+        بدون تنظیم config['crawl'] فقط خود target_url بررسی می‌شود؛ در غیر این
+        صورت نتایج خزنده به محض کشف و فقط با پارامترهای جدید هر endpoint تولید می‌شوند
+        Without config['crawl'] only the target_url page is fetched, but
+        each in-scope endpoint it references (form actions, links) is yielded
+        with its own parameters. Otherwise crawler results are yielded as
+        they arrive; parameters repeated across pages are removed later by
+        the ScanPlanner.
+        """
+        total = 0
+        if not self.config.get('crawl'):
+            allowed_hosts = self.crawler._allowed_hosts(target_url)
+            for endpoint, parameters in self.param_discoverer.discover_endpoints(target_url).items():
+                if parameters and self.crawler.in_scope(endpoint, allowed_hosts):
+                    total += len(parameters)
+                    yield endpoint, parameters
+            logger.info(f"Discovered {total} parameters")
+        else:
+            for page_url, endpoints in self.crawler.crawl(target_url):
+                for endpoint, parameters in endpoints.items():
+                    if parameters:
+                        total += len(parameters)
+                        yield endpoint, parameters
+            logger.info(f"Discovered {total} parameter occurrences during the crawl")
         
-        return findings
+        if not total:
+            yield target_url, list(self.param_discoverer.COMMON_PARAMETERS)
+    
+    def _timed_iter(self, name, iterator):
+        """
+        زمان‌سنجی هر گام یک generator (مثلا کشف پارامترها)
+        Time every step of a generator, such as parameter discovery
+        """
+        if not self.telemetry.enabled:
+            yield from iterator
+            return
+        done = object()
+        while True:
+            with self.telemetry.timer(name):
+                item = next(iterator, done)
+            if item is done:
+                return
+            yield item
+    
+    def _http_stats(self):
+        cache, coalescer, resolver = self.http_client.cache, self.http_client.coalescer, self.http_client.dns_cache
+        return {
+            'cache': cache.stats() if cache is not None else {},
+            'coalescing': coalescer.stats() if coalescer is not None else {},
+            'dns': resolver.stats() if resolver is not None else {}
+        }
+    
+    def _record_scan_stats(self, stats_before, ledger=None, planner=None):
+        """
+        ثبت آمار کش، ادغام درخواست‌ها و برنامه اسکن برای آخرین اسکن در self.last_scan_stats
+        Record cache, coalescing and plan counters for the last scan in self.last_scan_stats
+        """
+        stats_after = self._http_stats()
+        self.last_scan_stats = {
+            section: {name: value - stats_before[section].get(name, 0) for name, value in counters.items()
+                      if name not in ('entries', 'bytes', 'in_flight')}
+            for section, counters in stats_after.items()
+        }
+        cache = self.last_scan_stats['cache']
+        if ledger is not None:
+            self.last_scan_stats['scan_id'] = ledger.scan_id
+        if planner is not None:
+            plan = self.last_scan_stats['plan'] = planner.stats()
+            logger.info(f"Scan plan: {plan['units']} work units across {plan['hosts']} hosts, "
+                        f"{plan['duplicates']} duplicates removed, {plan['completed']} already completed")
+        if self.telemetry.enabled:
+            self.telemetry.inc('scans')
+            if self.telemetry.export_path:
+                self.telemetry.write()
+        if cache:
+            logger.info(f"Response cache: {cache['hits']} hits, {cache['misses']} misses, "
+                        f"{cache['revalidations']} revalidations")
+        coalescing = self.last_scan_stats['coalescing']
+        if coalescing:
+            logger.info(f"Request coalescing: {coalescing['sent']} sent, {coalescing['coalesced']} shared in flight, "
+                        f"{coalescing['memo_hits']} memo hits")
+    
+    def _build_finding(self, scan_type, target_url, result):
+        """ساخت رکورد یافته از نتیجه اسکنر / Build finding record from scanner result"""
+        return Finding(scan_type, target_url, result.get('parameter', ''),
+                       result.get('payload', ''), result.get('evidence', ''))
     
     def train_models(self, training_data=None):
         """
         آموزش تمام مدل‌های ثبت شده
         Train all registered models
         
+        بدون training_data، داده‌های API یک بار همگام‌سازی می‌شوند و هر مدل فقط با
+        ورودی‌های جدید از آخرین اجرای خود (watermark) آموزش می‌بیند. مدل‌ها در
+        فرایندهای جداگانه و در حد بودجه CPU (config['training']['cpu_budget'])
+        به صورت موازی آموزش می‌بینند. فرایندها با forkserver (یا spawn) ساخته
+        می‌شوند، نه fork، چون نخ‌های HTTP، MicroBatcher و crawler در حال اجرا
+        هستند؛ مدل‌ها و داده‌ها pickle می‌شوند
+        Without training_data, API data is synced once and every model is
+        trained only on entries added since its own last run (its watermark).
+        Models train in parallel processes within the CPU budget
+        (config['training']['cpu_budget']). Workers are started with
+        forkserver (or spawn), never fork, because HTTP, MicroBatcher and
+        crawler threads are running; models and data are pickled across.
+        
         پارامترها / Parameters:
         - training_data: داده‌های آموزشی (اختیاری)
+        
+        بازگشت / Returns:
+        - دیکشنری نام مدل -> True اگر آموزش دید
         """
         logger.info("Training all registered AI models")
+        settings = self.config.get('training', {})
+        budget = settings.get('cpu_budget') or os.cpu_count() or 1
+        workers = min(budget, len(self.ai_models))
+        if training_data is None:
+            for api_name, api in self.data_apis.items():
+                try:
+                    api.sync_training_data("all")
+                except Exception as e:
+                    logger.error(f"Error syncing training data from '{api_name}': {e}")
         
-        for name, model in self.ai_models.items():
+        if workers > 1:
+            results = self._train_parallel(training_data, workers, settings.get('threads_per_model', 1))
+        else:
+            results = self._train_sequential(training_data)
+        
+        trained = {}
+        for name, model, ends, error in results:
+            if error is not None:
+                logger.error(f"Error training model '{name}': {error}")
+                trained[name] = False
+                continue
+            if model is not self.ai_models[name]:
+                # نسخه آموزش دیده از فرایند فرزند / Trained copy from the worker process
+                self.ai_models[name] = model
+                with self._batcher_lock:
+                    batcher = self.model_batchers.pop(name, None)
+                if batcher is not None:
+                    batcher.close()
+            for api_name, api_ends in ends.items():
+                self.data_apis[api_name].advance_watermark(name, api_ends)
+            trained[name] = training_data is not None or bool(ends)
+            logger.info(f"Model '{name}' training completed")
+        return trained
+    
+    def _train_sequential(self, training_data):
+        for name, model in list(self.ai_models.items()):
             try:
-                if training_data:
-                    model.train(training_data)
+                pending = None if training_data is not None else _pending_training(name, self.data_apis)
+                yield name, model, _train_model(model, pending, training_data), None
+            except Exception as e:
+                yield name, model, {}, e
+    
+    def _train_parallel(self, training_data, workers, threads):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        # fork با نخ‌های در حال اجرا قفل‌های نگه داشته شده را کپی می‌کند
+        # Forking with live threads copies held locks, so never fork here
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method)) as pool:
+            futures = {}
+            for name, model in self.ai_models.items():
+                pending = None if training_data is not None else _pending_training(name, self.data_apis)
+                futures[pool.submit(_train_model_job, model, pending, training_data, threads)] = name
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    model, ends = future.result()
+                except Exception as e:
+                    yield name, None, {}, e
                 else:
-                    # استفاده از APIهای داده برای آموزش
-                    # Use data APIs for training
-                    for api_name, api in self.data_apis.items():
-                        api.update_model_training(model)
-                        
-                logger.info(f"Model '{name}' training completed")
+                    yield name, model, ends, None
+    
+    def close(self):
+        """آزادسازی منابع فریمورک / Release framework resources"""
+        self.http_client.close()
+        self.analysis.shutdown()
+        for name, sink in self.sinks.items():
+            try:
+                sink.close()
             except Exception as e:
-                logger.error(f"Error training model '{name}': {e}")
+                logger.error(f"Error closing sink '{name}': {e}")
+        for batcher in self.model_batchers.values():
+            batcher.close()
+        self.model_batchers = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# =============================================================================
+# بنچمارک‌ها / Benchmarks
+# =============================================================================
+
+class LocalStandInServer:
+    """
+    سرور HTTP محلی برای بنچمارک (جایگزین هدف واقعی)
+    Local HTTP stand-in server used as a benchmark target
+    
+    بدون forms و body_size همان body ثابت را برمی‌گرداند؛ در غیر این صورت
+    صفحات /page/N با pages صفحه به هم پیوسته، forms فرم در هر صفحه و پرکننده
+    تا body_size بایت ساخته می‌شوند. مقدار دارای ' در پارامتر id پیغام خطای
+    MySQL را منعکس می‌کند
+    Without forms and body_size the static body is served. Otherwise pages
+    /page/N are rendered, linked across `pages` pages, with `forms` forms each
+    and padded to body_size bytes. A quote in the id parameter reflects a
+    MySQL error message.
+    
+    پارامترها / Parameters:
+    - latency: تاخیر هر پاسخ (ثانیه)
+    - error_rate: نسبت پاسخ‌های 500
+    - seed: بذر تصادفی خطاها (برای تکرارپذیری)
+    - stream_size: بدنه تولیدی جریانی با این حجم، بدون ساخت آن در حافظه
+    - compress: ارسال بدنه جریانی با gzip و chunked
+    """
+    
+    SQL_ERROR = "You have an error in your SQL syntax; check the manual that corresponds to your MySQL server version"
+    
+    def __init__(self, host="127.0.0.1", port=0, body=b"<html><body>ok</body></html>",
+                 latency=0.0, body_size=None, error_rate=0.0, forms=0, pages=1, seed=0,
+                 stream_size=None, compress=False):
+        self.host = host
+        self.port = port
+        self.body = body
+        self.latency = latency
+        self.body_size = body_size
+        self.error_rate = error_rate
+        self.forms = forms
+        self.pages = pages
+        self.stream_size = stream_size
+        self.compress = compress
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    def render(self, path):
+        """
+        پاسخ یک مسیر
+        Response for a request path
+        
+        بازگشت / Returns:
+        - (status, body bytes)
+        """
+        with self._lock:
+            self.requests += 1
+            failed = self.error_rate and self._random.random() < self.error_rate
+        if failed:
+            return 500, b"<html><body>Internal Server Error</body></html>"
+        if not self.forms and not self.body_size:
+            return 200, self.body
+        
+        parts = urlsplit(path)
+        match = re.match(r"/page/(\d+)", parts.path)
+        index = int(match.group(1)) if match else 0
+        query = dict(parse_qsl(parts.query))
+        blocks = [f"<html><head><title>page {index}</title></head><body>"]
+        if "'" in query.get('id', ''):
+            blocks.append(f"<p>{self.SQL_ERROR}</p>")
+        for link in (index * 2 + 1, index * 2 + 2):
+            if link < self.pages:
+                blocks.append(f'<a href="/page/{link}?id={link}&view=full">page {link}</a>')
+        for form in range(self.forms):
+            blocks.append(f'<form action="/page/{index}" method="get"><input name="id">'
+                          f'<input name="field{form}"><select name="sort"><option>asc</option></select></form>')
+        body = "".join(blocks)
+        if self.body_size and len(body) < self.body_size:
+            body += "<p>" + "lorem ipsum " * ((self.body_size - len(body)) // 12) + "</p>"
+        return 200, (body + "</body></html>").encode()
+    
+    def write_stream(self, handler):
+        """
+        نوشتن بدنه جریانی stream_size بایتی به صورت تکه‌تکه
+        Write a stream_size-byte body piece by piece, never holding it whole
+        """
+        import zlib
+        with self._lock:
+            self.requests += 1
+        query = dict(parse_qsl(urlsplit(handler.path).query))
+        head = "<html><body>" + (f"<p>{self.SQL_ERROR}</p>" if "'" in query.get('id', '') else "")
+        block = ("<p>" + "lorem ipsum " * 5000 + "</p>\n").encode()
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/html")
+        if self.compress:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            handler.send_header("Content-Encoding", "gzip")
+            handler.send_header("Transfer-Encoding", "chunked")
+        else:
+            handler.send_header("Content-Length", str(self.stream_size))
+        handler.end_headers()
+        
+        def write(piece):
+            if self.compress:
+                piece = compressor.compress(piece)
+                if piece:
+                    handler.wfile.write(f"{len(piece):X}\r\n".encode() + piece + b"\r\n")
+            else:
+                handler.wfile.write(piece)
+        
+        try:
+            remaining = self.stream_size
+            piece = head.encode()[:remaining]
+            while remaining > 0:
+                write(piece)
+                remaining -= len(piece)
+                piece = block[:remaining]
+            if self.compress:
+                tail = compressor.flush()
+                handler.wfile.write(f"{len(tail):X}\r\n".encode() + tail + b"\r\n0\r\n\r\n")
+        except OSError:
+            # کلاینت زودتر قطع کرد / The client hung up early
+            handler.close_connection = True
+    
+    def _make_handler(self):
+        from http.server import BaseHTTPRequestHandler
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+            
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.stream_size:
+                    server.write_stream(self)
+                    return
+                status, body = server.render(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_HEAD(self):
+                status, body = server.render(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+    
+    def start(self):
+        """شروع سرور در thread پس‌زمینه / Start server in background thread"""
+        from http.server import ThreadingHTTPServer
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """توقف سرور / Stop server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+def _latency_summary(samples, elapsed=None):
+    """
+    صدک‌های تاخیر (میلی‌ثانیه) و توان عملیاتی
+    Latency percentiles (ms) and throughput of a list of durations
+    """
+    ordered = sorted(samples)
+    summary = {'count': len(ordered)}
+    for percentile in (50, 95, 99):
+        rank = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+        summary[f'p{percentile}_ms'] = ordered[rank] * 1000 if ordered else None
+    if elapsed:
+        summary['throughput_per_second'] = len(ordered) / elapsed
+    return summary
+
+def benchmark_http_client(num_requests=300):
+    """
+    مقایسه کلاینت جدید برای هر درخواست با کلاینت pool شده
+    Compare a fresh client per request against the pooled client (req/s)
+    """
+    results = {}
+    with LocalStandInServer() as server:
+        start = time.perf_counter()
+        for _ in range(num_requests):
+            with httpx.Client(timeout=30) as client:
+                client.request("GET", server.url)
+        elapsed = time.perf_counter() - start
+        results['per_request_client_rps'] = num_requests / elapsed
+        
+        latencies = []
+        with AdvancedHTTPxClient() as http_client:
+            start = time.perf_counter()
+            for _ in range(num_requests):
+                sent = time.perf_counter()
+                http_client.robust_request(server.url, probe=True)
+                latencies.append(time.perf_counter() - sent)
+            elapsed = time.perf_counter() - start
+        results['pooled_client_rps'] = num_requests / elapsed
+        results['pooled_client_latency'] = _latency_summary(latencies)
+    
+    results['speedup'] = results['pooled_client_rps'] / results['per_request_client_rps']
+    return results
+
+class _StandInProbeScanner(SQLInjectionScanner):
+    """
+    اسکنر SQL کاوشگر برای بنچمارک اسکن (هر پارامتر یک درخواست)
+    Probing SQL scanner for the scan benchmark, one request per parameter
+    """
+    
+    PAYLOADS = ("1'",)
+    
+    def __init__(self, http_client):
+        self.http_client = http_client
+        self.latencies = []
+    
+    def scan(self, target_url, parameters):
+        for payload in self.PAYLOADS:
+            result = self.scan_variant(target_url, parameters, payload)
+            if result['vulnerable']:
+                return result
+        return {"vulnerable": False, "payload": "", "evidence": ""}
+    
+    def scan_variant(self, target_url, parameters, payload=''):
+        payload = payload or self.PAYLOADS[0]
+        for name in parameters:
+            parts = urlsplit(target_url)
+            query = urlencode(parse_qsl(parts.query) + [(name, payload)])
+            url = urlunparse((parts.scheme, parts.netloc, parts.path, '', query, ''))
+            start = time.perf_counter()
+            response = self.http_client.robust_request(url, probe=True)
+            self.latencies.append(time.perf_counter() - start)
+            if self.validate_finding(response, payload):
+                return {"vulnerable": True, "parameter": name, "payload": payload,
+                        "evidence": self.response_delta(response)[:200]}
+        return {"vulnerable": False, "payload": "", "evidence": ""}
+
+def benchmark_scan(latency=0.002, body_size=16 * 1024, error_rate=0.01, forms=4, pages=31):
+    """
+    اسکن کامل scan_target روی سرور جایگزین (خزش، کشف، baseline و کاوش)
+    End-to-end scan_target against the stand-in (crawl, discovery, baselines, probes)
+    """
+    server = LocalStandInServer(latency=latency, body_size=body_size, error_rate=error_rate,
+                                forms=forms, pages=pages)
+    config = {'crawl': {'max_depth': 8, 'max_pages': pages}}
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        with server, VulnerabilityScannerFramework(config) as framework:
+            scanner = _StandInProbeScanner(framework.http_client)
+            framework.register_scanner('sql', scanner)
+            start = time.perf_counter()
+            findings = framework.scan_target(f"{server.url}page/0")
+            elapsed = time.perf_counter() - start
+            requests = server.requests
+    finally:
+        logger.setLevel(level)
+    return {
+        'seconds': elapsed,
+        'findings': len(findings),
+        'server_requests': requests,
+        'requests_per_second': requests / elapsed,
+        'probe_latency': _latency_summary(scanner.latencies, elapsed),
+        'stand_in': {'latency': latency, 'body_size': body_size, 'error_rate': error_rate,
+                     'forms': forms, 'pages': pages},
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+def benchmark_coalescing(pages=15, forms=4, scanners=3, latency=0.002):
+    """
+    درخواست‌های ارسالی یک اسکن با و بدون ادغام، با چند اسکنر هم‌پیلود
+    Requests sent by a scan with and without coalescing, using several
+    scanners that send the same probes; findings must stay identical
+    """
+    results = {}
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        for label, coalesce in (('uncoalesced', False), ('coalesced', {})):
+            config = {'crawl': {'max_depth': 8, 'max_pages': pages}, 'http': {'coalesce': coalesce}}
+            with LocalStandInServer(latency=latency, forms=forms, pages=pages) as server, \
+                    VulnerabilityScannerFramework(config) as framework:
+                for index in range(scanners):
+                    framework.register_scanner(f"sql{index}", _StandInProbeScanner(framework.http_client))
+                start = time.perf_counter()
+                findings = asyncio.run(framework.async_scan_target(f"{server.url}page/0"))
+                results[label] = {
+                    'seconds': time.perf_counter() - start,
+                    'server_requests': server.requests,
+                    'findings': sorted((f['type'], urlsplit(f['url']).path, f['parameter']) for f in findings),
+                    'coalescing': framework.last_scan_stats.get('coalescing')
+                }
+    finally:
+        logger.setLevel(level)
+    results['identical_findings'] = results['coalesced']['findings'] == results['uncoalesced']['findings']
+    for label in ('uncoalesced', 'coalesced'):
+        results[label]['findings'] = len(results[label]['findings'])
+    results['request_reduction_percent'] = (
+        1 - results['coalesced']['server_requests'] / results['uncoalesced']['server_requests']) * 100
+    return results
+
+def benchmark_distributed(workers=4, pages=31, forms=4, latency=0.01, rate_limit=40):
+    """
+    اسکن توزیع‌شده با صف SQLite و کارگرهای fork شده در برابر یک فرایند
+    Distributed scan over an SQLite queue with forked workers versus one process
+    
+    یک کارگر پس از lease بدون ack از کار می‌افتد تا بازیابی lease سنجیده شود؛
+    اجرای دوم با محدودیت نرخ میزبان نشان می‌دهد نرخ برای همه کارگرها با هم اعمال
+    می‌شود.
+    One extra worker crashes after leasing without acknowledging, which
+    exercises lease recovery; a second run with a host rate limit shows the
+    limit holds across all workers together.
+    """
+    import multiprocessing
+    import tempfile
+    context = multiprocessing.get_context('fork')
+    results = {'workers': workers}
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    
+    def summarize(findings):
+        return sorted((finding['type'], urlsplit(finding['url']).path, finding['parameter']) for finding in findings)
+    
+    def make_framework(config):
+        framework = VulnerabilityScannerFramework(config)
+        framework.register_scanner('sql', _StandInProbeScanner(framework.http_client))
+        return framework
+    
+    def worker(config):
+        logger.setLevel(logging.WARNING)
+        with make_framework(config) as framework:
+            framework.run_worker()
+    
+    def crashing_worker(config):
+        queue = open_work_queue(config['distributed']['queue'], config['distributed']['name'])
+        while not queue.lease(config['distributed']['batch_size'], config['distributed']['visibility_timeout']):
+            time.sleep(0.05)
+        os._exit(0)
+    
+    try:
+        with LocalStandInServer(latency=latency, forms=forms, pages=pages) as server:
+            host = urlsplit(server.url).netloc
+            crawl = {'max_depth': 8, 'max_pages': pages}
+            with make_framework({'crawl': crawl}) as framework:
+                start = time.perf_counter()
+                baseline = summarize(framework.scan_target(f"{server.url}page/0"))
+                results['single_process_seconds'] = time.perf_counter() - start
+            
+            for label, http in (('distributed', {}), ('rate_limited', {'rate_limits': {host: rate_limit}})):
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    config = {'crawl': crawl, 'http': http, 'distributed': {
+                        'queue': f"sqlite:///{os.path.join(temp_dir, 'queue.db')}", 'name': label,
+                        'batch_size': 4, 'visibility_timeout': 1.0, 'poll_interval': 0.05}}
+                    open_work_queue(config['distributed']['queue'], label).close()
+                    processes = [context.Process(target=crashing_worker, args=(config,))]
+                    processes += [context.Process(target=worker, args=(config,)) for _ in range(workers)]
+                    requests_before = server.requests
+                    start = time.perf_counter()
+                    for process in processes:
+                        process.start()
+                    with make_framework(config) as framework:
+                        findings = summarize(framework.distributed_scan(f"{server.url}page/0"))
+                        queue_stats = framework.last_scan_stats['queue']
+                    elapsed = time.perf_counter() - start
+                    for process in processes:
+                        process.join()
+                    requests = server.requests - requests_before
+                    results[label] = {
+                        'seconds': elapsed,
+                        'findings': len(findings),
+                        'identical_findings': findings == baseline,
+                        'dead_units': queue_stats['dead'],
+                        'server_requests': requests,
+                        'requests_per_second': requests / elapsed
+                    }
+            # پس از مصرف burst اولیه (برابر rate) / After the initial burst, which equals the rate
+            results['rate_limited']['rate_limit'] = rate_limit
+            results['rate_limited']['requests_per_second_after_burst'] = (
+                (results['rate_limited']['server_requests'] - rate_limit) / results['rate_limited']['seconds'])
+    finally:
+        logger.setLevel(level)
+    results['speedup'] = results['single_process_seconds'] / results['distributed']['seconds']
+    return results
+
+def benchmark_dns(requests=100, resolver_latency=0.02, server_latency=0.002):
+    """
+    تاثیر کش DNS و پیش‌گرم کردن اتصال روی تاخیر درخواست‌ها
+    Effect of the DNS cache and connection pre-warm on request latency
+    
+    resolver کند محیط‌های کانتینری با یک resolver ساختگی شبیه‌سازی می‌شود و
+    keep-alive خاموش است تا هر درخواست اتصال تازه بسازد
+    A slow container resolver is simulated with a fake resolver, and
+    keep-alive is off so every request opens a fresh connection.
+    """
+    def slow_resolver(host, port):
+        time.sleep(resolver_latency)
+        return ['127.0.0.1'], None
+    
+    def percentile(values, p=50):
+        values = sorted(value for value in values if value is not None)
+        return values[max(0, math.ceil(p / 100 * len(values)) - 1)] * 1000 if values else None
+    
+    results = {}
+    with LocalStandInServer(latency=server_latency) as server:
+        url = f"http://standin.test:{server.port}/"
+        for label, ttl in (('uncached', 0.0), ('cached', 60.0)):
+            resolver = DNSCache(ttl=ttl, resolver=slow_resolver)
+            latencies, phases = [], defaultdict(list)
+            with AdvancedHTTPxClient({'dns_cache': resolver, 'max_keepalive_connections': 0,
+                                      'coalesce': False}) as http_client:
+                start = time.perf_counter()
+                for _ in range(requests):
+                    sent = time.perf_counter()
+                    response = http_client.robust_request(url, probe=True)
+                    latencies.append(time.perf_counter() - sent)
+                    for phase, value in response.extensions['timings'].as_dict().items():
+                        phases[phase].append(value)
+                elapsed = time.perf_counter() - start
+            results[label] = _latency_summary(latencies, elapsed)
+            results[label].update({f'{phase}_p50_ms': percentile(phases[phase]) for phase in RequestTimings.PHASES})
+            results[label]['resolver'] = resolver.stats()
+        
+        for label, warm in (('cold_first_request', False), ('prewarmed_first_request', True)):
+            with AdvancedHTTPxClient({'dns_cache': DNSCache(resolver=slow_resolver)}) as http_client:
+                if warm:
+                    http_client.prewarm([url])
+                sent = time.perf_counter()
+                http_client.robust_request(url, probe=True)
+                results[f'{label}_ms'] = (time.perf_counter() - sent) * 1000
+    
+    results['speedup'] = results['cached']['throughput_per_second'] / results['uncached']['throughput_per_second']
+    return results
+
+def benchmark_large_body(size_mb=64):
+    """
+    حافظه هر درخواست برای بدنه بزرگ: بدون سقف، با سقف و اعتبارسنجی جریانی
+    Per-request memory for a large body: uncapped, capped (plain and gzip)
+    and streamed validation that stops at the first evidence
+    """
+    import tracemalloc
+    size = size_mb * 1024 * 1024
+    scanner = SQLInjectionScanner()
+    results = {'size_mb': size_mb}
+    cases = (('uncapped', None, False, False), ('capped', {}, False, False),
+             ('capped_gzip', {}, True, False), ('stream_validate', {}, False, True))
+    for label, cap, compress, stream in cases:
+        config = {'cache': False, 'coalesce': False}
+        if cap is None:
+            config['max_body_size'] = None
+        with LocalStandInServer(stream_size=size, compress=compress) as server, \
+                AdvancedHTTPxClient(config) as client:
+            url = f"{server.url}page/0?id=1'"
+            tracemalloc.start()
+            start = time.perf_counter()
+            if stream:
+                response = client.stream_request(url)
+                try:
+                    vulnerable = scanner.validate_stream(client.iter_text(response), url, "'",
+                                                         client.max_body_size, response.status_code)
+                finally:
+                    client.release(response)
+            else:
+                response = client.robust_request(url, probe=True)
+                vulnerable = bool(scanner.EVIDENCE_PATTERN.search(response.text))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[label] = {
+            'seconds': elapsed,
+            'peak_traced_mb': peak / (1024 * 1024),
+            'downloaded_mb': response.num_bytes_downloaded / (1024 * 1024) if stream else None,
+            'body_mb': len(response.content) / (1024 * 1024) if not stream else None,
+            'truncated': response.extensions.get('truncated', False),
+            'evidence_found': vulnerable
+        }
+    return results
+
+def benchmark_signatures(signatures=1000, body_mb=1, bodies=3):
+    """
+    SignatureMatcher در برابر یک re.search برای هر امضا
+    SignatureMatcher versus one re.search per signature
+    
+    مجموعه شامل امضاهای رشته‌ای، regexهای لنگردار و چند regex بدون لنگر است؛
+    مجموعه امضاهای یافته دو روش باید یکسان باشد
+    The set mixes literals, anchored regexes and a few anchorless regexes;
+    both approaches must report the same signatures.
+    """
+    rng = random.Random(7)
+    specs = []
+    for index in range(signatures):
+        kind = index % 10
+        if kind < 7:
+            specs.append({'name': f"literal-{index}", 'literal': f"driver error {rng.randrange(10 ** 8)} in module {index}"})
+        elif kind < 9 or index % 100 != 99:
+            specs.append({'name': f"regex-{index}", 'regex': rf"fault\s+#{index}-\d+ at 0x[0-9a-f]+"})
+        else:
+            specs.append({'name': f"anchorless-{index}", 'regex': rf"\b\d\d:\d\d:\d\d\.\d{{{3 + index // 100}}}\b"})
+    matcher = SignatureMatcher(specs)
+    compiled = [(spec['name'], re.compile(spec.get('regex') or re.escape(spec['literal']), re.IGNORECASE))
+                for spec in specs]
+    
+    filler = "lorem ipsum dolor sit amet, driver errors are logged per module at fault level "
+    corpus = []
+    for number in range(bodies):
+        text = (filler * (body_mb * 1024 * 1024 // len(filler) + 1))[:body_mb * 1024 * 1024]
+        planted = [rng.choice(specs) for _ in range(5)] + [specs[99 + 100 * number]]
+        for spec in planted:
+            index = int(spec['name'].split('-')[1])
+            evidence = spec.get('literal') or (f"Fault  #{index}-42 at 0xdeadbeef" if spec['name'].startswith('regex')
+                                               else f" 12:34:56.{'7' * (3 + index // 100)} ")
+            position = rng.randrange(len(text))
+            text = text[:position] + evidence + text[position:]
+        corpus.append(text)
+    
+    start = time.perf_counter()
+    matcher.stats()
+    compile_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    naive = [{name for name, pattern in compiled if pattern.search(text)} for text in corpus]
+    naive_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    combined = [matcher.matches(text) for text in corpus]
+    combined_seconds = time.perf_counter() - start
+    
+    return {
+        'signatures': len(specs),
+        'body_mb': body_mb,
+        'bodies': bodies,
+        'compile_seconds': compile_seconds,
+        'per_signature_mb_per_second': body_mb * bodies / naive_seconds,
+        'matcher_mb_per_second': body_mb * bodies / combined_seconds,
+        'speedup': naive_seconds / combined_seconds,
+        'identical_results': naive == combined,
+        'matched': sum(map(len, combined)),
+        **matcher.stats()
+    }
+
+def benchmark_scan_plan(endpoints=100_000, hosts=50, parameters=5, cluster=100):
+    """
+    سرعت و حافظه ScanPlanner برای میلیون‌ها واحد کار
+    ScanPlanner throughput and memory for millions of work units
+    
+    هر endpoint دو بار با مقدار query متفاوت ظاهر می‌شود (نیمی از واحدها
+    تکراری‌اند) و endpointها در گروه‌های cluster تایی از یک host می‌رسند، مانند
+    خزش یک سایت
+    Every endpoint shows up twice with different query values, so half of
+    the expanded units are duplicates, and endpoints arrive in runs of
+    cluster per host, as a crawl of one site would produce them.
+    """
+    scanners = {'sql': SQLInjectionScanner(), 'rce': RCEScanner()}
+    names = [f"p{index}" for index in range(parameters)]
+    
+    def targets():
+        for index in range(endpoints * 2):
+            number = index // 2
+            yield f"http://host{number // cluster % hosts}.bench.local/item/{number}?id={index}", names
+    
+    planner = ScanPlanner(scanners)
+    longest_run = run = 0
+    previous = None
+    rss_before = _memory_usage_mb()['rss']
+    start = time.perf_counter()
+    for unit in planner.plan(targets()):
+        run = run + 1 if unit.host == previous else 1
+        longest_run = max(longest_run, run)
+        previous = unit.host
+    elapsed = time.perf_counter() - start
+    rss_after = _memory_usage_mb()['rss']
+    stats = planner.stats()
+    return {
+        'expanded_units': stats['units'] + stats['duplicates'],
+        'planned_units': stats['units'],
+        'duplicates': stats['duplicates'],
+        'hosts': stats['hosts'],
+        'seconds': elapsed,
+        'units_per_second': (stats['units'] + stats['duplicates']) / elapsed,
+        'max_buffered_units': stats['max_buffered'],
+        'longest_same_host_run': longest_run,
+        'input_same_host_run': cluster * parameters * len(scanners),
+        'rss_growth_mb': rss_after - rss_before if rss_before is not None else None
+    }
+
+def benchmark_model_prediction(samples=5000, batch_size=32, threads=8):
+    """
+    پیش‌بینی تکی، دسته‌ای و micro-batched با MLModel خطی
+    Single, batched and micro-batched prediction with a linear MLModel
+    """
+    model = MLModel()
+    model.weights = {'coef': np.random.rand(256).astype(np.float32) - 0.5, 'intercept': 0.0}
+    inputs = [f"id=1' OR '{i}'='{i}" for i in range(samples)]
+    results = {}
+    
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        sent = time.perf_counter()
+        model.predict(item)
+        latencies.append(time.perf_counter() - sent)
+    results['single'] = _latency_summary(latencies, time.perf_counter() - start)
+    
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, samples, batch_size):
+        sent = time.perf_counter()
+        model.predict_batch(inputs[offset:offset + batch_size])
+        latencies.append(time.perf_counter() - sent)
+    elapsed = time.perf_counter() - start
+    results['batch'] = {**_latency_summary(latencies), 'predictions_per_second': samples / elapsed}
+    
+    from concurrent.futures import ThreadPoolExecutor
+    batcher = MicroBatcher(model, max_batch_size=batch_size)
+    
+    def timed(item):
+        sent = time.perf_counter()
+        batcher.predict(item)
+        return time.perf_counter() - sent
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(timed, inputs))
+    results['micro_batched'] = _latency_summary(latencies, time.perf_counter() - start)
+    batcher.close()
+    return results
+
+def _peak_rss_mb():
+    """
+    حداکثر RSS فرایند (مگابایت)
+    Peak process RSS in MB
+    
+    در لینوکس VmHWM خوانده می‌شود چون ru_maxrss حافظه فرایند والد پیش از exec
+    را هم شامل می‌شود
+    On Linux VmHWM is used, because ru_maxrss also counts the parent's
+    memory from before exec in a freshly spawned interpreter.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS بایت و لینوکس کیلوبایت گزارش می‌کند / macOS reports bytes, Linux KB
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _synthetic_html_page(index, size=256 * 1024):
+    """تولید صفحه HTML مصنوعی برای بنچمارک / Build a synthetic HTML page"""
+    blocks = []
+    total = 0
+    i = 0
+    while total < size:
+        block = (
+            f'<div class="row"><a href="/item.php?id={i}&page={index}">item {i}</a>'
+            f'<form action="/search?src={i}" method="get"><input name="q{i % 7}">'
+            f'<select name="sort"><option>asc</option></select></form>'
+            f'<script>fetch("/api/v1/data?offset={i}&limit=20");</script>'
+            f'<p>{"lorem ipsum " * 20}</p></div>\n'
+        )
+        blocks.append(block)
+        total += len(block)
+        i += 1
+    return f"<html><head><title>page {index}</title></head><body>{''.join(blocks)}</body></html>"
+
+def benchmark_parameter_discovery(corpus_dir=None, pages=40):
+    """
+    بنچمارک کشف پارامتر روی مجموعه صفحات HTML ذخیره شده
+    Benchmark parameter extraction over a corpus of saved HTML pages
+    
+    بدون corpus_dir یک مجموعه مصنوعی ساخته می‌شود
+    A synthetic corpus is generated when corpus_dir is not given.
+    """
+    import tempfile
+    temp_dir = None
+    if corpus_dir is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        corpus_dir = temp_dir.name
+        for index in range(pages):
+            with open(os.path.join(corpus_dir, f"page_{index}.html"), 'w', encoding='utf-8') as f:
+                f.write(_synthetic_html_page(index))
+    
+    paths = [os.path.join(corpus_dir, name) for name in sorted(os.listdir(corpus_dir))
+             if name.endswith(('.html', '.htm'))]
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    
+    def chunks(path):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            while True:
+                chunk = f.read(ParameterDiscoverer.CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+    
+    def worker(parser, report):
+        discoverer = ParameterDiscoverer(None, parser=parser)
+        start_rss = _memory_usage_mb()['rss']
+        start = time.perf_counter()
+        parameters = 0
+        for path in paths:
+            collector = discoverer.extract(f"http://bench.local/{os.path.basename(path)}", chunks(path))
+            parameters += sum(len(params) for params in collector.endpoints.values())
+        elapsed = time.perf_counter() - start
+        report.put({
+            'mb_per_second': results['megabytes'] / elapsed,
+            'parameters': parameters,
+            'start_rss_mb': start_rss,
+            'peak_rss_mb': _peak_rss_mb()
+        })
+    
+    # هر parser در فرایند جداگانه تا peak RSS آن مستقل باشد
+    # Each parser runs in its own process so its peak RSS is its own
+    import multiprocessing
+    context = multiprocessing.get_context('fork')
+    results = {'pages': len(paths), 'megabytes': total_bytes / (1024 * 1024)}
+    for parser in ('lxml', 'html.parser'):
+        if ParameterDiscoverer._select_backend(parser).name != parser:
+            continue
+        report = context.Queue()
+        process = context.Process(target=worker, args=(parser, report))
+        process.start()
+        results[parser] = report.get()
+        process.join()
+    
+    if temp_dir is not None:
+        temp_dir.cleanup()
+    return results
+
+def benchmark_checkpoint_overhead(units=20000):
+    """
+    سربار ثبت واحدهای کار در ScanLedger نسبت به اجرای بدون checkpoint
+    Overhead of recording work units in ScanLedger versus no checkpointing
+    
+    هر واحد کار یک simhash کوچک (هزینه تحلیل نمونه) محاسبه می‌کند
+    Each unit computes a small simhash as a stand-in for per-unit analysis.
+    """
+    import tempfile
+    body = "<html><body>" + " ".join(f"token{i}" for i in range(40)) + "</body></html>"
+    
+    def run(ledger):
+        start = time.perf_counter()
+        for index in range(units):
+            endpoint, parameter = f"http://bench.local/page{index % 100}", f"p{index}"
+            if ledger is not None and ledger.is_done(endpoint, parameter, 'sql'):
+                continue
+            ResponseFingerprint.simhash_of(body)
+            if ledger is not None:
+                ledger.mark_done(endpoint, parameter, 'sql')
+        return units / (time.perf_counter() - start)
+    
+    baseline_rate = run(None)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger = ScanLedger(os.path.join(temp_dir, 'bench.db'))
+        checkpoint_rate = run(ledger)
+        ledger.close()
+        
+        resumed = ScanLedger(os.path.join(temp_dir, 'bench.db'), ledger.scan_id)
+        start = time.perf_counter()
+        run(resumed)
+        resume_seconds = time.perf_counter() - start
+        resumed.close()
+    
+    return {
+        'units': units,
+        'units_per_second': baseline_rate,
+        'checkpointed_units_per_second': checkpoint_rate,
+        'overhead_percent': (baseline_rate / checkpoint_rate - 1) * 100,
+        'resume_skip_seconds': resume_seconds
+    }
+
+def benchmark_waf_evasion(payloads=200, endpoints=50, parameters=4):
+    """
+    نرخ تبدیل پیلود و نرخ برخورد کش WAFEvasionExpert
+    Payload transformation rate and cache hit rate of WAFEvasionExpert
+    
+    هر پیلود برای هر (endpoint، پارامتر) دوباره مصرف می‌شود، مانند یک اسکن واقعی
+    Every payload is consumed again for each (endpoint, parameter) pair,
+    as in a real scan.
+    """
+    corpus = [f"' OR '{i}'='{i}' -- <script>alert({i})</script>" for i in range(payloads)]
+    results = {}
+    for label, cache_size in (('uncached', 0), ('cached', 4096)):
+        expert = WAFEvasionExpert(cache_size=cache_size)
+        start = time.perf_counter()
+        produced = 0
+        for _ in range(endpoints * parameters):
+            for payload in corpus:
+                for _variant in expert.iter_variants(payload):
+                    produced += 1
+        elapsed = time.perf_counter() - start
+        results[label] = {'transformations_per_second': produced / elapsed, **expert.stats()}
+    results['speedup'] = (results['cached']['transformations_per_second']
+                          / results['uncached']['transformations_per_second'])
+    return results
+
+def _memory_usage_mb():
+    """
+    RSS و PSS فعلی فرایند از /proc (فقط لینوکس)
+    Current process RSS and PSS from /proc (Linux only)
+    """
+    usage = {'rss': None, 'pss': None}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name = line.split(':', 1)[0].lower()
+                if name in usage:
+                    usage[name] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return usage
+
+def benchmark_model_loading(size_mb=64, workers=4):
+    """
+    زمان بارگذاری سرد و حافظه کارگرها با وزن‌های کپی شده در برابر memory-mapped
+    Cold-start time and worker memory for copied versus memory-mapped weights
+    
+    هر کارگر وزن‌ها را مستقل بارگذاری و کامل می‌خواند؛ مجموع PSS نشان می‌دهد
+    چند نسخه فیزیکی از وزن‌ها در حافظه وجود دارد (نیازمند fork و /proc)
+    Each worker loads and fully reads the weights on its own; the summed
+    PSS shows how many physical copies exist (requires fork and /proc).
+    """
+    import multiprocessing
+    import tempfile
+    context = multiprocessing.get_context('fork')
+    results = {'size_mb': size_mb, 'workers': workers}
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'weights.npy')
+        np.save(path, np.random.rand(size_mb * 262144).astype(np.float32))
+        
+        for label, use_mmap in (('eager', False), ('mmap', True)):
+            model_registry.clear()
+            start = time.perf_counter()
+            model_registry.load(path, mmap=use_mmap)
+            cold_start = time.perf_counter() - start
+            model_registry.clear()
+            
+            barrier = context.Barrier(workers + 1)
+            usage = context.Queue()
+            
+            def worker():
+                weights = model_registry.load(path, mmap=use_mmap)
+                float(weights.sum())
+                barrier.wait()
+                usage.put(_memory_usage_mb())
+                barrier.wait()
+            
+            processes = [context.Process(target=worker) for _ in range(workers)]
+            for process in processes:
+                process.start()
+            barrier.wait()
+            barrier.wait()
+            reports = [usage.get() for _ in processes]
+            for process in processes:
+                process.join()
+            
+            pss = [report['pss'] for report in reports if report['pss'] is not None]
+            results[label] = {
+                'cold_start_seconds': cold_start,
+                'worker_rss_mb': [report['rss'] for report in reports],
+                'total_worker_pss_mb': sum(pss) if pss else None
+            }
+    model_registry.clear()
+    return results
+
+def benchmark_record_memory(units=1_000_000, findings=100_000, hosts=50, parameters=5):
+    """
+    حداکثر RSS و زمان GC برای ۱ میلیون واحد کار و یافته‌ها در سه نمایش
+    Peak RSS and GC time for 1M work units and findings in three representations
+    
+    before: namedtuple و دیکشنری با رشته‌های تکراری و زمان ISO؛ interned:
+    WorkUnit با رشته‌های intern شده و Finding با __slots__ و زمان monotonic؛
+    columnar: WorkUnitTable و FindingTable. هر نمایش در یک فرایند fork شده جدا
+    اندازه‌گیری می‌شود و رشد حداکثر RSS (VmHWM) آن گزارش می‌شود.
+    before: namedtuples and dicts with duplicate strings and ISO times;
+    interned: WorkUnit namedtuples with interned strings and slotted
+    Finding records with monotonic times; columnar: WorkUnitTable and
+    FindingTable. Each representation is measured in its own forked process,
+    reporting the growth of its peak RSS (VmHWM).
+    """
+    import gc
+    import multiprocessing
+    from collections import namedtuple
+    context = multiprocessing.get_context('fork')
+    TupleUnit = namedtuple('TupleUnit', WorkUnit._fields)
+    scan_types = ('sql', 'rce')
+    per_endpoint = parameters * len(scan_types)
+    
+    def pages():
+        # نام‌ها برای هر صفحه دوباره ساخته می‌شوند، مانند خروجی parser
+        # Names are rebuilt for every page, as parser output would be
+        for index in range(units // per_endpoint):
+            host = f"host{index % hosts}.bench.local"
+            yield host, f"http://{host}/item/{index}", [f"p{number}" for number in range(parameters)]
+    
+    def build(label):
+        if label == 'before':
+            unit_list = [TupleUnit(host, endpoint, name, scan_type, '')
+                         for host, endpoint, names in pages() for scan_type in scan_types for name in names]
+            finding_list = [{'type': 'sql', 'url': f"http://host{index % hosts}.bench.local/item/{index}",
+                             'parameter': f"p{index % parameters}", 'payload': "1'", 'evidence': '',
+                             'timestamp': datetime.now().isoformat()} for index in range(findings)]
+            return unit_list, finding_list
+        intern = sys.intern
+        unit_iter = (WorkUnit(intern(host), intern(endpoint), intern(name), scan_type, '')
+                     for host, endpoint, names in pages() for scan_type in scan_types for name in names)
+        finding_iter = (Finding('sql', f"http://host{index % hosts}.bench.local/item/{index}",
+                                f"p{index % parameters}", "1'") for index in range(findings))
+        if label == 'columnar':
+            return WorkUnitTable(unit_iter), FindingTable(finding_iter)
+        return list(unit_iter), list(finding_iter)
+    
+    def worker(label, report):
+        gc.collect()
+        try:
+            # بازنشانی VmHWM به RSS فعلی تا حداکثر فرایند والد شمرده نشود
+            # Reset VmHWM to the current RSS so the parent's peak is not counted
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+        start_rss = _peak_rss_mb()
+        start = time.perf_counter()
+        records = build(label)
+        build_seconds = time.perf_counter() - start
+        gc.collect()
+        start = time.perf_counter()
+        gc.collect()
+        gc_seconds = time.perf_counter() - start
+        peak_rss = _peak_rss_mb()
+        report.put({
+            'units': len(records[0]),
+            'findings': len(records[1]),
+            'build_seconds': build_seconds,
+            'full_gc_seconds': gc_seconds,
+            'start_rss_mb': start_rss,
+            'peak_rss_mb': peak_rss,
+            'rss_mb': peak_rss - start_rss if start_rss is not None else None
+        })
+    
+    results = {}
+    for label in ('before', 'interned', 'columnar'):
+        report = context.Queue()
+        process = context.Process(target=worker, args=(label, report))
+        process.start()
+        results[label] = report.get()
+        process.join()
+    if results['before']['rss_mb'] and results['columnar']['rss_mb']:
+        results['rss_reduction_percent'] = {
+            label: (1 - results[label]['rss_mb'] / results['before']['rss_mb']) * 100
+            for label in ('interned', 'columnar')
+        }
+    return results
+
+BENCHMARKS = {
+    'scan': benchmark_scan,
+    'http_client': benchmark_http_client,
+    'parameter_discovery': benchmark_parameter_discovery,
+    'checkpoint_overhead': benchmark_checkpoint_overhead,
+    'waf_evasion': benchmark_waf_evasion,
+    'model_loading': benchmark_model_loading,
+    'model_prediction': benchmark_model_prediction,
+    'coalescing': benchmark_coalescing,
+    'large_body': benchmark_large_body,
+    'signatures': benchmark_signatures,
+    'scan_plan': benchmark_scan_plan,
+    'record_memory': benchmark_record_memory,
+    'distributed': benchmark_distributed,
+    'dns': benchmark_dns,
+}
+
+def run_benchmarks(names=None, output=None):
+    """
+    اجرای بنچمارک‌ها و چاپ نتایج JSON
+    Run benchmarks and print JSON results
+    
+    کلیدها مرتب چاپ می‌شوند تا خروجی دو اجرا قابل diff باشد
+    Keys are sorted so the output of two runs can be diffed.
+    
+    پارامترها / Parameters:
+    - names: نام بنچمارک‌ها (پیش‌فرض همه)
+    - output: مسیر فایل JSON نتایج (اختیاری)
+    """
+    import platform
+    names = names or list(BENCHMARKS.keys())
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+    results = {}
+    for name in names:
+        logger.info(f"Running benchmark '{name}'")
+        results[name] = BENCHMARKS[name]()
+    results['environment'] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': datetime.now().isoformat(),
+        'peak_rss_mb': _peak_rss_mb()
+    }
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        logger.info(f"Benchmark results written to {output}")
+    print(text)
+    return results
+
+def check_startup_budget(budget=None):
+    """
+    بررسی بودجه راه‌اندازی با python -X importtime در یک فرایند جدید
+    Check the startup budget with python -X importtime in a fresh process
+    
+    بازگشت / Returns:
+    - دیکشنری نتایج شامل within_budget
+    """
+    import py_compile
+    import subprocess
+    budget = budget or STARTUP_BUDGET
+    # بایت‌کد از قبل ساخته می‌شود تا کامپایل پس از ویرایش در زمان import شمرده نشود
+    # Refresh the bytecode cache first so recompiling after an edit is not counted as import time
+    py_compile.compile(os.path.abspath(__file__), doraise=True)
+    script = (
+        "import importlib.util, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"spec = importlib.util.spec_from_file_location('ai_hacker', {os.path.abspath(__file__)!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(elapsed, module._peak_rss_mb())\n"
+    )
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Startup check failed: {process.stderr.strip()[-500:]}")
+    
+    imported = set()
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            imported.add(name.split('.')[0])
+    elapsed, rss = process.stdout.split()
+    
+    results = {
+        'import_seconds': float(elapsed),
+        'rss_mb': float(rss) if rss != 'None' else None,
+        'heavy_modules_loaded': sorted(imported.intersection(HEAVY_MODULES)),
+        'budget': budget
+    }
+    results['within_budget'] = (
+        not results['heavy_modules_loaded']
+        and results['import_seconds'] <= budget['import_seconds']
+        and (results['rss_mb'] is None or results['rss_mb'] <= budget['rss_mb'])
+    )
+    return results
 
 # =============================================================================
 # نمونه استفاده و راهنمای توسعه / Usage Example and Development Guide
@@ -551,7 +7435,12 @@ def main():
     print("=" * 60)
     
     # ایجاد نمونه فریمورک / Create framework instance
-    framework = VulnerabilityScannerFramework()
+    config = {'checkpoint_db': 'scan_checkpoints.db', **_config_option()}
+    if "--metrics" in sys.argv[:-1]:
+        config['metrics'] = {'export_path': sys.argv[sys.argv.index("--metrics") + 1]}
+    if "--coordinator" in sys.argv[:-1]:
+        config['distributed'] = {**config.get('distributed', {}), **_queue_options("--coordinator")}
+    framework = VulnerabilityScannerFramework(config)
     
     # ثبت مدل‌های دلخواه / Register custom models
     # framework.register_ai_model("my_ml_model", MLModel())
@@ -564,35 +7453,84 @@ def main():
     # آموزش مدل‌ها / Train models
     # framework.train_models()
     
-    # دریافت هدف از کاربر / Get target from user
-    target_url = input("Enter target URL (or press Enter for demo): ").strip()
+    # ازسرگیری اسکن قبلی / Resume a previous scan
+    resume_id = None
+    if "--resume" in sys.argv[:-1]:
+        resume_id = sys.argv[sys.argv.index("--resume") + 1]
     
-    if not target_url:
-        target_url = "https://example.com/test.php"
-        print(f"Using demo URL: {target_url}")
+    # دریافت هدف از کاربر / Get target from user
+    target_url = None
+    if resume_id is None:
+        target_url = input("Enter target URL (or press Enter for demo): ").strip()
+        
+        if not target_url:
+            target_url = "https://example.com/test.php"
+            print(f"Using demo URL: {target_url}")
+        
+        if not target_url.startswith(('http://', 'https://')):
+            target_url = 'https://' + target_url
     
-    if not target_url.startswith(('http://', 'https://')):
-        target_url = 'https://' + target_url
+    # مقصدهای خروجی / Output sinks
+    framework.register_sink('stdout', StdoutSink())
+    for option, sink_class in (('--jsonl', JSONLSink), ('--sarif', SARIFSink)):
+        if option in sys.argv[:-1]:
+            framework.register_sink(option[2:], sink_class(sys.argv[sys.argv.index(option) + 1]))
     
     # اجرای اسکن / Execute scan
     try:
-        findings = framework.scan_target(target_url)
-        
-        if findings:
-            print("\n" + "=" * 40)
-            print("SCAN RESULTS / نتایج اسکن")
-            print("=" * 40)
-            for finding in findings:
-                print(f"Type: {finding['type']}")
-                print(f"Parameter: {finding['parameter']}")
-                print(f"Payload: {finding['payload']}")
-                print("-" * 20)
+        if resume_id is not None:
+            findings = framework.resume_scan(resume_id)
+        elif "--profile" in sys.argv[:-1]:
+            findings, report = framework.profile_scan(target_url, output=sys.argv[sys.argv.index("--profile") + 1])
+            print(report)
+        elif "--coordinator" in sys.argv[:-1]:
+            findings = framework.distributed_scan(target_url)
         else:
+            findings = framework.iter_scan(target_url)
+        count = 0
+        for _ in findings:
+            count += 1
+        
+        if not count:
             print("\nNo vulnerabilities found. / هیچ آسیب‌پذیری یافت نشد.")
+        
+        cache_stats = framework.last_scan_stats.get('cache')
+        if cache_stats:
+            print(f"\nCache / کش: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        coalescing = framework.last_scan_stats.get('coalescing')
+        if coalescing:
+            print(f"Coalesced / ادغام شده: {coalescing['coalesced'] + coalescing['memo_hits']} "
+                  f"of {coalescing['sent'] + coalescing['coalesced'] + coalescing['memo_hits']} requests")
+        if framework.last_scan_stats.get('scan_id'):
+            print(f"Scan id / شناسه اسکن: {framework.last_scan_stats['scan_id']} (--resume)")
             
     except Exception as e:
         logger.error(f"Scan failed: {e}")
         print(f"Scan error: {e}")
+    finally:
+        framework.close()
+
+def _config_option():
+    """
+    پیکربندی فریمورک از فایل JSON داده شده با --config
+    Framework configuration from the JSON file given with --config
+    
+    هماهنگ‌کننده و کارگرها باید یک فایل را بخوانند تا config['http'] (از جمله
+    محدودیت نرخ مشترک) یکسان باشد
+    The coordinator and its workers should read the same file, so they share
+    config['http'] and with it the queue-wide rate limits.
+    """
+    if "--config" not in sys.argv[:-1]:
+        return {}
+    with open(sys.argv[sys.argv.index("--config") + 1], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _queue_options(option):
+    """تنظیمات صف کار از آرگومان‌های خط فرمان / Work queue options from the command line"""
+    options = {'queue': sys.argv[sys.argv.index(option) + 1]}
+    if "--queue-name" in sys.argv[:-1]:
+        options['name'] = sys.argv[sys.argv.index("--queue-name") + 1]
+    return options
 
 # راهنمای توسعه / Development Guide
 DEVELOPMENT_GUIDE = """
@@ -602,11 +7540,20 @@ Vulnerability Scanner Framework Development Guide
 1. اضافه کردن مدل هوش مصنوعی جدید / Adding new AI model:
    - از کلاس AIModelInterface ارث بری کنید
    - متدهای load_model, train, predict, generate_payload را پیاده‌سازی کنید
+   - برای پیش‌بینی برداری predict_batch را بازنویسی کنید
+     (override predict_batch for vectorized inference)
    - مدل خود را با register_ai_model ثبت کنید
 
 2. اضافه کردن نوع آسیب‌پذیری جدید / Adding new vulnerability type:
    - از کلاس VulnerabilityScanner ارث بری کنید  
    - متدهای scan و validate_finding را پیاده‌سازی کنید
+   - (اختیاری) برای اسکن همزمان متد async ascan را بازنویسی کنید
+     (optional) override async ascan for use with async_scan_target
+   - شواهد را به صورت امضا در EVIDENCE_PATTERN = SignatureMatcher([...]) تعریف کنید
+     (signatures are compiled once; config['signatures'][type] = path hot-reloads a JSON set)
+   - (اختیاری) برای واحدهای کار جدا به ازای هر پیلود payload_variants و scan_variant را بازنویسی کنید
+     (optional) override payload_variants/scan_variant to plan one work unit per payload;
+     config['plan'] = {'window': 10000, 'burst': 64} tunes the ScanPlanner
    - اسکنر خود را با register_scanner ثبت کنید
 
 3. اتصال به API داده آموزشی / Connecting to training data API:
@@ -618,6 +7565,34 @@ Vulnerability Scanner Framework Development Guide
    - به کلاس WAFEvasionExpert متدهای جدید اضافه کنید
    - یا کلاس‌های تخصصی جدید ایجاد کنید
 
+5. وابستگی‌های سنگین / Heavy dependencies:
+   - torch, numpy, httpx, sqlparse و bs4 به صورت LazyModule بارگذاری می‌شوند
+     (imported lazily through LazyModule - never import them at module level)
+   - بودجه راه‌اندازی در STARTUP_BUDGET تعریف شده و با --check-startup بررسی می‌شود
+     (startup budget lives in STARTUP_BUDGET; verify with --check-startup)
+
+6. متریک‌ها و پروفایل / Metrics and profiling:
+   - config['metrics'] = {'export_path': 'scan.prom'} یا --metrics scan.prom
+     (per-stage histograms exported as OpenMetrics; framework.telemetry.serve() for /metrics)
+   - framework.profile_scan(url, output='scan.prof') یا --profile scan.prof
+
+7. بنچمارک‌ها / Benchmarks:
+   - python AI-Hacker.py --bench [name ...] --bench-output results.json
+   - نتایج JSON مرتب هستند تا خروجی دو اجرا با diff مقایسه شود
+     (results are sorted JSON so two runs can be diffed)
+   - بنچمارک جدید را به BENCHMARKS اضافه کنید (add new benchmarks to BENCHMARKS)
+
+8. اسکن توزیع‌شده / Distributed scanning:
+   - هماهنگ‌کننده: python AI-Hacker.py --coordinator sqlite:///queue.db [--queue-name nightly] [--config scan.json]
+   - کارگرها: python AI-Hacker.py --worker sqlite:///queue.db [--queue-name nightly] [--config scan.json]
+     (redis://host:6379/0 for several nodes; memory:// for in-process tests)
+   - config['distributed'] = {'visibility_timeout': 300, 'max_attempts': 3, 'batch_size': 8}
+   - محدودیت نرخ config['http']['rate_limits'] برای همه کارگرها با هم اعمال می‌شود؛
+     همان --config را به هماهنگ‌کننده و کارگرها بدهید
+     (host rate limits hold across all workers of a queue; pass every process the same --config)
+   - کارگرها را می‌توان پیش از هماهنگ‌کننده اجرا کرد؛ هر اسکن صف را از نو شروع می‌کند
+     (workers may start before the coordinator; every scan starts the queue afresh)
+
 مثال‌ها در مستندات کد موجود است.
 Examples are available in code documentation.
 """
@@ -625,8 +7600,25 @@ Examples are available in code documentation.
 if __name__ == "__main__":
     # نمایش راهنمای توسعه اگر آرگومان --help داده شود
     # Show development guide if --help argument is given
-    import sys
     if "--help" in sys.argv or "-h" in sys.argv:
         print(DEVELOPMENT_GUIDE)
+    elif "--bench" in sys.argv:
+        # --bench [name ...] [--bench-output PATH]
+        bench_args = sys.argv[sys.argv.index("--bench") + 1:]
+        bench_names = list(itertools.takewhile(lambda arg: not arg.startswith("--"), bench_args))
+        bench_output = None
+        if "--bench-output" in sys.argv[:-1]:
+            bench_output = sys.argv[sys.argv.index("--bench-output") + 1]
+        run_benchmarks(bench_names, bench_output)
+    elif "--worker" in sys.argv[:-1]:
+        # --worker QUEUE_URL [--queue-name NAME] [--config PATH]
+        worker_config = _config_option()
+        worker_config['distributed'] = {**worker_config.get('distributed', {}), **_queue_options("--worker")}
+        with VulnerabilityScannerFramework(worker_config) as worker_framework:
+            print(json.dumps(worker_framework.run_worker(), indent=2))
+    elif "--check-startup" in sys.argv:
+        startup = check_startup_budget()
+        print(json.dumps(startup, indent=2))
+        sys.exit(0 if startup['within_budget'] else 1)
     else:
         main()
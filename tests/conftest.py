@@ -0,0 +1,23 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'AI-Hacker.py')
+
+
+def _load_module():
+    module = sys.modules.get('ai_hacker')
+    if module is None:
+        spec = importlib.util.spec_from_file_location('ai_hacker', MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['ai_hacker'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def ai_hacker():
+    """The AI-Hacker.py module (the file name is not importable directly)."""
+    return _load_module()
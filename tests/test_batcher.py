@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import pytest
+
+
+class SlowEcho:
+    def predict_batch(self, inputs):
+        time.sleep(0.05)
+        return [value * 2 for value in inputs]
+
+
+class ShortBatch:
+    def predict_batch(self, inputs):
+        return [value for value in inputs][:-1]
+
+
+def test_cancelled_apredict_keeps_worker_alive(ai_hacker):
+    batcher = ai_hacker.MicroBatcher(SlowEcho(), max_wait=0.01)
+    try:
+        async def scenario():
+            task = asyncio.ensure_future(batcher.apredict(1))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await asyncio.wait_for(batcher.apredict(2), timeout=2)
+
+        assert asyncio.run(scenario()) == 4
+        assert batcher._thread.is_alive()
+        assert batcher.submit(3).result(timeout=2) == 6
+    finally:
+        batcher.close()
+
+
+def test_short_predict_batch_fails_leftover_futures(ai_hacker):
+    batcher = ai_hacker.MicroBatcher(ShortBatch(), max_batch_size=2, max_wait=0.2)
+    try:
+        first, second = batcher.submit(1), batcher.submit(2)
+        assert first.result(timeout=2) == 1
+        with pytest.raises(RuntimeError):
+            second.result(timeout=2)
+    finally:
+        batcher.close()
+
+
+def test_predict_batch_without_model_is_a_fixed_placeholder(ai_hacker, monkeypatch):
+    numpy = ai_hacker.LazyModule('numpy')
+    monkeypatch.setattr(ai_hacker, 'np', numpy)
+    model = ai_hacker.MLModel()
+    assert model.predict_batch(['a', 'b', 'c']) == [False, False, False]
+    assert numpy._module is None
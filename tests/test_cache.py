@@ -0,0 +1,26 @@
+import threading
+
+
+def test_counters_survive_concurrent_updates(ai_hacker):
+    cache = ai_hacker.ResponseCache()
+
+    def hit():
+        for _ in range(10_000):
+            cache.record('hits')
+
+    threads = [threading.Thread(target=hit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.counters['hits'] == 80_000
+
+
+def test_client_counts_through_the_cache(ai_hacker):
+    with ai_hacker.LocalStandInServer() as server, \
+            ai_hacker.AdvancedHTTPxClient({'coalesce': False}) as http_client:
+        first = http_client.robust_request(server.url)
+        second = http_client.robust_request(server.url)
+    assert first.status_code == second.status_code == 200
+    counters = http_client.cache.counters
+    assert (counters['misses'], counters['stores'], counters['hits']) == (1, 1, 1)
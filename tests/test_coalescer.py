@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+
+class _Response:
+    status_code = 200
+    content = b'ok'
+
+
+@pytest.fixture
+def coalescer(ai_hacker):
+    return ai_hacker.RequestCoalescer(memo_ttl=60)
+
+
+def test_cancelled_waiter_does_not_break_the_leader(coalescer):
+    response = _Response()
+    release = asyncio.Event()
+
+    async def send():
+        await release.wait()
+        return response
+
+    async def scenario():
+        leader = asyncio.create_task(coalescer.arequest(b'k', send))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(coalescer.arequest(b'k', send))
+        other = asyncio.create_task(coalescer.arequest(b'k', send))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.wait_for(leader, 2), await asyncio.wait_for(other, 2), waiter
+
+    leader, other, waiter = asyncio.run(scenario())
+    assert leader is response and other is response
+    assert waiter.cancelled()
+    assert coalescer.stats()['in_flight'] == 0
+
+
+def test_probes_share_in_flight_but_skip_the_memo(coalescer):
+    calls = []
+
+    def send():
+        calls.append(1)
+        return _Response()
+
+    coalescer.request(b'k', send, memoize=False)
+    coalescer.request(b'k', send, memoize=False)
+    assert len(calls) == 2
+    assert coalescer.stats()['entries'] == 0
+
+    coalescer.request(b'k', send)
+    coalescer.request(b'k', send, memoize=False)
+    assert len(calls) == 4
+    coalescer.request(b'k', send)
+    assert len(calls) == 4
+    assert coalescer.stats()['memo_hits'] == 1
@@ -0,0 +1,55 @@
+import array
+import os
+
+
+def test_torn_index_entry_is_dropped(ai_hacker, tmp_path):
+    category = ai_hacker.CorpusCategory(str(tmp_path), 'sql')
+    assert category.add(['a', 'bb']) == 2
+    with open(category.index_path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    with open(category.data_path, 'ab') as f:
+        f.write(b'torn')
+    assert category.add(['ccc']) == 1
+    assert list(category) == ['a', 'bb', 'ccc']
+    assert os.path.getsize(category.index_path) == 3 * 8
+    category.close()
+
+
+def test_entries_written_before_hash_update_are_not_duplicated(ai_hacker, tmp_path):
+    category = ai_hacker.CorpusCategory(str(tmp_path), 'sql')
+    category.add(['a'])
+    # افزودنی که پیش از جایگزینی .hash قطع شد / An add that stopped before replacing .hash
+    with open(category.data_path, 'ab') as f:
+        f.write(b'b')
+    with open(category.index_path, 'ab') as f:
+        array.array('Q', [2]).tofile(f)
+    assert category.add(['b', 'c']) == 1
+    assert list(category) == ['a', 'b', 'c']
+    assert os.path.getsize(category.hash_path) == 3 * 8
+    category.close()
+
+
+def test_new_hashes_spill_to_disk_runs(ai_hacker, tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_hacker.CorpusCategory, 'RUN_SIZE', 4)
+    category = ai_hacker.CorpusCategory(str(tmp_path), 'xss')
+    payloads = [f"p{index % 13}" for index in range(40)]
+    assert category.add(payloads) == 13
+    assert category.add(payloads[::-1]) == 0
+    assert sorted(category) == sorted(set(payloads))
+    assert not [name for name in os.listdir(tmp_path) if '.run' in name or name.endswith('.tmp')]
+    hashes = array.array('Q')
+    with open(category.hash_path, 'rb') as f:
+        hashes.frombytes(f.read())
+    assert list(hashes) == sorted(hashes) and len(hashes) == 13
+    category.close()
+
+
+def test_load_local_data_keeps_list_contract(ai_hacker, tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_text("one\n\n two \n", encoding='utf-8')
+    api = ai_hacker.TrainingDataAPI({'cache_dir': str(tmp_path / 'cache')})
+    assert api.load_local_data(str(path)) == ['one', 'two']
+    assert api.load_local_data(str(tmp_path / 'missing.txt')) == []
+    assert list(api.iter_local_data(str(path))) == ['one', 'two']
+    assert api.import_local_data(str(path), 'sql') == 2
+    assert api.import_local_data(str(tmp_path / 'missing.txt'), 'sql') == 0
@@ -0,0 +1,62 @@
+def test_single_page_yields_each_endpoint_with_its_own_parameters(ai_hacker):
+    with ai_hacker.LocalStandInServer(forms=1, pages=3) as server:
+        framework = ai_hacker.VulnerabilityScannerFramework()
+        try:
+            targets = dict(framework._iter_targets(server.url + "page/0"))
+        finally:
+            framework.http_client.close()
+    page0 = f"http://127.0.0.1:{server.port}/page/0"
+    page1 = f"http://127.0.0.1:{server.port}/page/1"
+    assert set(targets[page0]) == {'id', 'field0', 'sort'}
+    assert set(targets[page1]) == {'id', 'view'}
+    assert 'field0' not in targets[page1]
+
+
+def test_single_page_falls_back_to_common_parameters(ai_hacker):
+    with ai_hacker.LocalStandInServer() as server:
+        framework = ai_hacker.VulnerabilityScannerFramework()
+        try:
+            targets = list(framework._iter_targets(server.url))
+        finally:
+            framework.http_client.close()
+    assert targets == [(server.url, list(ai_hacker.ParameterDiscoverer.COMMON_PARAMETERS))]
+
+
+def test_planner_dedup_stays_exact(ai_hacker):
+    scanner = ai_hacker.SQLInjectionScanner()
+    planner = ai_hacker.ScanPlanner({'sql': scanner})
+    names = [f"p{index}" for index in range(100_001)]
+    assert len(list(planner.expand('http://example.test/a?x=1', names))) == len(names)
+    assert planner.seen.bloom is None
+    assert list(planner.expand('http://example.test/a?x=2', names[:3] + ['fresh'])) == [
+        ai_hacker.WorkUnit('example.test', 'http://example.test/a?x=2', 'fresh', 'sql', '')]
+
+
+def test_async_scan_keeps_pending_units_bounded(ai_hacker):
+    import asyncio
+
+    class CountingScanner:
+        def __init__(self):
+            self.scanned = 0
+            self.most_tasks = 0
+
+        def payload_variants(self, endpoint):
+            return ['']
+
+        async def ascan(self, url, parameters):
+            self.most_tasks = max(self.most_tasks, len(asyncio.all_tasks()))
+            await asyncio.sleep(0)
+            self.scanned += 1
+            return {'vulnerable': False}
+
+    scanner = CountingScanner()
+    framework = ai_hacker.VulnerabilityScannerFramework({'concurrency': 4})
+    framework.scanners = {'counting': scanner}
+    framework._iter_targets = lambda url: iter([(url, [f"p{index}" for index in range(500)])])
+
+    async def scan():
+        return [finding async for finding in framework.aiter_scan('http://example.test/')]
+
+    assert asyncio.run(scan()) == []
+    assert scanner.scanned == 500
+    assert scanner.most_tasks <= 4 + 2
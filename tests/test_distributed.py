@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+
+
+class _SlowBackend:
+    """Rate backend whose reservation blocks like a remote SQLite/Redis call."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def reserve(self, host, rate, burst):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.2)
+        return 0.0
+
+
+def test_shared_bucket_reserves_off_the_event_loop(ai_hacker):
+    backend = _SlowBackend()
+    bucket = ai_hacker.SharedTokenBucket(backend, 'example.test', 10)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await bucket.async_acquire()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+    assert threading.get_ident() not in backend.threads
+
+
+def _slow_scanner(ai_hacker, seconds):
+    class SlowScanner(ai_hacker.VulnerabilityScanner):
+        def __init__(self):
+            self.calls = []
+            self._lock = threading.Lock()
+
+        def scan(self, target_url, parameters):
+            with self._lock:
+                self.calls.extend((target_url, name) for name in parameters)
+            time.sleep(seconds)
+            return {'vulnerable': True, 'parameter': parameters[0], 'payload': "1'"}
+
+        def validate_finding(self, response, payload):
+            return True
+
+    return SlowScanner()
+
+
+def test_heartbeat_keeps_long_groups_leased(ai_hacker):
+    scanner = _slow_scanner(ai_hacker, 0.5)
+    queue = ai_hacker.InProcessWorkQueue('heartbeat')
+    queue.start()
+    queue.put([ai_hacker.WorkUnit('x', f'http://x/{index}', 'id', 'slow') for index in range(2)])
+    queue.finish()
+    framework = ai_hacker.VulnerabilityScannerFramework()
+    framework.scanners = {'slow': scanner}
+    workers = [ai_hacker.ScanWorker(framework, queue, f'w{number}', batch_size=2, visibility_timeout=0.3,
+                                    poll_interval=0.05) for number in range(2)]
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    try:
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join(10)
+    finally:
+        framework.http_client.close()
+    assert sorted(scanner.calls) == [('http://x/0', 'id'), ('http://x/1', 'id')]
+    assert queue.stats()['pending'] == 0
+
+
+def test_coordinator_drops_repeated_findings(ai_hacker):
+    class RepeatingQueue(ai_hacker.InProcessWorkQueue):
+        """Delivers every finding twice, as a re-run unit would."""
+
+        def push_findings(self, findings):
+            super().push_findings(findings)
+            super().push_findings(findings)
+
+    scanner = _slow_scanner(ai_hacker, 0)
+    queue = RepeatingQueue('repeat')
+    with ai_hacker.LocalStandInServer(forms=1, pages=1) as server:
+        framework = ai_hacker.VulnerabilityScannerFramework({'distributed': {'poll_interval': 0.05}})
+        framework.scanners = {'slow': scanner}
+        worker = ai_hacker.ScanWorker(framework, queue, poll_interval=0.05, exit_when_drained=False)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            findings = list(framework.distributed_scan(server.url + 'page/0', queue=queue))
+        finally:
+            worker.stop()
+            thread.join(5)
+            framework.http_client.close()
+    keys = [(finding.type, finding.url, finding.parameter) for finding in findings]
+    assert keys and len(keys) == len(set(keys))
+
+
+def test_start_discards_the_previous_scan(ai_hacker, tmp_path):
+    queue = ai_hacker.SQLiteWorkQueue(str(tmp_path / 'queue.db'), 'reset')
+    try:
+        queue.start()
+        queue.put([ai_hacker.WorkUnit('x', 'http://x/', 'id', 'sql')])
+        queue.push_findings([ai_hacker.Finding('sql', 'http://x/', 'id')])
+        queue.finish()
+        queue.start()
+        stats = queue.stats()
+    finally:
+        queue.close()
+    assert (stats['pending'], stats['findings'], stats['finished'], stats['scan']) == (0, 0, False, 2)
+
+
+def test_worker_started_early_waits_for_the_next_scan(ai_hacker):
+    scanner = _slow_scanner(ai_hacker, 0)
+    queue = ai_hacker.InProcessWorkQueue('early')
+    queue.start()
+    queue.finish()
+    framework = ai_hacker.VulnerabilityScannerFramework()
+    framework.scanners = {'slow': scanner}
+    worker = ai_hacker.ScanWorker(framework, queue, poll_interval=0.05)
+    thread = threading.Thread(target=worker.run)
+    try:
+        thread.start()
+        time.sleep(0.2)
+        assert thread.is_alive()
+        queue.start()
+        queue.put([ai_hacker.WorkUnit('x', 'http://x/', 'id', 'slow')])
+        queue.finish()
+        thread.join(5)
+    finally:
+        worker.stop()
+        framework.http_client.close()
+    assert not thread.is_alive()
+    assert scanner.calls == [('http://x/', 'id')]
+
+
+def test_config_option_reads_json(ai_hacker, tmp_path, monkeypatch):
+    path = tmp_path / 'scan.json'
+    path.write_text('{"http": {"rate_limits": {"example.test": 5}}}')
+    monkeypatch.setattr(ai_hacker.sys, 'argv', ['AI-Hacker.py', '--worker', 'memory://', '--config', str(path)])
+    assert ai_hacker._config_option() == {'http': {'rate_limits': {'example.test': 5}}}
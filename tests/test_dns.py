@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+def _resolver(addresses):
+    calls = []
+
+    def resolve(host, port):
+        calls.append(host)
+        return list(addresses), None
+    return resolve, calls
+
+
+def test_client_options_get_a_private_cache(ai_hacker):
+    shared = ai_hacker.dns_cache
+    ttl = shared.ttl
+    client = ai_hacker.AdvancedHTTPxClient({'dns_cache': {'ttl': ttl + 5}})
+    assert client.dns_cache is not shared
+    assert client.dns_cache.ttl == ttl + 5
+    assert shared.ttl == ttl
+    assert ai_hacker.AdvancedHTTPxClient({'dns_cache': {}}).dns_cache is shared
+    assert ai_hacker.AdvancedHTTPxClient({}).dns_cache is None
+
+
+def test_requests_resolve_through_the_cache(ai_hacker):
+    resolve, calls = _resolver(['127.0.0.1'])
+    cache = ai_hacker.DNSCache(resolver=resolve)
+    with ai_hacker.LocalStandInServer() as server, \
+            ai_hacker.AdvancedHTTPxClient({'dns_cache': cache, 'max_keepalive_connections': 0,
+                                           'coalesce': False}) as http_client:
+        url = f"http://standin.test:{server.port}/"
+        responses = [http_client.robust_request(url, probe=True) for _ in range(3)]
+    assert [response.status_code for response in responses] == [200] * 3
+    assert responses[0].extensions['timings'].dns is not None
+    assert calls == ['standin.test']
+    assert cache.stats()['hits'] == 2
+
+
+def test_async_requests_resolve_through_the_cache(ai_hacker):
+    resolve, calls = _resolver(['127.0.0.1'])
+    cache = ai_hacker.DNSCache(resolver=resolve)
+
+    async def scenario(http_client, url):
+        try:
+            return [await http_client.async_robust_request(url, probe=True) for _ in range(2)]
+        finally:
+            await http_client.aclose()
+
+    with ai_hacker.LocalStandInServer() as server:
+        http_client = ai_hacker.AdvancedHTTPxClient({'dns_cache': cache, 'coalesce': False})
+        responses = asyncio.run(scenario(http_client, f"http://standin.test:{server.port}/"))
+    assert [response.status_code for response in responses] == [200, 200]
+    assert calls == ['standin.test']
+
+
+def test_connect_failures_surface_as_httpx_errors(ai_hacker):
+    resolve, _ = _resolver([])
+    with ai_hacker.AdvancedHTTPxClient({'dns_cache': ai_hacker.DNSCache(resolver=resolve)}) as http_client:
+        with pytest.raises(httpx.ConnectError) as error:
+            http_client.client.get("http://standin.test:9/")
+    assert error.value.request.url.host == 'standin.test'
+
+
+def test_environment_proxies_keep_the_stock_transport(ai_hacker, monkeypatch):
+    monkeypatch.setenv('HTTP_PROXY', 'http://127.0.0.1:8080')
+    with ai_hacker.AdvancedHTTPxClient({'dns_cache': {}}) as http_client:
+        assert http_client.client._mounts
+    with ai_hacker.AdvancedHTTPxClient() as http_client:
+        assert http_client.client._mounts
+
+
+def test_dnspython_answers_supply_addresses_and_ttl(ai_hacker, monkeypatch):
+    import socket
+    import sys
+    import types
+
+    class Answer:
+        def __init__(self, ttl):
+            self.rrset = types.SimpleNamespace(ttl=ttl)
+
+    class HostAnswers(dict):
+        def addresses(self):
+            return iter(['192.0.2.1', '2001:db8::1'])
+
+    resolver = types.ModuleType('dns.resolver')
+    resolver.resolve_name = lambda host, lifetime=None: HostAnswers(a=Answer(300), aaaa=Answer(120))
+    package = types.ModuleType('dns')
+    package.resolver = resolver
+    monkeypatch.setitem(sys.modules, 'dns', package)
+    monkeypatch.setitem(sys.modules, 'dns.resolver', resolver)
+
+    def getaddrinfo(*args, **kwargs):
+        raise AssertionError("getaddrinfo called next to dnspython")
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+
+    addresses, ttl = ai_hacker.DNSCache()._lookup('example.test', 80)
+    assert addresses == ['192.0.2.1', '2001:db8::1']
+    assert ttl == 120
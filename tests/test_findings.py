@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def finding_scanner(ai_hacker):
+    class FindingScanner(ai_hacker.VulnerabilityScanner):
+        def scan(self, target_url, parameters):
+            return {'vulnerable': True, 'parameter': 'id', 'payload': "1'", 'evidence': 'SQL syntax'}
+
+        def validate_finding(self, response, payload):
+            return True
+
+    return FindingScanner()
+
+
+def test_scan_target_returns_a_list_of_dicts(ai_hacker, finding_scanner):
+    with ai_hacker.LocalStandInServer(forms=1, pages=1) as server:
+        framework = ai_hacker.VulnerabilityScannerFramework()
+        framework.scanners = {'sql': finding_scanner}
+        try:
+            findings = framework.scan_target(server.url + "page/0")
+        finally:
+            framework.http_client.close()
+
+    assert isinstance(findings, list) and findings
+    assert all(type(finding) is dict for finding in findings)
+    assert json.loads(json.dumps(findings)) == findings
+    findings[0]['severity'] = 'high'
+    findings = findings + [{'type': 'manual'}]
+    datetime.fromisoformat(findings[0]['timestamp'])
+
+
+def test_finding_table_keeps_dict_timestamps(ai_hacker):
+    table = ai_hacker.FindingTable()
+    table.append({'type': 'sql', 'url': 'http://x/', 'timestamp': '2020-01-02T03:04:05.123456'})
+    assert table[0]['timestamp'] == '2020-01-02T03:04:05.123456'
+    assert table.to_dicts()[0]['timestamp'] == '2020-01-02T03:04:05.123456'
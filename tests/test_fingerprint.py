@@ -0,0 +1,13 @@
+def test_baselines_are_bounded(ai_hacker):
+    with ai_hacker.LocalStandInServer() as server:
+        client = ai_hacker.AdvancedHTTPxClient({'cache': False, 'coalesce': False})
+        engine = ai_hacker.FingerprintEngine(client, executor=ai_hacker.AnalysisExecutor(), max_baselines=3)
+        try:
+            for index in range(5):
+                assert engine.baseline(f"{server.url}page/{index}") is not None
+            engine.baseline(f"{server.url}page/2")
+            engine.baseline(f"{server.url}page/5")
+        finally:
+            client.close()
+    assert len(engine.baselines) == 3
+    assert [key.rsplit('/', 1)[1] for key in engine.baselines] == ['4', '2', '5']
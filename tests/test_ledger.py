@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def payload_scanner(ai_hacker):
+    class PayloadScanner(ai_hacker.VulnerabilityScanner):
+        """Scanner with two payload variants; the second fails until allowed."""
+
+        PAYLOADS = ('a', 'b')
+
+        def __init__(self):
+            self.fail_on = 'b'
+            self.calls = []
+
+        def scan(self, target_url, parameters):
+            raise AssertionError("PAYLOADS scanners are driven through scan_variant")
+
+        def scan_variant(self, target_url, parameters, payload=''):
+            if payload == self.fail_on:
+                raise RuntimeError("scanner crashed")
+            self.calls.extend((target_url, name, payload) for name in parameters)
+            return {'vulnerable': False}
+
+        def validate_finding(self, response, payload):
+            return False
+
+    return PayloadScanner()
+
+
+def test_ledger_checkpoints_before_units_are_committed(ai_hacker, tmp_path):
+    path = str(tmp_path / 'ledger.db')
+    committed_at_checkpoint = []
+
+    def committed_units():
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute("SELECT COUNT(*) FROM units").fetchone()[0]
+        finally:
+            connection.close()
+
+    ledger = ai_hacker.ScanLedger(path, batch_size=2,
+                                  before_commit=lambda: committed_at_checkpoint.append(committed_units()))
+    ledger.mark_done('http://x/', 'id', 'sql')
+    ledger.mark_done('http://x/', 'q', 'sql')
+    ledger.close()
+    assert committed_at_checkpoint == [0]
+    assert committed_units() == 2
+
+
+def test_resume_skips_completed_payload_variants(ai_hacker, payload_scanner, tmp_path):
+    with ai_hacker.LocalStandInServer(forms=1, pages=1) as server:
+        framework = ai_hacker.VulnerabilityScannerFramework({'checkpoint_db': str(tmp_path / 'scan.db')})
+        scanner = payload_scanner
+        framework.scanners = {'probe': scanner}
+        try:
+            with pytest.raises(RuntimeError):
+                list(framework.iter_scan(server.url + "page/0", ['probe']))
+            first_run = list(scanner.calls)
+            scanner.calls.clear()
+            scanner.fail_on = None
+            list(framework.resume_scan(_scan_id(tmp_path)))
+        finally:
+            framework.http_client.close()
+
+    assert first_run and all(payload == 'a' for _, _, payload in first_run)
+    assert not set(first_run) & set(scanner.calls)
+    assert {payload for _, _, payload in scanner.calls} == {'b'}
+
+
+def _scan_id(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / 'scan.db'))
+    try:
+        return connection.execute("SELECT scan_id FROM scans").fetchone()[0]
+    finally:
+        connection.close()
@@ -0,0 +1,41 @@
+import asyncio
+
+
+def test_cancel_during_rate_limit_wait_releases_slot(ai_hacker):
+    scheduler = ai_hacker.RequestScheduler({'rate_limit': 1, 'rate_burst': 1})
+    url = "http://example.test/"
+
+    async def scenario():
+        controller = await scheduler.async_acquire(url)
+        controller.release()
+        waiter = asyncio.ensure_future(scheduler.async_acquire(url))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.in_flight == 0
+
+
+def test_cancel_after_slot_granted_releases_slot(ai_hacker):
+    controller = ai_hacker.AdaptiveConcurrencyController(initial_limit=1)
+
+    async def scenario():
+        await controller.async_acquire()
+        waiter = asyncio.ensure_future(controller.async_acquire())
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.sleep(0)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert controller.in_flight == 0
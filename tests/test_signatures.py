@@ -0,0 +1,34 @@
+import pytest
+
+
+def _names(matcher, text):
+    return sorted(match.signature for match in matcher.finditer(text))
+
+
+def test_global_inline_flags_do_not_break_the_set(ai_hacker):
+    matcher = ai_hacker.SignatureMatcher([
+        {'name': 'flagged', 'regex': r'(?i)\d+ rows?', 'ignore_case': False},
+        {'name': 'dotall', 'regex': r'(?s)a.b'},
+        {'name': 'plain', 'regex': r'\d{3}-\d{4}'},
+    ])
+    assert _names(matcher, 'found 12 ROWS, a\nb and 555-1234') == ['dotall', 'flagged', 'plain']
+
+
+def test_invalid_signature_is_reported_by_name(ai_hacker):
+    matcher = ai_hacker.SignatureMatcher([{'name': 'ok', 'literal': 'x'}, {'name': 'broken', 'regex': '(unclosed'}])
+    with pytest.raises(ValueError, match="#1 \\('broken'\\)"):
+        matcher.search('x')
+    with pytest.raises(ValueError, match='named groups'):
+        ai_hacker.SignatureMatcher([{'name': 'named', 'regex': r'(?P<x>\d+)'}]).search('1')
+
+
+def test_private_parser_failure_falls_back_to_residual(ai_hacker, monkeypatch):
+    def fail(module):
+        raise ImportError(module)
+
+    monkeypatch.setattr(ai_hacker.importlib, 'import_module', fail)
+    matcher = ai_hacker.SignatureMatcher([
+        {'name': 'oracle', 'regex': r'ORA-\d{5}'},
+        {'name': 'literal', 'literal': 'SQLSTATE['},
+    ])
+    assert _names(matcher, 'ora-01756 and sqlstate[42000]') == ['literal', 'oracle']
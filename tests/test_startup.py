@@ -0,0 +1,12 @@
+def test_import_stays_within_startup_budget(ai_hacker):
+    results = ai_hacker.check_startup_budget()
+    assert results['heavy_modules_loaded'] == []
+    assert results['import_seconds'] <= results['budget']['import_seconds']
+    if results['rss_mb'] is not None:
+        assert results['rss_mb'] <= results['budget']['rss_mb']
+    assert results['within_budget']
+
+
+def test_heavy_modules_stay_lazy(ai_hacker):
+    for name in ('httpx', 'np', 'torch'):
+        assert isinstance(getattr(ai_hacker, name), ai_hacker.LazyModule)
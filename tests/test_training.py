@@ -0,0 +1,73 @@
+import pickle
+import textwrap
+
+import numpy as np
+
+from conftest import MODULE_PATH
+
+MODELS = '''
+import numpy as np
+
+import ai_hacker
+
+
+class ScaledModel(ai_hacker.MLModel):
+    def train(self, training_data):
+        self._ensure_loaded()
+        self.weights = np.asarray(self.weights) * len(training_data)
+        self.is_trained = True
+'''
+
+
+def _importable_models(tmp_path, monkeypatch):
+    # Spawned training workers re-import the module by name, so make both
+    # the module and the test model class importable from tmp_path.
+    (tmp_path / 'ai_hacker.py').write_text(textwrap.dedent(f'''
+        import importlib.util
+        import sys
+
+        spec = importlib.util.spec_from_file_location('ai_hacker', {MODULE_PATH!r})
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['ai_hacker'] = module
+        spec.loader.exec_module(module)
+    '''))
+    (tmp_path / 'training_models.py').write_text(MODELS)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import training_models
+    return training_models
+
+
+def _weighted_model(models, tmp_path, name):
+    path = tmp_path / f'{name}.npy'
+    np.save(path, np.array([1.0, 2.0], dtype=np.float32))
+    model = models.ScaledModel()
+    model.load_model(str(path))
+    return model
+
+
+def test_trained_weights_survive_pickling(ai_hacker, tmp_path, monkeypatch):
+    models = _importable_models(tmp_path, monkeypatch)
+    framework = ai_hacker.VulnerabilityScannerFramework({'training': {'cpu_budget': 1}})
+    try:
+        framework.register_ai_model('scaled', _weighted_model(models, tmp_path, 'scaled'))
+        assert framework.train_models(['x', 'y', 'z']) == {'scaled': True}
+    finally:
+        framework.close()
+    model = pickle.loads(pickle.dumps(framework.ai_models['scaled']))
+    model._ensure_loaded()
+    assert model.weights.tolist() == [3.0, 6.0]
+
+
+def test_parallel_training_returns_trained_models(ai_hacker, tmp_path, monkeypatch):
+    models = _importable_models(tmp_path, monkeypatch)
+    framework = ai_hacker.VulnerabilityScannerFramework({'training': {'cpu_budget': 2}})
+    try:
+        for name in ('first', 'second'):
+            framework.register_ai_model(name, _weighted_model(models, tmp_path, name))
+        assert framework.train_models(['x', 'y']) == {'first': True, 'second': True}
+    finally:
+        framework.close()
+    for name in ('first', 'second'):
+        model = framework.ai_models[name]
+        model._ensure_loaded()
+        assert model.weights.tolist() == [2.0, 4.0]
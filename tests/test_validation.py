@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def body_scanner(ai_hacker):
+    class BodyScanner(ai_hacker.VulnerabilityScanner):
+        def scan(self, target_url, parameters):
+            return {'vulnerable': False}
+
+        def validate_finding(self, response, payload):
+            self.seen = response
+            return response.status_code == 200 and payload in response.text
+
+    return BodyScanner()
+
+
+def test_validate_stream_falls_back_to_validate_finding(body_scanner):
+    chunks = ['<html>', "id=1' reflected", '</html>']
+    assert body_scanner.validate_stream(iter(chunks), 'http://example.test/?id=1', "1'")
+    assert str(body_scanner.seen.request.url) == 'http://example.test/?id=1'
+    assert not body_scanner.validate_stream(iter(chunks), 'http://example.test/', "1'", status_code=500)
+
+
+def test_validate_stream_fallback_is_bounded(body_scanner):
+    consumed = []
+
+    def chunks():
+        for number in range(100):
+            consumed.append(number)
+            yield 'x' * 10
+        yield 'needle'
+
+    assert not body_scanner.validate_stream(chunks(), 'http://example.test/', 'needle', max_body_size=50)
+    assert len(body_scanner.seen.text) == 50
+    assert len(consumed) == 5
@@ -0,0 +1,74 @@
+import json
+import struct
+import threading
+import time
+
+import numpy as np
+
+
+def _write_safetensors(path, tensors):
+    header, data = {}, b''
+    for name, (dtype, shape, raw) in tensors.items():
+        header[name] = {'dtype': dtype, 'shape': shape, 'data_offsets': [len(data), len(data) + len(raw)]}
+        data += raw
+    encoded = json.dumps(header).encode()
+    path.write_bytes(struct.pack('<Q', len(encoded)) + encoded + data)
+
+
+def test_bf16_safetensors_load(ai_hacker, tmp_path):
+    path = tmp_path / 'model.safetensors'
+    _write_safetensors(path, {
+        'w': ('BF16', [2], struct.pack('<2H', 0x3F80, 0xC000)),
+        'b': ('F32', [1], struct.pack('<f', 0.5)),
+    })
+    weights = ai_hacker.load_weights(str(path))
+    assert weights.dtypes == {'w': 'BF16', 'b': 'F32'}
+    assert ai_hacker.bfloat16_to_float32(weights['w']).tolist() == [1.0, -2.0]
+    assert weights['b'].tolist() == [0.5]
+
+
+def test_writable_weights_are_copy_on_write(ai_hacker, tmp_path):
+    path = tmp_path / 'model.safetensors'
+    _write_safetensors(path, {'w': ('F32', [2], struct.pack('<2f', 1.0, 2.0))})
+    original = path.read_bytes()
+    shared = ai_hacker.load_weights(str(path))
+    assert not shared['w'].flags.writeable
+    private = ai_hacker.load_weights(str(path), writable=True)
+    private['w'][0] = 7.0
+    assert path.read_bytes() == original
+
+    npy = tmp_path / 'w.npy'
+    np.save(npy, np.arange(3, dtype=np.float32))
+    array = ai_hacker.load_weights(str(npy), writable=True)
+    array[0] = 9.0
+    assert np.load(npy).tolist() == [0.0, 1.0, 2.0]
+
+
+def test_registry_loads_files_outside_global_lock(ai_hacker, tmp_path, monkeypatch):
+    slow, fast = tmp_path / 'slow.npy', tmp_path / 'fast.npy'
+    np.save(slow, np.zeros(1))
+    np.save(fast, np.ones(1))
+    release = threading.Event()
+    calls = []
+
+    def load_weights(path, mmap=True, writable=False):
+        calls.append(path)
+        if path == str(slow):
+            release.wait(5)
+        return {'path': path}
+
+    monkeypatch.setattr(ai_hacker, 'load_weights', load_weights)
+    registry = ai_hacker.ModelRegistry()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.load(str(slow)))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    assert registry.load(str(fast)) == {'path': str(fast)}
+    assert time.perf_counter() - start < 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results[0] is results[1]
+    assert calls.count(str(slow)) == 1